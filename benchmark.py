@@ -0,0 +1,649 @@
+"""
+Microbenchmarks del analizador de Viper.
+
+Uso: python benchmark.py [nombre ...]
+Sin nombres se ejecutan todos los de BENCHMARKS.
+"""
+import os
+import sys
+import time
+
+from lexer import LexerClass
+from lexer_paralelo import tokenizar
+from parser import Gramatica, ParserClass
+
+
+def medir(funcion, repeticiones=5):
+    """Mejor tiempo (s) de 'repeticiones' ejecuciones de funcion()."""
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+def informar(nombre, segundos, n, unidad, bytes_=None):
+    linea = f"{nombre}: {segundos * 1000:.1f} ms, {n / segundos:,.0f} {unidad}/s"
+    if bytes_:
+        linea += f", {bytes_ / segundos / 1e6:.2f} MB/s"
+    print(linea)
+
+
+#
+#region EXPRESIONES
+#
+
+def generar_expresiones(n):
+    """Programa con n declaraciones cargadas de operadores binarios y unarios."""
+    lineas = ["int a = 1", "int b = 2", "float c = 1.5", "bool t = true"]
+    for i in range(n):
+        if i % 2:
+            lineas.append(f"bool w{i} = a > b && t || not t && a <= -b")
+        else:
+            lineas.append(f"float v{i} = a * b + c - (a / b) * c + sin c - -a")
+    return '\n'.join(lineas) + '\n'
+
+
+def bench_expresiones(n=5000):
+    texto = generar_expresiones(n)
+    parser = ParserClass('benchmark')
+
+    def una():
+        parser.reiniciar()
+        parser.parse(texto)
+
+    informar('expresiones', medir(una), n, 'sentencias', len(texto))
+
+#endregion
+
+
+#
+#region COMENTARIOS
+#
+
+def generar_comentarios(bloques=4, tam=1_000_000):
+    """Código intercalado con bloques ''' de 'tam' bytes llenos de comillas simples."""
+    relleno = "doc: it's 'a' ''b'' x\n"
+    cuerpo = relleno * (tam // len(relleno))
+    partes = []
+    for i in range(bloques):
+        partes.append(f"int x{i} = {i}  # comentario de línea\n")
+        partes.append(f"'''{cuerpo}'''\n")
+    return ''.join(partes)
+
+
+def bench_comentarios(bloques=4, tam=1_000_000):
+    texto = generar_comentarios(bloques, tam)
+    lexer = LexerClass().lexerObj
+
+    def una():
+        lexer.lineno = 1
+        lexer.input(texto)
+        for _ in lexer:
+            pass
+
+    informar('comentarios', medir(una), bloques, 'bloques', len(texto))
+
+#endregion
+
+
+#
+#region LÉXICO PARALELO
+#
+
+def generar_fichero_grande(n=100_000):
+    """Fichero generado con declaraciones, comentarios ''' y literales de carácter."""
+    partes = []
+    for i in range(n):
+        partes.append(f"int v{i} = {i} * 2 + 0x1F  # línea {i}\n")
+        if i % 100 == 0:
+            partes.append("'''bloque con 'comillas'\ny saltos\n'''\n")
+        if i % 7 == 0:
+            partes.append(f"char c{i} = 'x'\n")
+    return ''.join(partes)
+
+
+def bench_lexico_paralelo(n=100_000):
+    texto = generar_fichero_grande(n)
+    lexer = LexerClass().lexerObj
+
+    def serie():
+        lexer.lineno = 1
+        lexer.input(texto)
+        return list(lexer)
+
+    clave = lambda toks: [(t.type, t.value, t.lineno, t.lexpos) for t in toks]
+    assert clave(serie()) == clave(tokenizar(texto)), "el flujo paralelo difiere del serie"
+    informar('lexico_serie', medir(serie, 3), n, 'líneas', len(texto))
+    informar('lexico_paralelo', medir(lambda: tokenizar(texto), 3), n, 'líneas', len(texto))
+
+#endregion
+
+
+#
+#region DRIVER LR
+#
+
+def bench_driver_lr(n=5000):
+    """Mismo programa con el driver de PLY y con el generado (parser_lr)."""
+    texto = generar_expresiones(n)
+    parser = ParserClass('benchmark')
+    generado = parser.driver
+    if generado is None:
+        print("driver_lr: parser_lr.py no existe o no coincide con la gramática")
+        return
+
+    def una():
+        parser.reiniciar()
+        parser.parse(texto)
+
+    parser.driver = None
+    informar('driver_ply', medir(una), n, 'sentencias', len(texto))
+    parser.driver = generado
+    informar('driver_generado', medir(una), n, 'sentencias', len(texto))
+
+#endregion
+
+
+#
+#region DOS VELOCIDADES
+#
+
+def bench_dos_velocidades(n=5000):
+    """Fichero sin errores: streaming con posiciones frente a comprobar()."""
+    texto = generar_expresiones(n)
+    parser = ParserClass('benchmark')
+
+    def con_posiciones():
+        parser.reiniciar()
+        parser.parse_stream(texto, lambda nodo: None)
+
+    def adaptativo():
+        parser.reiniciar()
+        parser.comprobar(texto)
+
+    informar('con_posiciones', medir(con_posiciones), n, 'sentencias', len(texto))
+    informar('adaptativo', medir(adaptativo), n, 'sentencias', len(texto))
+
+#endregion
+
+
+#
+#region CARGA DE VECTORES
+#
+
+def bench_carga(n=5_000_000):
+    """Declaración 'load' de un vector de n float64 en binario crudo."""
+    import tempfile
+    from array import array
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'tabla.bin')
+        with open(ruta, 'wb') as f:
+            array('d', range(n)).tofile(f)
+        texto = f'float[{n}] tabla load "{ruta}"\nfloat ultimo = tabla[{n - 1}]\n'
+        parser = ParserClass(ruta)
+
+        def una():
+            parser.reiniciar()
+            parser.comprobar(texto)
+
+        informar('carga', medir(una), n, 'elementos', n * 8)
+
+#endregion
+
+
+#
+#region VECTORES ENTEROS
+#
+
+def bench_vectores(n=1_000_000):
+    """sin y división entera sobre todo un vector: NumPy (si está) frente a listas."""
+    import vectores
+    usar = vectores.USAR_NUMPY
+    try:
+        for con_numpy in dict.fromkeys((usar, False)):
+            vectores.USAR_NUMPY = con_numpy
+            nombre = 'numpy' if con_numpy else 'listas'
+            enteros = vectores.crear_valores('int', n)
+            for i in range(n):
+                enteros[i] = i - n // 2
+            informar(f'vectores_sin_{nombre}', medir(lambda: vectores.aplicar('sin', enteros), 3),
+                     n, 'elementos')
+            informar(f'vectores_div_{nombre}', medir(lambda: vectores.operar('DIV', enteros, -7), 3),
+                     n, 'elementos')
+    finally:
+        vectores.USAR_NUMPY = usar
+
+#endregion
+
+
+#
+#region NODOS COMPARTIDOS
+#
+
+def generar_repetitivo(n):
+    """Programa generado típico: pocas subexpresiones repetidas muchas veces."""
+    lineas = ["int a = 1", "int b = 2", "int c = 3", "float f = 1.5"]
+    plantillas = ("a * b + c", "(a * b + c) * (a * b + c) - b", "f * 2.0 + a * b + c", "a * b + c > b")
+    tipos = ("int", "int", "float", "bool")
+    for i in range(n):
+        k = i % len(plantillas)
+        lineas.append(f"{tipos[k]} x{i} = {plantillas[k]}")
+    return '\n'.join(lineas) + '\n'
+
+
+def bench_nodos(n=5000):
+    """AST completo de un programa repetitivo: tiempo y nodos compartidos."""
+    texto = generar_repetitivo(n)
+    parser = ParserClass('benchmark')
+
+    def una():
+        parser.reiniciar()
+        parser.parse(texto)
+
+    informar('nodos', medir(una), n, 'sentencias', len(texto))
+    stats = parser.nodos.estadisticas()
+    print(f"nodos: {stats['nodos']} distintos de {stats['pedidos']} pedidos, "
+          f"{stats['proporcion']:.1%} compartidos, {stats['bytes_ahorrados'] / 1024:.0f} KiB ahorrados")
+
+#endregion
+
+
+#
+#region CONSULTAS
+#
+
+def generar_funciones(n):
+    """Programa con n funciones independientes y una sentencia global tras cada una."""
+    lineas = ["type Punto:", "{", "    int x, y", "}"]
+    for i in range(n):
+        lineas += [f"def int f{i}(int a; int b):", "{",
+                   "    int c = a * b + 1",
+                   "    int d = c - a",
+                   "    if d > b:", "    {", "        d = d + 1", "    }",
+                   "    return d", "}",
+                   f"int g{i} = {i} * 2"]
+    return '\n'.join(lineas) + '\n'
+
+
+def bench_consultas(n=2000):
+    """Diagnósticos de una función: fichero entero frente a consultas, antes y después de editar otra."""
+    from consultas import Consultas
+    texto = generar_funciones(n)
+    parser = ParserClass('benchmark')
+    objetivo = f"f{n - 1}"
+
+    def completo():
+        parser.reiniciar()
+        parser.comprobar(texto)
+
+    consultas = Consultas()
+    consultas.fijar_fuente(texto)
+
+    def primera():
+        consultas._memo.clear()
+        consultas.diagnosticos_funcion(objetivo)
+
+    editado = [texto]
+
+    def tras_editar():
+        # otra función, anterior al objetivo, gana una línea en cada
+        # repetición: todo lo que sigue se mueve, pero no se reanaliza
+        editado[0] = editado[0].replace("    int c = a * b + 1\n",
+                                        "    int c = a * b + 1\n    c = c + 1\n", 1)
+        consultas.fijar_fuente(editado[0])
+        consultas.diagnosticos_funcion(objetivo)
+
+    informar('fichero_completo', medir(completo), n, 'funciones', len(texto))
+    informar('consulta_en_frio', medir(primera), 1, 'consultas')
+    antes = consultas.calculadas
+    informar('consulta_tras_editar', medir(tras_editar), 1, 'consultas')
+    print(f"consultas recalculadas por edición: {(consultas.calculadas - antes) / 5:.0f}")
+
+#endregion
+
+
+#
+#region HILOS
+#
+
+def _programas_hilos():
+    """Ficheros de test_files más unos cuantos con errores léxicos, sintácticos y semánticos."""
+    directorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_files')
+    programas = []
+    for fichero in sorted(os.listdir(directorio)):
+        if os.path.splitext(fichero)[1] in ('', '.txt'):
+            with open(os.path.join(directorio, fichero)) as f:
+                programas.append(f.read())
+    programas += [
+        "int a = 1\nint b = a $ 2\n",
+        "int a = 1\nfloat b = (a +\n",
+        "int a = 1\nbool b = a\n",
+        "'''sin cerrar\nint a = 1\n",
+        generar_expresiones(200),
+    ]
+    return programas
+
+
+def _analizar_en(sesion, texto):
+    """(primer error, mensajes, tabla de símbolos) de 'texto' en 'sesion'."""
+    import io
+    sesion.reiniciar()
+    sesion.lexer.salida = io.StringIO()
+    error = sesion.comprobar(texto)
+    if error is not None:
+        error = (error['error'], *sesion.posicion(error))
+    simbolos = {n: str(info['type']) for n, info in sesion.entorno.items()
+                if isinstance(info, dict)}
+    return error, sesion.lexer.salida.getvalue(), simbolos
+
+
+def bench_hilos(hilos=8, rondas=20):
+    """
+    Prueba de estrés: muchas sesiones de una misma Gramatica analizando a
+    la vez desde un pool de hilos; cada resultado (error, mensajes y
+    símbolos) debe coincidir con el del análisis en serie. Con el GIL los
+    hilos no escalan; en un Python sin GIL (3.13t) es la misma prueba.
+    """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    gramatica = Gramatica()
+    programas = _programas_hilos()
+    referencia = [_analizar_en(gramatica.sesion(), texto) for texto in programas]
+    tareas = list(range(len(programas))) * rondas
+
+    locales = threading.local()
+
+    def una(i):
+        sesion = getattr(locales, 'sesion', None)
+        if sesion is None:
+            sesion = locales.sesion = gramatica.sesion()
+        return i, _analizar_en(sesion, programas[i])
+
+    def serie():
+        sesion = gramatica.sesion()
+        for i in tareas:
+            _analizar_en(sesion, programas[i])
+
+    def en_hilos():
+        with ThreadPoolExecutor(hilos) as pool:
+            distintos = sum(resultado != referencia[i] for i, resultado in pool.map(una, tareas))
+        if distintos:
+            raise AssertionError(f"{distintos} análisis en hilos difieren del análisis en serie")
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"hilos: {hilos}, GIL {'activado' if gil else 'desactivado'}")
+    informar('serie', medir(serie, 3), len(tareas), 'ficheros')
+    informar('hilos', medir(en_hilos, 3), len(tareas), 'ficheros')
+
+#endregion
+
+
+#
+#region TRADUCCIÓN
+#
+
+def generar_bucle(n):
+    """Programa con un bucle de n vueltas: trabajo de ejecución, no de análisis."""
+    return (f"int i = 0\nint s = 0\nwhile i < {n}:\n{{\n"
+            "    s = s + i * i / 3\n    i = i + 1\n}\n")
+
+
+def bench_traduccion(n=5000, vueltas=1_000_000):
+    """compilar() en frío y desde la caché marshal, y ejecución del código traducido."""
+    import shutil
+    import tempfile
+    from transpilador import DIR_CACHE, compilar, ejecutar
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'programa.vp')
+        texto = generar_expresiones(n)
+
+        def en_frio():
+            shutil.rmtree(os.path.join(directorio, DIR_CACHE), ignore_errors=True)
+            compilar(ruta, texto)
+
+        informar('traduccion_frio', medir(en_frio), n, 'sentencias', len(texto))
+        informar('traduccion_cache', medir(lambda: compilar(ruta, texto)), n, 'sentencias', len(texto))
+
+        codigo = compilar(ruta, generar_bucle(vueltas))['codigo']
+        informar('ejecucion', medir(lambda: ejecutar(codigo), 3), vueltas, 'vueltas')
+
+#endregion
+
+
+#
+#region LÍNEAS VACÍAS
+#
+
+def generar_comentado(n):
+    """Programa en el que la mitad de las líneas están vacías o son comentarios."""
+    lineas = ["int a = 1", "int b = 2"]
+    for i in range(n):
+        lineas.append(f"int x{i} = a * b + {i}")
+        if i % 3 == 0:
+            lineas += ["", "# comentario de la sentencia siguiente"]
+        elif i % 3 == 1:
+            lineas.append("    ")
+    return '\n'.join(lineas) + '\n'
+
+
+def bench_lineas_vacias(n=20000):
+    """AST completo de un fichero comentado; NEWLINE por tramo, no por línea."""
+    texto = generar_comentado(n)
+    parser = ParserClass('benchmark')
+
+    def una():
+        parser.reiniciar()
+        parser.parse(texto)
+
+    informar('lineas_vacias', medir(una), n, 'sentencias', len(texto))
+    lexer = LexerClass().lexerObj
+    lexer.input(texto)
+    saltos = sum(t.type == 'NEWLINE' for t in lexer)
+    print(f"lineas_vacias: {saltos} NEWLINE para {texto.count(chr(10))} líneas")
+
+#endregion
+
+
+#
+#region RANGOS
+#
+
+def generar_recorrido(size, vueltas, indice):
+    """'vueltas' recorridos de un vector de 'size' elementos accediendo a v[indice]."""
+    return (f"int[{size}] v\nint d = 0\n"
+            f"for r in 0..{vueltas}:\n{{\n"
+            f"    for i in 0..v.len:\n    {{\n        v[{indice}] = v[{indice}] + i\n    }}\n"
+            "}\n")
+
+
+def bench_rangos(size=10000, vueltas=20):
+    """Código traducido: v[i] demostrado en rango frente a v[i + d], comprobado al ejecutar."""
+    import tempfile
+    from transpilador import compilar, ejecutar
+    with tempfile.TemporaryDirectory() as directorio:
+        for nombre, indice in (('sin_comprobacion', 'i'), ('comprobado', 'i + d')):
+            texto = generar_recorrido(size, vueltas, indice)
+            codigo = compilar(os.path.join(directorio, nombre + '.vp'), texto)['codigo']
+            informar(f"rangos_{nombre}", medir(lambda: ejecutar(codigo), 3), 2 * size * vueltas, 'accesos')
+
+#endregion
+
+
+#
+#region PRELUDIO
+#
+
+def generar_preludio(registros, funciones):
+    """Bloque común de registros y funciones, y un programa corto que los usa."""
+    lineas = []
+    for i in range(registros):
+        lineas += [f"type R{i}:", "{", "    int a, b", "    float c", "}"]
+    for i in range(funciones):
+        lineas += [f"def int f{i}(int n):", "{", "    int y = n * 2 + 1", "    return y", "}"]
+    programa = ["R0 r", "r.a = f0(3)", "int k = f1(4) + 1"]
+    return '\n'.join(lineas) + '\n', '\n'.join(programa) + '\n'
+
+
+def bench_preludio(registros=150, funciones=150):
+    """Programa analizado tras su preludio en el mismo texto, frente a encima de la instantánea."""
+    import tempfile
+    import preludio
+    comun, programa = generar_preludio(registros, funciones)
+    parser = ParserClass('benchmark', debug=False)
+
+    def junto():
+        parser.reiniciar()
+        parser.comprobar(comun + programa)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'preludio.viper')
+        with open(ruta, 'w') as f:
+            f.write(comun)
+        instantanea = preludio.preparar(ruta)['instantanea']
+
+        def encima():
+            parser.reiniciar()
+            preludio.aplicar(parser, instantanea)
+            parser.comprobar(programa)
+
+        informar('preludio_junto', medir(junto), 1, 'programas')
+        informar('preludio_instantanea', medir(encima), 1, 'programas')
+        print(f"preludio: instantánea de {len(instantanea) / 1024:.0f} KB")
+
+#endregion
+
+
+#
+#region DIAGNÓSTICOS
+#
+
+def generar_basura(n, semilla=1):
+    """n bytes aleatorios leídos como latin-1: muchos caracteres ilegales."""
+    import random
+    azar = random.Random(semilla)
+    return bytes(azar.randrange(256) for _ in range(n)).decode('latin-1')
+
+
+def bench_diagnosticos(n=500_000):
+    """Léxico de un fichero basura: cada error escrito al momento frente al colector."""
+    import io
+    from diagnosticos import Diagnosticos
+    texto = generar_basura(n)
+    lexer = LexerClass().lexerObj
+
+    def analizar(colector):
+        lexer.salida = io.StringIO()
+        lexer.diagnosticos = colector
+        lexer.input(texto)
+        for _ in lexer:
+            pass
+        return colector.texto() if colector is not None else lexer.salida.getvalue()
+
+    impresos = analizar(None).count('\n')
+    recogidos = analizar(Diagnosticos()).count('\n')
+    informar('diagnosticos_impresos', medir(lambda: analizar(None), 3), n, 'bytes')
+    informar('diagnosticos_colector', medir(lambda: analizar(Diagnosticos()), 3), n, 'bytes')
+    print(f"diagnosticos: {impresos} líneas impresas, {recogidos} con el colector")
+
+#endregion
+
+
+#
+#region SUBINTÉRPRETES
+#
+
+def bench_subinterpretes(copias=8, trabajadores=None):
+    """
+    Tubería de main.py para un corpus: en serie, en un pool de procesos y,
+    si este Python los tiene (3.14+), en subintérpretes.
+    """
+    import tempfile
+    import subinterpretes
+    programas = _programas_hilos() + [generar_expresiones(3000)]
+    with tempfile.TemporaryDirectory() as directorio:
+        for c in range(copias):
+            for i, texto in enumerate(programas):
+                with open(os.path.join(directorio, f"p{c}_{i}.viper"), 'w') as f:
+                    f.write(texto)
+        rutas = subinterpretes.corpus([directorio])
+
+        def serie():
+            for ruta in rutas:
+                subinterpretes._tarea(ruta)
+
+        subinterpretes._tarea(rutas[0])      # ParserClass de este proceso ya construido
+        informar('subinterpretes_serie', medir(serie, 1), len(rutas), 'ficheros')
+        modos = [subinterpretes.PROCESOS]
+        if subinterpretes.disponible():
+            modos.append(subinterpretes.INTERPRETES)
+        else:
+            print("subinterpretes: sin InterpreterPoolExecutor (Python < 3.14), solo procesos")
+        for modo in modos:
+            stats = subinterpretes.analizar_ficheros([directorio], trabajadores, modo)
+            informar(f"subinterpretes_{modo}", stats['segundos'], stats['ficheros'], 'ficheros',
+                     stats['bytes'])
+
+#endregion
+
+
+#
+#region REPL
+#
+
+def bench_repl(n=2000):
+    """
+    Una sentencia más en el REPL (también con un vector grande definido)
+    frente a volver a analizar todo el programa.
+    """
+    from repl import Repl
+    lineas = generar_expresiones(n).splitlines()
+    repl = Repl()
+    for linea in lineas:
+        repl.entrada(linea)
+    sentencia = "int nueva = a * b + 1"
+    programa = '\n'.join(lineas + [sentencia]) + '\n'
+
+    def entrada():
+        repl.entrada(sentencia)
+        repl.parser.entorno.pop('nueva', None)
+
+    def todo():
+        repl.parser.reiniciar()
+        repl.parser.comprobar(programa)
+
+    informar('repl_sentencia', medir(entrada), 1, 'sentencias')
+    # lo que cuesta una entrada no depende de lo grande que sea lo ya definido
+    repl.entrada("int[1000000] grande")
+    informar('repl_sentencia_con_vector', medir(entrada), 1, 'sentencias')
+    informar('repl_programa_entero', medir(todo, 3), 1, 'programas')
+
+#endregion
+
+
+BENCHMARKS = {
+    'expresiones': bench_expresiones,
+    'comentarios': bench_comentarios,
+    'lexico_paralelo': bench_lexico_paralelo,
+    'driver_lr': bench_driver_lr,
+    'dos_velocidades': bench_dos_velocidades,
+    'carga': bench_carga,
+    'vectores': bench_vectores,
+    'nodos': bench_nodos,
+    'consultas': bench_consultas,
+    'hilos': bench_hilos,
+    'traduccion': bench_traduccion,
+    'lineas_vacias': bench_lineas_vacias,
+    'rangos': bench_rangos,
+    'preludio': bench_preludio,
+    'diagnosticos': bench_diagnosticos,
+    'subinterpretes': bench_subinterpretes,
+    'repl': bench_repl,
+}
+
+
+if __name__ == '__main__':
+    for nombre in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[nombre]()
@@ -0,0 +1,409 @@
+"""
+Comprobaciones de que los caminos rápidos dan lo mismo que los de siempre.
+
+  hilos            sesiones de una Gramatica en un pool de hilos frente
+                   al análisis en serie
+  lexico_paralelo  tokenizar() por trozos en procesos frente al lexer en serie
+  nodos            los nodos compartidos se reutilizan, dejan de valer al
+                   cambiar el entorno y no cambian ningún resultado
+  consultas        editar una función no reanaliza las demás (corte
+                   temprano) y las respuestas son las de un motor nuevo
+  optimizador      el programa optimizado da los mismos valores que el
+                   original al traducirlo y ejecutarlo
+  traduccion       el código de la caché resuelve las rutas de 'load' contra
+                   el directorio del fuente, aunque se mueva o cambie el actual
+  vectores         aplicar() y operar(), con y sin NumPy, dan lo mismo
+                   (valores y excepciones) que el código traducido
+                   elemento a elemento; los vectores de 'load' sobreviven
+                   a pickle; un preludio no puede usar 'load'
+
+Cada una lanza AssertionError si algo no coincide.
+
+Uso: python comprobaciones.py [nombre ...]
+Sin nombres se ejecutan todas las de COMPROBACIONES; sale con 1 si falla alguna.
+"""
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark import _programas_hilos, generar_fichero_grande, generar_funciones
+from diagnosticos import Diagnosticos
+from lexer import LexerClass
+import lexer_paralelo
+from nodos import MAXIMO, TablaNodos
+from parser import Gramatica
+
+
+def analizar(sesion, texto, maximo=MAXIMO):
+    """(primer error, mensajes, tabla de símbolos) de 'texto' en 'sesion'."""
+    sesion.reiniciar()
+    sesion.nodos = TablaNodos(maximo)
+    sesion.lexer.salida = io.StringIO()
+    error = sesion.comprobar(texto)
+    if error is not None:
+        error = (error['error'], *sesion.posicion(error))
+    simbolos = {n: str(info['type']) for n, info in sesion.entorno.items()
+                if isinstance(info, dict)}
+    return error, sesion.lexer.salida.getvalue(), simbolos
+
+
+#
+#region HILOS
+#
+
+def comprobar_hilos(hilos=8, rondas=5):
+    gramatica = Gramatica()
+    programas = _programas_hilos()
+    referencia = [analizar(gramatica.sesion(), texto) for texto in programas]
+    locales = threading.local()
+
+    def una(i):
+        sesion = getattr(locales, 'sesion', None)
+        if sesion is None:
+            sesion = locales.sesion = gramatica.sesion()
+        return i, analizar(sesion, programas[i])
+
+    with ThreadPoolExecutor(hilos) as pool:
+        distintos = [i for i, resultado in pool.map(una, list(range(len(programas))) * rondas)
+                     if resultado != referencia[i]]
+    assert not distintos, f"{len(distintos)} análisis en hilos difieren del análisis en serie"
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    return f"{len(programas) * rondas} análisis en {hilos} hilos (GIL {'activado' if gil else 'desactivado'})"
+
+#endregion
+
+
+#
+#region LÉXICO PARALELO
+#
+
+def _texto_paralelo(n):
+    """Fichero grande con tramos de líneas vacías y de comentarios, y caracteres ilegales."""
+    lineas = generar_fichero_grande(n).splitlines(keepends=True)
+    for i in range(0, len(lineas), 50):
+        lineas[i] += "\n   \n# comentario\n\n"
+    for i in range(25, len(lineas), 500):
+        lineas[i] = "int $ = 1\n"
+    return ''.join(lineas)
+
+
+def comprobar_lexico_paralelo(n=40_000, trabajadores=4):
+    texto = _texto_paralelo(n)
+    assert len(texto) >= lexer_paralelo.UMBRAL, "el texto es demasiado corto para partirlo"
+    clave = lambda toks: [(t.type, t.value, t.lineno, t.lexpos, getattr(t, 'codigo', None))
+                          for t in toks]
+
+    lexer = LexerClass().lexerObj
+    en_serie = Diagnosticos()
+    lexer.diagnosticos = en_serie
+    lexer.input(texto)
+    serie = clave(lexer)
+
+    en_paralelo = Diagnosticos()
+    paralelo = clave(lexer_paralelo.tokenizar(texto, trabajadores, en_paralelo))
+
+    assert serie == paralelo, "el flujo paralelo difiere del serie"
+    assert en_serie.lineas() == en_paralelo.lineas(), "los errores léxicos en paralelo difieren"
+    return f"{len(serie)} tokens y los mismos errores léxicos con {trabajadores} procesos"
+
+#endregion
+
+
+#
+#region NODOS COMPARTIDOS
+#
+
+# (programa, error esperado o None): la misma expresión con otro entorno
+# no puede reutilizar el nodo de antes
+_ENTORNOS = [
+    # 'a + 1' es float fuera y int dentro de f (el parámetro tapa a la global)
+    ("float a = 1.5\nfloat y = a + 1\ndef int f(int a):\n{\n    int r = a + 1\n    return r\n}\n",
+     None),
+    ("int a = 1\nint y = a + 1\ndef int f(float a):\n{\n    int r = a + 1\n    return 1\n}\n",
+     "No se puede inicializar int con float"),
+    # la misma llamada antes y después de otra función con distinto prototipo
+    ("def int f(int n):\n{\n    return n\n}\nint x = f(1)\n"
+     "def float g(int n):\n{\n    return 1.5\n}\nint y = f(1)\n",
+     None),
+]
+
+
+def comprobar_nodos():
+    gramatica = Gramatica()
+    sesion = gramatica.sesion()
+
+    # 1) Se comparten: la misma expresión con el mismo entorno es el mismo nodo
+    sesion.reiniciar()
+    programa = sesion.parse("int a = 1\nint b = a * 2 + 3\nint c = a * 2 + 3\n")
+    assert programa[1]['decls'][0][1] is programa[2]['decls'][0][1], "no se comparte 'a * 2 + 3'"
+
+    # 2) Dejan de valer cuando cambia el entorno
+    for texto, esperado in _ENTORNOS:
+        error, _, _ = analizar(sesion, texto)
+        mensaje = error and error[0]
+        assert mensaje == esperado, f"{texto!r}: se esperaba {esperado!r} y sale {mensaje!r}"
+
+    # 3) Compartir no cambia nada: lo mismo que sin tabla (guarda 0 nodos)
+    programas = _programas_hilos() + [texto for texto, _ in _ENTORNOS]
+    for texto in programas:
+        assert analizar(sesion, texto) == analizar(sesion, texto, maximo=0), \
+            f"con nodos compartidos cambia el resultado de {texto[:40]!r}"
+    return f"{len(programas)} programas iguales con y sin nodos compartidos"
+
+#endregion
+
+
+#
+#region CONSULTAS
+#
+
+def comprobar_consultas(n=50):
+    from consultas import Consultas
+    texto = generar_funciones(n)
+    nombres = [f"f{i}" for i in range(n)]
+
+    consultas = Consultas()
+    analizados = []
+    analizar_elemento = consultas._analizar
+
+    def espia(sesion, elemento, diagnosticos):
+        analizados.append(elemento)
+        return analizar_elemento(sesion, elemento, diagnosticos)
+
+    consultas._analizar = espia
+    consultas.fijar_fuente(texto)
+    for nombre in nombres:
+        consultas.diagnosticos_funcion(nombre)
+
+    # f1 gana una línea (con un error): todo lo que sigue se mueve
+    i = texto.index("def int f1(")
+    editado = texto[:i] + texto[i:].replace("    int c = a * b + 1\n",
+                                            "    int c = a * b + 1\n    c = true\n", 1)
+    consultas.fijar_fuente(editado)
+    analizados.clear()
+    respuestas = {nombre: consultas.diagnosticos_funcion(nombre) for nombre in nombres}
+    assert len(analizados) == 1, f"editar f1 reanaliza {len(analizados)} elementos, no 1"
+
+    # las respuestas, líneas incluidas, son las de un motor que no ha visto la edición
+    nuevo = Consultas()
+    nuevo.fijar_fuente(editado)
+    for nombre in nombres:
+        assert respuestas[nombre] == nuevo.diagnosticos_funcion(nombre), \
+            f"los diagnósticos de {nombre} difieren de los de un análisis nuevo"
+    assert respuestas['f1'], "el error añadido en f1 no aparece"
+    lineas = editado.count('\n') + 1
+    assert all(nuevo.tipo_en_linea(l) == consultas.tipo_en_linea(l) for l in range(1, lineas)), \
+        "algún tipo por línea difiere del de un análisis nuevo"
+    return f"1 de {n} funciones reanalizada tras editar otra"
+
+#endregion
+
+
+#
+#region OPTIMIZADOR
+#
+
+# Programas cuyo resultado no puede cambiar al optimizar
+_OPTIMIZABLES = [
+    # v solo se lee a través de v.len: su declaración no es un almacén muerto
+    "int[4] v\nint s = 0\nfor i in 0..v.len:\n{\n    s = s + i\n}\n",
+    "int a = 3\nint b = a * 2 + 1\nint c = a * 2 + 1\nint d = 7\nd = 8\n",
+]
+
+
+def comprobar_optimizador():
+    import os
+    import tempfile
+    from transpilador import compilar, ejecutar
+    with tempfile.TemporaryDirectory() as directorio:
+        for i, texto in enumerate(_OPTIMIZABLES):
+            ruta = os.path.join(directorio, f"programa{i}.vp")
+            original = compilar(ruta, texto, pases=())
+            optimizado = compilar(ruta, texto)
+            assert original['error'] is None, f"{texto!r} no pasa el análisis"
+            try:
+                resultado = ejecutar(optimizado['codigo'])
+            except NameError as e:
+                raise AssertionError(f"el optimizador quita una variable que se usa en {texto!r}: {e}")
+            esperado = ejecutar(original['codigo'])
+            assert resultado == esperado, f"optimizado da {resultado!r} y sin optimizar {esperado!r}"
+    return f"{len(_OPTIMIZABLES)} programas dan lo mismo optimizados"
+
+#endregion
+
+
+#
+#region TRADUCCIÓN
+#
+
+def comprobar_traduccion():
+    import os
+    import shutil
+    import struct
+    import tempfile
+    from transpilador import compilar, ejecutar
+
+    actual = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        origen = os.path.join(directorio, 'origen')
+        os.makedirs(os.path.join(origen, 'datos'))
+        with open(os.path.join(origen, 'datos', 'v.bin'), 'wb') as f:
+            f.write(struct.pack('<3q', 5, 6, 7))
+        with open(os.path.join(origen, 'programa.vp'), 'w') as f:
+            f.write('int[3] v load "datos/v.bin"\nint x = v[1] + v[2]\n')
+        try:
+            # se traduce con una ruta relativa al directorio actual...
+            os.chdir(directorio)
+            primera = compilar(os.path.join('origen', 'programa.vp'))
+            assert primera['error'] is None and not primera['cache'], primera['error']
+            assert ejecutar(primera['codigo'])['x'] == 13
+            # ...y se ejecuta desde la caché con el árbol movido y desde otro sitio
+            movido = os.path.join(directorio, 'movido')
+            shutil.move(origen, movido)
+            os.chdir(os.path.join(movido, 'datos'))
+            segunda = compilar(os.path.join('..', 'programa.vp'))
+            assert segunda['cache'], "la segunda traducción no viene de la caché"
+            x = ejecutar(segunda['codigo'])['x']
+            assert x == 13, f"desde la caché x = {x}"
+        finally:
+            os.chdir(actual)
+    return "una ruta de 'load' sigue valiendo con el código de la caché movido"
+
+#endregion
+
+
+#
+#region VECTORES
+#
+
+def _con_y_sin_numpy(f):
+    """Ejecuta f() con el valor de vectores.USAR_NUMPY de siempre y sin NumPy."""
+    import vectores
+    antes = vectores.USAR_NUMPY
+    try:
+        for usar in dict.fromkeys((antes, False)):
+            vectores.USAR_NUMPY = usar
+            f()
+    finally:
+        vectores.USAR_NUMPY = antes
+    return 'con y sin NumPy' if antes else 'sin NumPy'
+
+
+# (operación, operando izquierdo, derecho): listas con None (sin valor) o escalares
+_OPERACIONES = [
+    ('DIV', [-7, 7, 2 ** 53 + 1, -(2 ** 62) - 1, None], [2, -2, 1, 3, 0]),
+    ('DIV', [2 ** 63 - 1, -(2 ** 63)], 7),
+    ('DIV', [1, 2, 3], [1, 0, 1]),
+    ('DIV', [1.5, -2.5], 0.0),
+    ('DIV', [1.5, -2.5, None], [2, -4, 0]),
+    ('MUL', [2 ** 31, 3, None], [2 ** 31, -3, 5]),
+    ('SUM', [1, 2 ** 62], [2.5, 1.0]),
+    ('RES', [5, -5], 7),
+]
+_FUNCIONES = [
+    ('sin', [0.5, -3.0, None]), ('cos', [1.0, 2.0]), ('exp', [1.0, -2.0, None]),
+    ('log', [1.0, 10.0, None]), ('log', [2.0, 0.0]), ('log', [-1.0]),
+    ('exp', [1.0, 1000.0]), ('sin', [float('inf')]),
+]
+
+
+def _resultado(f):
+    """Valor (como lista) o tipo de excepción de f()."""
+    try:
+        return list(f())
+    except (ArithmeticError, ValueError) as e:
+        return type(e).__name__
+
+
+def _vector(valores):
+    from vectores import crear_valores
+    base = 'float' if any(isinstance(v, float) for v in valores) else 'int'
+    vector = crear_valores(base, len(valores))
+    for i, v in enumerate(valores):
+        vector[i] = v
+    return vector
+
+
+def _comprobar_operaciones():
+    import transpilador
+    from vectores import aplicar, operar, tramo
+    # la referencia: el preámbulo del código traducido, elemento a elemento
+    traducido = {}
+    exec(transpilador._PREAMBULO, traducido)
+    escalares = {'SUM': lambda a, b: a + b, 'RES': lambda a, b: a - b,
+                 'MUL': lambda a, b: a * b, 'DIV': lambda a, b: a / b}
+
+    def referencia(op, xs, ys):
+        ys = ys if isinstance(ys, list) else [ys] * len(xs)
+        flotante = any(isinstance(v, float) for v in xs + ys)
+        div = escalares[op] if op != 'DIV' or flotante else traducido['_viper_div']
+        return [None if a is None or b is None else div(a, b) for a, b in zip(xs, ys)]
+
+    for op, xs, ys in _OPERACIONES:
+        esperado = _resultado(lambda: referencia(op, xs, ys))
+        der = _vector(ys) if isinstance(ys, list) else ys
+        obtenido = _resultado(lambda: operar(op, _vector(xs), der))
+        assert obtenido == esperado, f"operar({op!r}, {xs}, {ys}) da {obtenido}, no {esperado}"
+    for funcion, xs in _FUNCIONES:
+        escalar = traducido['_viper_' + funcion]
+        esperado = _resultado(lambda: [None if v is None else escalar(v) for v in xs])
+        obtenido = _resultado(lambda: aplicar(funcion, _vector(xs)))
+        assert obtenido == esperado, f"aplicar({funcion!r}, {xs}) da {obtenido}, no {esperado}"
+    assert list(tramo(_vector([1, 2, 3, 4]), 1, 3)) == [2, 3], "tramo() no da v[1:3]"
+
+
+def comprobar_vectores():
+    import os
+    import pickle
+    import struct
+    import tempfile
+    from vectores import cargar
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'datos.bin')
+        with open(ruta, 'wb') as f:
+            f.write(struct.pack('<4q', 1, 2, 3, 4))
+
+        def serializar():
+            v = cargar(ruta, 'int', 4)
+            v[1], v[2] = 20, None
+            copia = pickle.loads(pickle.dumps(v))
+            assert list(copia) == [1, 20, None, 4], f"{type(v).__name__} tras pickle: {list(copia)}"
+
+        donde = _con_y_sin_numpy(serializar)
+        _con_y_sin_numpy(_comprobar_operaciones)
+
+        # un preludio no puede cargar: su instantánea no vería cambiar el fichero
+        import preludio
+        ruta_preludio = os.path.join(directorio, 'preludio.vp')
+        with open(ruta_preludio, 'w') as f:
+            f.write('int[4] d load "datos.bin"\n')
+        error = preludio.preparar(ruta_preludio)['error']
+        assert error and "'load' no se admite" in error, f"el preludio con 'load' da {error!r}"
+    return (f"{len(_OPERACIONES) + len(_FUNCIONES)} operaciones como el código traducido y "
+            f"un vector de 'load' sobrevive a pickle {donde}; un preludio no puede cargar")
+
+#endregion
+
+
+COMPROBACIONES = {
+    'hilos': comprobar_hilos,
+    'lexico_paralelo': comprobar_lexico_paralelo,
+    'nodos': comprobar_nodos,
+    'consultas': comprobar_consultas,
+    'optimizador': comprobar_optimizador,
+    'traduccion': comprobar_traduccion,
+    'vectores': comprobar_vectores,
+}
+
+
+if __name__ == '__main__':
+    fallos = 0
+    for nombre in sys.argv[1:] or COMPROBACIONES:
+        try:
+            print(f"{nombre}: bien, {COMPROBACIONES[nombre]()}")
+        except AssertionError as e:
+            fallos += 1
+            print(f"{nombre}: FALLO, {e}")
+    sys.exit(1 if fallos else 0)
@@ -0,0 +1,468 @@
+"""
+Análisis semántico bajo demanda: un motor de consultas memoizadas.
+
+El análisis normal comprueba todo el fichero en las acciones de la
+gramática. Aquí las preguntas ("tipo de la expresión de la línea L",
+"diagnósticos de la función f", "campos del registro R") se responden
+analizando solo lo que hace falta:
+
+1. La fuente se parte, con un escaneo barato (sin lexer ni parser), en
+   elementos de primer nivel: funciones, registros, imports y sentencias.
+2. Una función se analiza sola, con un entorno hecho de los registros y
+   prototipos que nombra y que están definidos antes que ella (su cuerpo
+   no ve las variables globales). Un registro, igual con los registros
+   que usa. Las sentencias globales dependen del orden y de los valores,
+   así que se analiza el prefijo del fichero hasta ellas.
+3. Cada consulta guarda su resultado, la revisión en que se verificó, la
+   revisión en que cambió por última vez y las consultas que leyó. Al
+   cambiar la fuente no se borra nada: una consulta se recalcula solo si
+   alguna de sus dependencias cambió, y si al recalcularla da lo mismo
+   que antes cuenta como no cambiada (corte temprano), así que editar una
+   función no invalida el análisis de las demás.
+4. Para que el corte temprano funcione aunque la edición mueva lo que
+   viene detrás, el análisis de una función o registro solo lee su texto
+   y su entorno, nunca su posición: se analiza con líneas relativas al
+   elemento y una consulta aparte, barata, suma su línea de inicio a los
+   diagnósticos.
+"""
+import hashlib
+import io
+import re
+
+from diagnosticos import Diagnostico, Diagnosticos
+from mapa_fuente import MapaFuente
+
+# Lo que el escaneo necesita ver: comentarios y literales (que pueden
+# ocultar llaves, ':' o saltos de línea), llaves, paréntesis (los
+# argumentos de una llamada se separan con saltos de línea), ':' y saltos
+# de línea.
+# Mismo orden de prioridad que en LexerClass: t_CARACTER antes que t_COMMLinit
+_ESCANER = re.compile(r"'[^']'|'''.*?(?:'''|\Z)|\"[^\"\n]*\"|\#[^\n]*|[{}():\n]", re.S)
+_NOMBRE = re.compile(r'[a-zA-Z_\u0080-\u00FF][a-zA-Z_0-9\u0080-\u00FF]*')
+_CABECERAS = (
+    ('funcion', re.compile(r'def\s+\w+\s*(?:\[\s*\w+\s*\])?\s+(\w+)')),
+    ('registro', re.compile(r'type\s+(\w+)')),
+    ('import', re.compile(r'import\s+(\w+)')),
+)
+
+_FUENTE = ('fuente',)     # la única entrada del motor
+
+
+def _iguales(a, b):
+    try:
+        return bool(a == b)
+    except ValueError:
+        # vectores de numpy: == compara elemento a elemento; se da por cambiado
+        return False
+
+
+#
+#region 1. ELEMENTOS DE PRIMER NIVEL
+#
+
+def elementos(texto):
+    """
+    Partición de 'texto' en elementos de primer nivel, en orden. Cada uno
+    es un dict con 'clase' ('funcion', 'registro', 'import' o
+    'sentencia'), 'nombre', 'texto' (incluye las líneas en blanco y
+    comentarios que lo preceden), 'inicio'/'fin' (offsets), 'linea_inicio'
+    (línea de 'inicio') y 'linea' (línea de su primer carácter de código).
+    Un elemento acaba en un salto de línea fuera de llaves y paréntesis
+    que no sigue a ':'.
+    """
+    resultado = []
+    inicio = 0              # offset donde empieza el elemento en curso
+    codigo = None           # offset de su primer carácter de código
+    anterior = None         # último carácter de código visto
+    profundidad = 0
+    pos = 0
+    lineas = 1              # línea de 'inicio'
+
+    def ver_hueco(desde, hasta):
+        nonlocal codigo, anterior
+        hueco = texto[desde:hasta]
+        limpio = hueco.strip(' \t\r')
+        if limpio:
+            if codigo is None:
+                codigo = desde + len(hueco) - len(hueco.lstrip(' \t\r'))
+            anterior = limpio[-1]
+
+    for m in _ESCANER.finditer(texto):
+        ver_hueco(pos, m.start())
+        pos = m.end()
+        s = m.group()
+        if s[0] == '#' or s.startswith("'''"):
+            continue
+        if s != '\n':
+            if codigo is None:
+                codigo = m.start()
+            anterior = s[-1] if s in '{}():' else '"'
+            if s in '{(':
+                profundidad += 1
+            elif s in '})':
+                profundidad = max(0, profundidad - 1)
+            continue
+        if codigo is None or profundidad or anterior == ':':
+            continue
+        resultado.append(_elemento(texto, inicio, codigo, pos, lineas))
+        lineas += texto.count('\n', inicio, pos)
+        inicio, codigo, anterior = pos, None, None
+    ver_hueco(pos, len(texto))
+    if codigo is not None:
+        resultado.append(_elemento(texto, inicio, codigo, len(texto), lineas))
+    return resultado
+
+
+def _elemento(texto, inicio, codigo, fin, linea_inicio):
+    clase, nombre = 'sentencia', None
+    for c, patron in _CABECERAS:
+        m = patron.match(texto, codigo)
+        if m:
+            clase, nombre = c, m.group(1)
+            break
+    return {'clase': clase, 'nombre': nombre, 'texto': texto[inicio:fin],
+            'inicio': inicio, 'fin': fin, 'linea_inicio': linea_inicio,
+            'linea': linea_inicio + texto.count('\n', inicio, codigo)}
+
+
+def _tipo_de(nodo):
+    """Tipo de la expresión principal de una sentencia."""
+    kind = nodo.get('node')
+    if kind == 'decl':
+        inits = [init for _, init in nodo['decls'] if isinstance(init, dict)]
+        return inits[-1].get('tipo') if inits else nodo['tipo_var']
+    if kind in ('if', 'while'):
+        return nodo['cond'].get('tipo')
+    if kind == 'funcion':
+        return nodo['ret_type']
+    return nodo.get('tipo')
+
+
+def _tipos_por_linea(sentencias, acc):
+    """{línea: tipo} de las sentencias que llevan línea, incluidas las anidadas."""
+    for s in sentencias:
+        if not isinstance(s, dict) or 'error' in s:
+            continue
+        if 'line' in s and s['line'] not in acc:
+            acc[s['line']] = _tipo_de(s)
+        for bloque in ('then', 'else', 'body', 'cuerpo'):
+            if isinstance(s.get(bloque), list):
+                _tipos_por_linea(s[bloque], acc)
+    return acc
+
+#endregion
+
+
+#
+#region 2. MOTOR DE CONSULTAS
+#
+
+class _Memo:
+    __slots__ = ('valor', 'verificada', 'cambiada', 'dependencias')
+
+
+class Consultas:
+    """
+    Consultas sobre una fuente que va cambiando (fijar_fuente). Las
+    públicas son tipo_en_linea, diagnosticos_funcion y campos_registro;
+    'interfaces' son las de los módulos importables, como en ParserClass.
+    """
+
+    def __init__(self, interfaces=None, gramatica=None):
+        self.revision = 1
+        self.interfaces = interfaces or {}
+        self._fuente = ''
+        self._fuente_cambiada = 1
+        self._memo = {}
+        self._activas = []          # dependencias de cada consulta en curso
+        self._gramatica = gramatica
+        self._sesion = None
+        self.calculadas = 0         # consultas (re)calculadas, para medir
+
+    def fijar_fuente(self, texto):
+        """Nueva versión de la fuente; no analiza nada hasta que se pregunte."""
+        if texto != self._fuente:
+            self.revision += 1
+            self._fuente = texto
+            self._fuente_cambiada = self.revision
+
+    # — consultas públicas —
+
+    def tipo_en_linea(self, linea):
+        """Tipo de la expresión principal de la sentencia de 'linea', o None."""
+        return self._pedir(('tipo_en_linea', linea))
+
+    def diagnosticos_funcion(self, nombre):
+        """Mensajes (léxicos, sintácticos y semánticos) de la función 'nombre', o None si no existe."""
+        return self._pedir(('diagnosticos', 'funcion', nombre))
+
+    def campos_registro(self, nombre):
+        """{campo: tipo} del registro 'nombre', o None si no existe o tiene errores."""
+        return self._pedir(('campos', nombre))
+
+    # — memoización —
+
+    def _pedir(self, clave):
+        memo = self._actualizar(clave)
+        if self._activas:
+            self._activas[-1].append(clave)
+        return memo.valor
+
+    def _leer_fuente(self):
+        if self._activas:
+            self._activas[-1].append(_FUENTE)
+        return self._fuente
+
+    def _cambiada(self, dependencia):
+        if dependencia is _FUENTE:
+            return self._fuente_cambiada
+        return self._actualizar(dependencia).cambiada
+
+    def _actualizar(self, clave):
+        memo = self._memo.get(clave)
+        if memo is not None:
+            if memo.verificada == self.revision:
+                return memo
+            if all(self._cambiada(d) <= memo.verificada for d in memo.dependencias):
+                memo.verificada = self.revision
+                return memo
+
+        self._activas.append([])
+        try:
+            valor = getattr(self, '_calc_' + clave[0])(*clave[1:])
+        finally:
+            dependencias = self._activas.pop()
+        self.calculadas += 1
+
+        if memo is None:
+            memo = self._memo[clave] = _Memo()
+            memo.valor, memo.cambiada = valor, self.revision
+        elif not _iguales(valor, memo.valor):
+            memo.valor, memo.cambiada = valor, self.revision
+        # si es igual se conserva el valor anterior: corte temprano
+        memo.verificada = self.revision
+        memo.dependencias = dependencias
+        return memo
+
+    #endregion
+
+    #
+    #region 3. CONSULTAS INTERNAS
+    #
+
+    def _calc_elementos(self):
+        return elementos(self._leer_fuente())
+
+    def _calc_indice(self):
+        """{(clase, nombre): [posiciones]} de funciones y registros, y posiciones de los imports."""
+        indice = {}
+        for i, e in enumerate(self._pedir(('elementos',))):
+            if e['clase'] != 'sentencia':
+                indice.setdefault((e['clase'], e['nombre']), []).append(i)
+        return indice
+
+    def _calc_elemento(self, clase, nombre):
+        """(posición, elemento) de la primera definición de 'nombre'."""
+        posiciones = self._pedir(('indice',)).get((clase, nombre))
+        if not posiciones:
+            return None
+        i = posiciones[0]
+        return i, self._pedir(('elementos',))[i]
+
+    def _calc_texto(self, clase, nombre):
+        """Texto del elemento, sin su posición: no cambia si solo se mueve."""
+        situado = self._pedir(('elemento', clase, nombre))
+        return None if situado is None else situado[1]['texto']
+
+    def _calc_linea(self, clase, nombre):
+        """Línea del fichero en la que empieza el texto del elemento."""
+        situado = self._pedir(('elemento', clase, nombre))
+        return None if situado is None else situado[1]['linea_inicio']
+
+    def _calc_visibles(self, clase, nombre):
+        """
+        Lo que el elemento nombra y está definido antes que él: registros
+        y funciones del fichero (por su nombre) y módulos importados.
+        """
+        situado = self._pedir(('elemento', clase, nombre))
+        if situado is None:
+            return None
+        i, elem = situado
+        usados = set(_NOMBRE.findall(elem['texto']))
+        indice = self._pedir(('indice',))
+        antes = lambda c, n: any(j < i for j in indice.get((c, n), ()))
+        registros = tuple(sorted(n for n in usados if antes('registro', n)))
+        funciones = tuple(sorted(n for n in usados if antes('funcion', n)))
+        modulos = tuple(n for (c, n), pos in indice.items() if c == 'import' and pos[0] < i)
+        return registros, funciones, modulos
+
+    def _calc_entorno(self, clase, nombre):
+        """(tipos_registro, func_prototypes) con los que se analiza el elemento."""
+        visibles = self._pedir(('visibles', clase, nombre))
+        if visibles is None:
+            return None
+        registros, funciones, modulos = visibles
+        tipos_registro, prototipos = {}, {}
+        for modulo in modulos:
+            interfaz = self.interfaces.get(modulo)
+            if interfaz is not None:
+                tipos_registro.update(interfaz['registros'])
+                prototipos.update(interfaz['funciones'])
+        for r in registros:
+            campos = self._pedir(('campos', r))
+            if campos is not None:
+                tipos_registro[r] = campos
+        for f in funciones:
+            proto = self._pedir(('prototipo', f))
+            if proto is not None:
+                prototipos[f] = proto
+        return tipos_registro, prototipos
+
+    def _calc_analisis(self, clase, nombre):
+        """
+        Análisis aislado de una función o registro: AST, estado final y
+        diagnósticos, con las líneas contadas desde el principio del elemento.
+        """
+        texto = self._pedir(('texto', clase, nombre))
+        if texto is None:
+            return None
+        tipos_registro, prototipos = self._pedir(('entorno', clase, nombre))
+
+        sesion = self._nueva_sesion()
+        sesion.tipos_registro = {n: dict(c) for n, c in tipos_registro.items()}
+        sesion.func_prototypes = {n: dict(p) for n, p in prototipos.items()}
+        if not texto.endswith('\n'):
+            texto += '\n'
+        diagnosticos = Diagnosticos()
+        ast = self._analizar(sesion, texto, diagnosticos)
+        proto = sesion.func_prototypes.get(nombre) if clase == 'funcion' else None
+        return {
+            'ast': ast,
+            'diagnosticos': self._diagnosticos(sesion, ast, diagnosticos),
+            'campos': sesion.tipos_registro.get(nombre) if clase == 'registro' else None,
+            'prototipo': proto and {'params': proto['params'], 'ret_type': proto['ret_type']},
+        }
+
+    def _calc_diagnosticos(self, clase, nombre):
+        """Mensajes del análisis de un elemento, con las líneas del fichero."""
+        analisis = self._pedir(('analisis', clase, nombre))
+        if analisis is None:
+            return None
+        desplazamiento = self._pedir(('linea', clase, nombre)) - 1
+        return [Diagnostico.de_tupla(t, desplazamiento).texto() for t in analisis['diagnosticos']]
+
+    def _calc_campos(self, nombre):
+        analisis = self._pedir(('analisis', 'registro', nombre))
+        return None if analisis is None else analisis['campos']
+
+    def _calc_prototipo(self, nombre):
+        analisis = self._pedir(('analisis', 'funcion', nombre))
+        return None if analisis is None else analisis['prototipo']
+
+    def _calc_situar(self, linea):
+        """(posición, elemento) del elemento que contiene 'linea', o None."""
+        elems = self._pedir(('elementos',))
+        # búsqueda binaria sobre la línea de inicio
+        lo, hi = 0, len(elems)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if elems[mid]['linea_inicio'] <= linea:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        elem = elems[lo - 1]
+        if linea > elem['linea_inicio'] + elem['texto'].count('\n'):
+            return None
+        return lo - 1, elem
+
+    def _calc_prefijo(self, i):
+        """
+        (fin, hash, sentencias) del texto desde el principio hasta el
+        elemento i incluido; 'sentencias' es cuántas entrega el parser
+        (las declaraciones de registro no generan nodo).
+        """
+        elems = self._pedir(('elementos',))
+        fin = elems[i]['fin']
+        sentencias = sum(e['clase'] != 'registro' for e in elems[:i + 1])
+        return fin, hashlib.sha1(self._leer_fuente()[:fin].encode()).hexdigest(), sentencias
+
+    def _calc_tipos_globales(self, i, linea):
+        """
+        {línea: tipo} de la sentencia global i, cuyo código empieza en
+        'linea', analizando el prefijo del fichero que acaba en ella.
+        """
+        fin, _, esperadas = self._pedir(('prefijo', i))
+        # lectura sin dependencia: el prefijo queda fijado por su hash
+        texto = self._fuente[:fin]
+        if not texto.endswith('\n'):
+            texto += '\n'
+        sesion = self._nueva_sesion()
+        sesion.interfaces = self.interfaces
+        sentencias = []
+        sesion.lexer.salida = io.StringIO()
+        sesion.parse_stream(texto, sentencias.append)
+        if len(sentencias) != esperadas:
+            # se cortó antes (error) o la recuperación de errores juntó elementos
+            return {}
+        ultima = sentencias[-1]
+        tipos = _tipos_por_linea([ultima], {})
+        if isinstance(ultima, dict) and 'error' not in ultima and 'line' not in ultima:
+            # sentencia de expresión: no lleva línea, se le pone la del elemento
+            tipos[linea] = ultima.get('tipo')
+        return tipos
+
+    def _calc_tipo_en_linea(self, linea):
+        situado = self._pedir(('situar', linea))
+        if situado is None:
+            return None
+        i, elem = situado
+        if elem['clase'] == 'funcion':
+            analisis = self._pedir(('analisis', 'funcion', elem['nombre']))
+            ast = analisis['ast'] if analisis is not None else None
+            if not isinstance(ast, list):
+                return None
+            # el AST lleva líneas relativas al elemento
+            return _tipos_por_linea(ast, {}).get(linea - elem['linea_inicio'] + 1)
+        if elem['clase'] == 'registro':
+            return None
+        return self._pedir(('tipos_globales', i, elem['linea'])).get(linea)
+
+    #endregion
+
+    #
+    #region 4. ANALIZADOR
+    #
+
+    def _nueva_sesion(self):
+        if self._gramatica is None:
+            from parser import Gramatica
+            self._gramatica = Gramatica()
+        if self._sesion is None:
+            self._sesion = self._gramatica.sesion()
+        self._sesion.reiniciar()
+        return self._sesion
+
+    @staticmethod
+    def _analizar(sesion, texto, diagnosticos):
+        """AST de 'texto', con líneas desde 1; los diagnósticos van a 'diagnosticos'."""
+        sesion.lexer.salida = io.StringIO()
+        sesion.lexer.diagnosticos = diagnosticos
+        sesion.lexer.lineno = 1
+        sesion.lexer.mapa_fuente = MapaFuente(texto)
+        try:
+            return sesion.parse(texto)
+        finally:
+            sesion.lexer.diagnosticos = None
+
+    @staticmethod
+    def _diagnosticos(sesion, ast, diagnosticos):
+        """Diagnósticos resueltos, como tuplas comparables (para el corte temprano)."""
+        errores = ast if isinstance(ast, list) else [ast]
+        for nodo in errores:
+            if isinstance(nodo, dict) and 'error' in nodo:
+                diagnosticos.semantico(sesion, nodo)
+        return tuple(d.como_tupla() for d in diagnosticos.fijar().entradas)
+
+    #endregion
@@ -0,0 +1,440 @@
+"""
+Construcción distribuida de un corpus grande de ficheros Viper.
+
+Un coordinador reparte lotes de ficheros por TCP a trabajadores que
+pueden estar en otras máquinas (no necesitan ver el sistema de ficheros:
+el texto viaja en el lote) y recoge sus resultados.
+
+1. Los ficheros se ordenan de mayor a menor y se agrupan en lotes de
+   unos BYTES_LOTE: los grandes van solos y primero, los pequeños juntos
+   al final. Cada trabajador pide un lote al terminar el anterior, así
+   que el reparto se equilibra solo.
+2. Con cada resultado el coordinador escribe el .token, .symbol y
+   .record de cada fichero junto a su fuente, igual que main.py, y
+   guarda sus diagnósticos.
+3. Si un trabajador se desconecta o no responde en PLAZO_LOTE segundos,
+   su lote vuelve a la cola partido en ficheros sueltos (un fichero que
+   tumba al trabajador no arrastra al resto). Tras REINTENTOS fallos un
+   fichero se da por fallido.
+
+Protocolo: una línea JSON por mensaje.
+
+  trabajador -> {"op": "pedir", "trabajador": "host:pid", "clave": "..."}
+  coordinador -> {"op": "lote", "id": 3, "fuentes": [{"nombre", "texto"}]}
+               | {"op": "fin"}
+  trabajador -> {"op": "resultado", "id": 3, "resultados":
+                 [{"nombre", "token", "symbol", "record", "diagnosticos"}]}
+
+Los resultados vienen en el orden de las fuentes del lote y con su mismo
+nombre; si no, el lote entero se trata como un fallo. Las salidas se
+escriben siempre junto a las rutas del lote, nunca donde diga el
+trabajador. El coordinador solo atiende a quien presenta su clave: la
+que se le da con --clave o VIPER_CLAVE, o una al azar que imprime al
+arrancar si espera trabajadores remotos.
+
+Uso:
+  python coordinador.py servir <directorio | ficheros...> [--puerto N] [--locales N] [--clave C]
+  python coordinador.py trabajar <host:puerto> [--clave C]
+Con --locales N (por defecto, tantos como CPUs) el coordinador arranca N
+trabajadores en esta máquina, y arranca otro si uno muere o se queda sin
+responder mientras quede trabajo; con --locales 0 espera a los remotos.
+"""
+import asyncio
+import contextlib
+import hmac
+import json
+import multiprocessing
+import os
+import secrets
+import socket
+import sys
+import time
+from collections import deque
+
+from lexer import LexerClass
+from diagnosticos import Diagnosticos
+
+EXTENSION = '.viper'
+PUERTO = 7878
+BYTES_LOTE = 256 * 1024
+PLAZO_LOTE = 120.0
+REINTENTOS = 2
+LIMITE_LINEA = 256 * 1024 * 1024
+INTERVALO_VIGILANCIA = 0.5      # segundos entre revisiones de los trabajadores locales
+
+_parser = None      # ParserClass del proceso trabajador
+_lexer = None       # lexer del proceso trabajador: cada fichero usa un clon
+
+
+#
+#region 1. TRABAJADOR
+#
+
+def analizar(texto):
+    """
+    Salidas de un fichero: texto del .token, del .symbol y del .record
+    (None si hay errores) y la lista de diagnósticos.
+    """
+    global _parser, _lexer
+    if _parser is None:
+        from parser import ParserClass
+        _parser = ParserClass(None, debug=False)
+        _lexer = LexerClass().lexerObj
+
+    # un colector para el fichero: con entradas basura no se manda al
+    # coordinador un diagnóstico por carácter
+    diagnosticos = Diagnosticos()
+    # clonar no vuelve a compilar las expresiones regulares del lexer
+    lexer = _lexer.clone()
+    lexer.diagnosticos = diagnosticos
+    lexer.input(texto)
+    token = ''.join(LexerClass.texto_token(tok) for tok in lexer)
+
+    _parser.reiniciar()
+    _parser.lexer.diagnosticos = diagnosticos
+    simbolos = registros = None
+    error = _parser.comprobar(texto)
+    if error is not None:
+        diagnosticos.semantico(_parser, error)
+    else:
+        simbolos, registros = _parser.tablas()
+    return {'token': token, 'symbol': simbolos, 'record': registros,
+            'diagnosticos': diagnosticos.lineas()}
+
+
+def escribir_salidas(ruta, resultado):
+    """Escribe junto a 'ruta' el .token, .symbol y .record de un resultado de analizar()."""
+    base = os.path.splitext(ruta)[0]
+    for ext in ('token', 'symbol', 'record'):
+        if resultado.get(ext) is not None:
+            with open(f"{base}.{ext}", 'w') as f:
+                f.write(resultado[ext])
+
+
+def _enviar(f, mensaje):
+    f.write(json.dumps(mensaje, ensure_ascii=False).encode() + b'\n')
+    f.flush()
+
+
+def trabajar(host, puerto, clave=''):
+    """Pide lotes al coordinador de host:puerto hasta que no queda trabajo."""
+    nombre = f"{socket.gethostname()}:{os.getpid()}"
+    with socket.create_connection((host, puerto)) as s:
+        # el coordinador corta la conexión si no respondemos a tiempo
+        with contextlib.suppress(ConnectionError), s.makefile('rwb') as f:
+            while True:
+                _enviar(f, {'op': 'pedir', 'trabajador': nombre, 'clave': clave})
+                linea = f.readline()
+                if not linea:
+                    return
+                mensaje = json.loads(linea)
+                if mensaje.get('op') != 'lote':
+                    return
+                resultados = []
+                for fuente in mensaje['fuentes']:
+                    try:
+                        resultado = analizar(fuente['texto'])
+                    except Exception as e:
+                        resultado = {'token': None, 'symbol': None, 'record': None,
+                                     'diagnosticos': [f"Error interno: {e}"]}
+                    resultado['nombre'] = fuente['nombre']
+                    resultados.append(resultado)
+                _enviar(f, {'op': 'resultado', 'id': mensaje['id'], 'resultados': resultados})
+
+#endregion
+
+
+#
+#region 2. COORDINADOR
+#
+
+class Lote:
+    __slots__ = ('id', 'rutas', 'bytes', 'intentos')
+
+    def __init__(self, id_, rutas, bytes_, intentos=0):
+        self.id = id_
+        self.rutas = rutas
+        self.bytes = bytes_
+        self.intentos = intentos
+
+
+def corpus(rutas):
+    """Ficheros a analizar: los dados y los *.viper de los directorios (recursivo)."""
+    ficheros = []
+    for ruta in rutas:
+        if not os.path.isdir(ruta):
+            ficheros.append(ruta)
+            continue
+        for raiz, _, nombres in os.walk(ruta):
+            ficheros.extend(os.path.join(raiz, n) for n in sorted(nombres)
+                            if n.endswith(EXTENSION))
+    return ficheros
+
+
+def repartir(tamanos, bytes_lote=BYTES_LOTE):
+    """
+    Lotes de mayor a menor ({ruta: bytes} -> [Lote]): cada uno junta
+    ficheros hasta pasar de bytes_lote.
+    """
+    lotes, actual, acumulado = [], [], 0
+    for tam, ruta in sorted(((t, r) for r, t in tamanos.items()), reverse=True):
+        actual.append(ruta)
+        acumulado += tam
+        if acumulado >= bytes_lote:
+            lotes.append(Lote(len(lotes), actual, acumulado))
+            actual, acumulado = [], 0
+    if actual:
+        lotes.append(Lote(len(lotes), actual, acumulado))
+    return lotes
+
+
+class Coordinador:
+
+    def __init__(self, ficheros, bytes_lote=BYTES_LOTE, plazo=PLAZO_LOTE, reintentos=REINTENTOS,
+                 clave=None):
+        self.plazo = plazo
+        self.reintentos = reintentos
+        self.clave = clave if clave is not None else secrets.token_hex(16)
+        self.tamanos = {ruta: os.path.getsize(ruta) for ruta in ficheros}
+        self.pendientes = deque(repartir(self.tamanos, bytes_lote))
+        self.siguiente_id = len(self.pendientes)
+        self.en_curso = {}                  # id -> Lote
+        self.diagnosticos = {}              # ruta -> líneas
+        self.fallidos = {}                  # ruta -> motivo
+        self.por_trabajador = {}            # nombre -> ficheros terminados
+        self.contadores = {'ficheros': 0, 'bytes': 0, 'lotes': 0, 'reintentos': 0}
+        self.inicio = None
+        self.fin = None
+        self._cambio = None
+        self.terminado = None
+        self._conexiones = {}               # tarea de atender -> escritor
+        self._colgados = set()              # trabajadores ("host:pid") que no respondieron
+
+    async def _siguiente(self):
+        """Próximo lote, o None si ya no queda nada pendiente ni en curso."""
+        async with self._cambio:
+            while not self.pendientes:
+                if not self.en_curso:
+                    return None
+                # lo que está en curso aún puede fallar y volver a la cola
+                await self._cambio.wait()
+            lote = self.pendientes.popleft()
+            self.en_curso[lote.id] = lote
+            return lote
+
+    async def _avisar(self):
+        async with self._cambio:
+            if not self.pendientes and not self.en_curso:
+                self.fin = time.monotonic()
+                self.terminado.set()
+            self._cambio.notify_all()
+
+    async def _fallo(self, lote, motivo):
+        self.en_curso.pop(lote.id, None)
+        lote.intentos += 1
+        if lote.intentos > self.reintentos:
+            for ruta in lote.rutas:
+                self.fallidos[ruta] = motivo
+        else:
+            self.contadores['reintentos'] += 1
+            # vuelve al principio de la cola, fichero a fichero
+            for ruta in reversed(lote.rutas):
+                self.pendientes.appendleft(Lote(self.siguiente_id, [ruta],
+                                                self.tamanos[ruta], lote.intentos))
+                self.siguiente_id += 1
+        await self._avisar()
+
+    def _recoger(self, lote, resultados, trabajador):
+        """
+        Escribe las salidas de un lote terminado junto a sus fuentes.
+        ValueError si los resultados no corresponden al lote: entonces no
+        se escribe nada y el lote sigue en curso.
+        """
+        if not isinstance(resultados, list) or len(resultados) != len(lote.rutas):
+            raise ValueError("resultados de otro lote")
+        for ruta, res in zip(lote.rutas, resultados):
+            if not isinstance(res, dict) or res.get('nombre') != ruta:
+                raise ValueError("resultados de otro lote")
+            if any(res.get(ext) is not None and not isinstance(res[ext], str)
+                   for ext in ('token', 'symbol', 'record')):
+                raise ValueError("salidas mal formadas")
+        del self.en_curso[lote.id]
+        # las rutas salen del lote, no del mensaje del trabajador
+        for ruta, res in zip(lote.rutas, resultados):
+            escribir_salidas(ruta, res)
+            self.diagnosticos[ruta] = res.get('diagnosticos', [])
+        self.contadores['ficheros'] += len(lote.rutas)
+        self.contadores['bytes'] += lote.bytes
+        self.contadores['lotes'] += 1
+        self.por_trabajador[trabajador] = self.por_trabajador.get(trabajador, 0) + len(lote.rutas)
+
+    async def atender(self, lector, escritor):
+        """Conexión de un trabajador: le da lotes hasta que no queda trabajo."""
+        lote = None
+        trabajador = '?'
+        self._conexiones[asyncio.current_task()] = escritor
+        try:
+            while True:
+                # mientras tiene un lote, el trabajador tiene un plazo para responder
+                linea = await asyncio.wait_for(lector.readline(),
+                                               self.plazo if lote is not None else None)
+                if not linea:
+                    break
+                mensaje = json.loads(linea)
+                if mensaje.get('op') == 'resultado' and lote is not None and mensaje.get('id') == lote.id:
+                    self._recoger(lote, mensaje['resultados'], trabajador)
+                    lote = None
+                    await self._avisar()
+                elif mensaje.get('op') == 'pedir' and lote is None:
+                    # en bytes: compare_digest no admite str con caracteres no ASCII
+                    presentada = str(mensaje.get('clave', '')).encode()
+                    if not hmac.compare_digest(presentada, self.clave.encode()):
+                        break
+                    trabajador = mensaje.get('trabajador', '?')
+                    lote = await self._siguiente()
+                    if lote is None:
+                        await _responder(escritor, {'op': 'fin'})
+                        break
+                    fuentes = []
+                    for ruta in lote.rutas:
+                        with open(ruta, 'r') as f:
+                            fuentes.append({'nombre': ruta, 'texto': f.read()})
+                    await _responder(escritor, {'op': 'lote', 'id': lote.id, 'fuentes': fuentes})
+                else:
+                    break       # fuera de protocolo: se trata como un fallo
+        except asyncio.TimeoutError:
+            self._colgados.add(trabajador)
+        except (OSError, asyncio.IncompleteReadError, ValueError, KeyError, AttributeError):
+            pass
+        finally:
+            del self._conexiones[asyncio.current_task()]
+            if lote is not None:
+                await self._fallo(lote, "trabajador caído o sin respuesta")
+            escritor.close()
+
+    async def _vigilar(self, procesos, arrancar):
+        """
+        Sustituye los trabajadores locales que mueren, y mata y sustituye
+        los que se quedan sin responder, mientras quede trabajo.
+        """
+        nombre = socket.gethostname()
+        while not self.terminado.is_set():
+            for i, p in enumerate(procesos):
+                if f"{nombre}:{p.pid}" in self._colgados:
+                    p.kill()
+                if p.exitcode is not None:
+                    p.join()
+                    procesos[i] = arrancar()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.terminado.wait(), INTERVALO_VIGILANCIA)
+
+    async def _despedir(self):
+        """Cierra las conexiones que siguen abiertas cuando ya no queda trabajo."""
+        for escritor in self._conexiones.values():
+            with contextlib.suppress(OSError):
+                escritor.write(json.dumps({'op': 'fin'}).encode() + b'\n')
+            escritor.close()
+        # cada atender ve el cierre y termina por sí solo, sin cancelarlo
+        if self._conexiones:
+            await asyncio.wait(list(self._conexiones), timeout=5)
+
+    async def ejecutar(self, host, puerto, locales):
+        """Sirve lotes hasta terminar; arranca 'locales' trabajadores en esta máquina."""
+        self._cambio = asyncio.Condition()
+        self.terminado = asyncio.Event()
+        self.inicio = time.monotonic()
+        await self._avisar()            # corpus vacío: ya está terminado
+        servidor = await asyncio.start_server(self.atender, host, puerto, limit=LIMITE_LINEA)
+        host, puerto = servidor.sockets[0].getsockname()[:2]
+        contexto = multiprocessing.get_context('spawn')
+
+        def arrancar():
+            p = contexto.Process(target=trabajar, args=(host, puerto, self.clave), daemon=True)
+            p.start()
+            return p
+
+        procesos = [arrancar() for _ in range(locales)]
+        if not locales:
+            print(f"Esperando trabajadores en {host}:{puerto} (clave {self.clave})")
+        try:
+            async with servidor:
+                await self._vigilar(procesos, arrancar)
+                await self._despedir()
+        finally:
+            # con todo recogido, los que sigan arrancando ya no tienen trabajo
+            for p in procesos:
+                p.join(1)
+                if p.is_alive():
+                    p.kill()
+
+    def estadisticas(self):
+        segundos = (self.fin or time.monotonic()) - self.inicio if self.inicio else 0.0
+        return {
+            **self.contadores,
+            'fallidos': len(self.fallidos),
+            'con_diagnosticos': sum(1 for d in self.diagnosticos.values() if d),
+            'segundos': segundos,
+            'ficheros_s': self.contadores['ficheros'] / segundos if segundos else 0.0,
+            'mb_s': self.contadores['bytes'] / segundos / 1e6 if segundos else 0.0,
+            'por_trabajador': dict(self.por_trabajador),
+        }
+
+
+async def _responder(escritor, mensaje):
+    escritor.write(json.dumps(mensaje, ensure_ascii=False).encode() + b'\n')
+    await escritor.drain()
+
+
+def construir(rutas, locales=None, host='127.0.0.1', puerto=0, **opciones):
+    """
+    Analiza el corpus de 'rutas' repartiéndolo entre trabajadores.
+    Devuelve el Coordinador ya terminado (diagnósticos, fallidos y estadísticas).
+    """
+    coordinador = Coordinador(corpus(rutas), **opciones)
+    if locales is None:
+        locales = os.cpu_count() or 1
+    asyncio.run(coordinador.ejecutar(host, puerto, locales))
+    return coordinador
+
+
+def informe(stats):
+    """Texto con el rendimiento total y el reparto por trabajador."""
+    lineas = [f"{stats['ficheros']} ficheros ({stats['bytes'] / 1e6:.2f} MB) en "
+              f"{stats['segundos']:.2f} s: {stats['ficheros_s']:.1f} ficheros/s, "
+              f"{stats['mb_s']:.2f} MB/s",
+              f"lotes={stats['lotes']}, reintentos={stats['reintentos']}, "
+              f"fallidos={stats['fallidos']}, con_diagnosticos={stats['con_diagnosticos']}"]
+    for nombre, n in sorted(stats['por_trabajador'].items()):
+        lineas.append(f"  {nombre}: {n} ficheros")
+    return '\n'.join(lineas)
+
+#endregion
+
+
+def _opcion(args, nombre, defecto, tipo=int):
+    if nombre in args:
+        i = args.index(nombre)
+        valor = tipo(args[i + 1])
+        del args[i:i + 2]
+        return valor
+    return defecto
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] not in ('servir', 'trabajar'):
+        print(__doc__.split('Uso:')[1].split('Con --locales')[0].rstrip())
+        sys.exit(1)
+    args = sys.argv[2:]
+    clave = _opcion(args, '--clave', os.environ.get('VIPER_CLAVE'), str)
+    if sys.argv[1] == 'trabajar':
+        host, _, puerto = args[0].rpartition(':')
+        trabajar(host, int(puerto), clave or '')
+    else:
+        puerto = _opcion(args, '--puerto', PUERTO)
+        locales = _opcion(args, '--locales', None)
+        # con trabajadores remotos se escucha en todas las interfaces
+        host = '0.0.0.0' if locales == 0 else '127.0.0.1'
+        coordinador = construir(args, locales, host, puerto, clave=clave)
+        for ruta, motivo in sorted(coordinador.fallidos.items()):
+            print(f"{ruta}: {motivo}")
+        print(informe(coordinador.estadisticas()))
@@ -0,0 +1,249 @@
+"""
+Diagnósticos de un fichero: errores léxicos, sintácticos y semánticos.
+
+El lexer y el parser informan con LexerClass.informar(). Si el lexer no
+lleva colector (lexer.diagnosticos), el mensaje se escribe en el momento
+en su salida, como siempre. Si lo lleva, el colector lo guarda y:
+  - junta en una sola entrada los caracteres ilegales seguidos;
+  - no repite un mensaje ya guardado: cuenta las veces en la entrada y
+    apunta dónde están las repeticiones (las REPETIDAS primeras), que se
+    escriben con él ("también en líneas 9, 14");
+  - guarda como mucho 'maximo' entradas por fichero y de las demás solo
+    cuenta cuántas se descartan;
+  - no da formato al informar: el texto, la línea y la columna se
+    calculan al exportar, así que un fichero basura no paga un format()
+    ni una búsqueda en el mapa de fuente por carácter;
+  - exporta todo de una vez (texto() o json()), para una sola escritura.
+"""
+import json
+
+# Entradas por fichero; más allá solo se cuentan
+MAXIMO = 100
+
+# Tipos de diagnóstico
+ILEGAL = 'ilegal'
+LEXICO = 'lexico'
+SINTACTICO = 'sintactico'
+SEMANTICO = 'semantico'
+AVISO = 'aviso'
+
+_MUESTRA = 20       # caracteres ilegales que se enseñan de una racha
+REPETIDAS = 10      # repeticiones de un mensaje cuya posición se guarda
+
+
+def _visible(caracteres):
+    return ''.join(c if c.isprintable() else repr(c)[1:-1] for c in caracteres)
+
+
+class Diagnostico:
+    """
+    Un diagnóstico sin formatear: plantilla de str.format con sus
+    argumentos, más los campos {linea} y {columna}, que salen de 'pos'
+    con el mapa de fuente al pedir el mensaje.
+    """
+    __slots__ = ('tipo', 'plantilla', 'args', 'pos', 'fin', 'mapa', 'linea', 'columna', 'veces',
+                 'repetidos')
+
+    def __init__(self, tipo, plantilla, args=(), pos=None, mapa=None, linea=None, fin=None):
+        self.tipo = tipo
+        self.plantilla = plantilla
+        self.args = args
+        self.pos = pos
+        self.fin = fin
+        self.mapa = mapa
+        self.linea = linea
+        self.columna = None
+        self.veces = 1
+        self.repetidos = []         # diagnósticos iguales juntados en este
+
+    def clave(self):
+        """Lo que hace que dos diagnósticos sean el mismo mensaje, esté donde esté."""
+        return self.tipo, self.plantilla, self.args
+
+    def juntar(self, otro):
+        """Cuenta 'otro' (el mismo mensaje en otro sitio) como repetición de este."""
+        self.veces += otro.veces
+        for d in [otro] + otro.repetidos:
+            if len(self.repetidos) >= REPETIDAS:
+                break
+            self.repetidos.append(d)
+        otro.repetidos = []
+
+    def fijar(self):
+        """
+        Resuelve posición y argumentos y suelta el mapa (y con él el
+        texto), para guardar el diagnóstico o enviarlo a otro proceso.
+        """
+        for d in self.repetidos:
+            d.fijar()
+        if self.mapa is None:
+            return self
+        if self.pos is not None:
+            self.linea, self.columna = self.mapa.posicion(self.pos)
+        if self.tipo == ILEGAL:
+            caracteres = self.mapa.texto[self.pos:self.fin]
+            if len(caracteres) == 1:
+                self.plantilla = "Carácter ilegal, ERROR LEXICO:'{0}' (línea {linea}, columna {columna})"
+                self.args = (_visible(caracteres),)
+            else:
+                muestra = _visible(caracteres[:_MUESTRA]) + ('...' if len(caracteres) > _MUESTRA else '')
+                self.plantilla = ("Caracteres ilegales, ERROR LEXICO:'{0}' ({1} seguidos, "
+                                  "línea {linea}, columna {columna})")
+                self.args = (muestra, len(caracteres))
+        self.mapa = None
+        return self
+
+    def mensaje(self):
+        self.fijar()
+        return self.plantilla.format(*self.args, linea=self.linea, columna=self.columna)
+
+    def otras_lineas(self):
+        """Líneas de las repeticiones guardadas, sin repetir y sin la propia."""
+        self.fijar()
+        lineas = []
+        for d in self.repetidos:
+            if d.linea is not None and d.linea != self.linea and d.linea not in lineas:
+                lineas.append(d.linea)
+        return lineas
+
+    def texto(self):
+        """El mensaje con las veces que se repite y dónde."""
+        texto = self.mensaje()
+        if self.veces > 1:
+            otras = self.otras_lineas()
+            texto += f" (repetido {self.veces} veces"
+            if otras:
+                texto += ", también en " + ("línea " if len(otras) == 1 else "líneas ")
+                texto += ', '.join(map(str, otras))
+                if self.veces - 1 > len(self.repetidos):
+                    texto += ', ...'
+            texto += ")"
+        return texto
+
+    def como_tupla(self):
+        """Tupla comparable con lo que hace falta para rehacerlo (de_tupla)."""
+        self.fijar()
+        return (self.tipo, self.plantilla, self.args, self.linea, self.columna, self.veces,
+                tuple((d.linea, d.columna) for d in self.repetidos))
+
+    @classmethod
+    def de_tupla(cls, tupla, desplazamiento=0):
+        """Diagnóstico de como_tupla(), con las líneas movidas 'desplazamiento'."""
+        tipo, plantilla, args, linea, columna, veces, repetidos = tupla
+        mover = lambda n: None if n is None else n + desplazamiento
+        d = cls(tipo, plantilla, args, linea=mover(linea))
+        d.columna, d.veces = columna, veces
+        for linea_r, columna_r in repetidos:
+            r = cls(tipo, plantilla, args, linea=mover(linea_r))
+            r.columna = columna_r
+            d.repetidos.append(r)
+        return d
+
+    def como_dict(self):
+        self.fijar()
+        return {'tipo': self.tipo, 'mensaje': self.mensaje(), 'linea': self.linea,
+                'columna': self.columna, 'veces': self.veces,
+                'otras_lineas': self.otras_lineas()}
+
+
+class Diagnosticos:
+    """Colector de los diagnósticos de un fichero."""
+
+    def __init__(self, maximo=MAXIMO):
+        self.maximo = maximo
+        self.entradas = []
+        self.descartados = 0
+        self._vistos = {}        # clave -> entrada ya guardada
+        self._racha = None       # última racha de ilegales, aún puede crecer
+
+    def __len__(self):
+        return len(self.entradas) + self.descartados
+
+    def anotar(self, diagnostico):
+        racha = self._racha
+        if diagnostico.tipo == ILEGAL:
+            # racha que sigue a la anterior (t_error corta en cada carácter
+            # que podría empezar un token): se alarga la misma entrada
+            if (racha is not None and racha.mapa is not None
+                    and racha.mapa is diagnostico.mapa and racha.fin == diagnostico.pos):
+                racha.fin = diagnostico.fin
+                return
+        else:
+            anterior = self._vistos.get(diagnostico.clave())
+            if anterior is not None:
+                anterior.juntar(diagnostico)
+                return
+        self._cerrar_racha()
+        if len(self.entradas) >= self.maximo:
+            self.descartados += diagnostico.veces
+            return
+        self.entradas.append(diagnostico)
+        if diagnostico.tipo == ILEGAL:
+            self._racha = diagnostico
+        else:
+            self._vistos[diagnostico.clave()] = diagnostico
+
+    def _cerrar_racha(self):
+        # la racha ya no crece: se resuelve su texto y, si se repite,
+        # cuenta en la primera (siempre es la última entrada)
+        racha, self._racha = self._racha, None
+        if racha is None:
+            return
+        racha.fijar()
+        anterior = self._vistos.setdefault(racha.clave(), racha)
+        if anterior is not racha:
+            anterior.juntar(racha)
+            self.entradas.pop()
+
+    def semantico(self, parser, nodo):
+        """Anota el nodo de error semántico 'nodo' de 'parser'."""
+        linea, columna = parser.posicion(nodo)
+        d = Diagnostico(SEMANTICO, "Error semántico: {0} en línea {linea}, columna {columna}",
+                        (nodo['error'],))
+        d.linea, d.columna = linea, columna
+        self.anotar(d)
+
+    def unir(self, otro):
+        """Añade las entradas de otro colector (un trozo del mismo fichero)."""
+        for d in otro.entradas:
+            self.anotar(d)
+        self.descartados += otro.descartados
+
+    def fijar(self):
+        self._cerrar_racha()
+        for d in self.entradas:
+            d.fijar()
+        return self
+
+    def lineas(self):
+        self.fijar()
+        lineas = [d.texto() for d in self.entradas]
+        if self.descartados:
+            lineas.append(f"... y {self.descartados} diagnósticos más "
+                          f"(máximo {self.maximo} por fichero)")
+        return lineas
+
+    def texto(self):
+        return ''.join(linea + '\n' for linea in self.lineas())
+
+    def json(self):
+        self.fijar()
+        return json.dumps({'diagnosticos': [d.como_dict() for d in self.entradas],
+                           'descartados': self.descartados}, ensure_ascii=False)
+
+    def escribir(self, fichero, formato='texto'):
+        """Todo el informe en 'fichero' con una sola escritura."""
+        if formato == 'json':
+            fichero.write(self.json() + '\n')
+        elif self:
+            fichero.write(self.texto())
+
+    def __getstate__(self):
+        # a otro proceso viajan ya resueltos, sin el texto del fichero
+        self.fijar()
+        return self.maximo, self.entradas, self.descartados
+
+    def __setstate__(self, estado):
+        self.maximo, self.entradas, self.descartados = estado
+        self._vistos = {d.clave(): d for d in self.entradas}
+        self._racha = None
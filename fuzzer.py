@@ -0,0 +1,551 @@
+"""
+Fuzzer de rendimiento: busca entradas lentas, no entradas mal analizadas.
+
+1. Se parte de las semillas (un programa que usa toda la gramática y los
+   ficheros de test_files) y se calibra el coste normal: tiempo y memoria
+   por byte (mediana), descontando lo que cuesta un texto vacío.
+2. Cada vuelta elige una entrada del corpus, con más probabilidad cuanto
+   más cara es por byte, y la muta o la hace crecer: repetir líneas o
+   bloques, anidar if/while, comentarios ''' llenos de comillas, tramos
+   de líneas vacías, cadenas de operadores, vectores enormes, cambios de
+   caracteres y empalmes con otra entrada.
+3. La entrada nueva se queda en el corpus si cubre algo nuevo (funciones
+   p_*/t_* del lexer y el parser, pares de reducciones seguidas y tipos
+   de diagnóstico) o si es bastante más cara por byte que su madre.
+4. Si su tiempo o su memoria por byte pasan de FACTOR veces lo normal (o
+   se pasa del plazo, o el análisis falla) se minimiza con ddmin por
+   líneas y el reproductor se guarda en fuzz_corpus/, con una línea en
+   fuzz_corpus/indice.jsonl. Se compara por forma (la secuencia de tipos
+   de token, con las repeticiones seguidas juntas y int/float/bool/char
+   como un solo TIPO): cambiar un nombre, un tamaño o el tipo base no es
+   un hallazgo nuevo, y uno que contiene la forma de otro ya guardado
+   tampoco (es el mismo, con algo más alrededor).
+
+'python fuzzer.py --regresion' vuelve a medir todo fuzz_corpus/ y dice
+qué reproductores siguen siendo lentos. Los que el índice marca como
+"conocido" (un coste que se acepta, con el porqué) se listan pero no
+hacen fallar la regresión.
+
+Uso: python fuzzer.py [--segundos N] [--semilla N] [--objetivo lexico|comprobar|ast] [--regresion]
+"""
+import hashlib
+import json
+import os
+import random
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+
+from lexer import LexerClass
+from parser import ParserClass
+from diagnosticos import Diagnosticos
+
+DIR_CORPUS = 'fuzz_corpus'
+INDICE = 'indice.jsonl'
+OBJETIVOS = ('lexico', 'comprobar', 'ast')
+
+# tipos básicos: en la forma cuentan todos como el mismo token
+TIPOS = frozenset({'INT', 'FLOAT', 'BOOL', 'CHAR'})
+
+TAMANO_MAXIMO = 64 * 1024   # bytes de una entrada
+BYTES_MINIMOS = 256         # se divide al menos entre esto: en textos cortos el coste por byte es ruido
+FACTOR = 20.0               # coste por byte frente al normal para avisar
+PLAZO = 5.0                 # segundos por ejecución
+PRUEBAS_DDMIN = 300         # ejecuciones como mucho al minimizar
+
+SEMILLA = """\
+int a = 1
+int b = 2
+float c = 1.5
+bool t = true
+int[8] v
+type P:
+{
+    int x, y
+}
+P p
+p.x = a + b
+def int f(int n):
+{
+    int r = n * 2
+    return r
+}
+int d = f(a)
+if a < b:
+{
+    a = a + 1
+} else:
+{
+    b = b - 1
+}
+while a > 0:
+{
+    a = a - 1
+}
+for i in 0..v.len:
+{
+    v[i] = i * 2
+}
+'''comentario
+de varias líneas'''
+# comentario
+float e = c * (a + b) - sin c
+"""
+
+
+class _Plazo(Exception):
+    """La ejecución ha pasado de PLAZO segundos."""
+
+
+def _alarma(signum, frame):
+    raise _Plazo()
+
+
+#
+#region 1. OBJETIVO
+#
+
+class Objetivo:
+    """Una pasada del analizador sobre un texto: el lexer, comprobar() o el AST completo."""
+
+    def __init__(self, nombre='comprobar'):
+        if nombre not in OBJETIVOS:
+            raise ValueError(f"Objetivo '{nombre}' desconocido: {', '.join(OBJETIVOS)}")
+        self.nombre = nombre
+        self.parser = ParserClass(None, debug=False)
+        self.lexer = LexerClass().lexerObj
+        self.fijo = 0.0
+        self.fijo = self.tiempo('')[0]
+
+    def correr(self, texto):
+        diagnosticos = Diagnosticos()
+        if self.nombre == 'lexico':
+            self.lexer.diagnosticos = diagnosticos
+            self.lexer.input(texto)
+            for _ in self.lexer:
+                pass
+        else:
+            self.parser.reiniciar()
+            self.parser.lexer.diagnosticos = diagnosticos
+            if self.nombre == 'comprobar':
+                self.parser.comprobar(texto)
+            else:
+                self.parser.parse(texto)
+        return diagnosticos
+
+    def tiempo(self, texto, repeticiones=1):
+        """
+        (segundos sin el coste fijo, fallo): el mejor de 'repeticiones'.
+        fallo es 'plazo', el texto de una excepción o None.
+        """
+        mejor, fallo = float('inf'), None
+        alarma = hasattr(signal, 'setitimer')
+        for _ in range(repeticiones):
+            if alarma:
+                anterior = signal.signal(signal.SIGALRM, _alarma)
+                signal.setitimer(signal.ITIMER_REAL, PLAZO)
+            inicio = time.perf_counter()
+            try:
+                self.correr(texto)
+            except _Plazo:
+                fallo = 'plazo'
+            except Exception as e:
+                fallo = f"{type(e).__name__}: {e}"
+            finally:
+                if alarma:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                    signal.signal(signal.SIGALRM, anterior)
+            mejor = min(mejor, time.perf_counter() - inicio)
+            if fallo is not None:
+                break
+        return max(0.0, mejor - self.fijo), fallo
+
+    def cobertura(self, texto):
+        """(características cubiertas, pico de memoria en bytes) de una ejecución."""
+        cubiertas = set()
+        ultima = [None]
+
+        def perfil(frame, evento, arg):
+            if evento == 'call':
+                nombre = frame.f_code.co_name
+                if nombre.startswith(('p_', 't_')):
+                    cubiertas.add(nombre)
+                    cubiertas.add((ultima[0], nombre))
+                    ultima[0] = nombre
+
+        tracemalloc.start()
+        sys.setprofile(perfil)
+        try:
+            diagnosticos = self.correr(texto)
+            for d in diagnosticos.fijar().entradas:
+                cubiertas.add(('diagnostico', d.tipo, d.plantilla))
+        except Exception as e:
+            cubiertas.add(('fallo', type(e).__name__))
+        finally:
+            sys.setprofile(None)
+            pico = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return cubiertas, pico
+
+#endregion
+
+
+#
+#region 2. MUTACIONES
+#
+
+def _lineas(texto):
+    return texto.split('\n')
+
+
+def _tramo(lineas, azar):
+    i = azar.randrange(len(lineas))
+    return i, min(len(lineas), i + 1 + int(azar.expovariate(0.3)))
+
+
+def repetir_linea(texto, azar, corpus):
+    lineas = _lineas(texto)
+    i = azar.randrange(len(lineas))
+    veces = 2 ** azar.randrange(1, 10)
+    return '\n'.join(lineas[:i] + [lineas[i]] * veces + lineas[i + 1:])
+
+
+def repetir_bloque(texto, azar, corpus):
+    lineas = _lineas(texto)
+    i, j = _tramo(lineas, azar)
+    return '\n'.join(lineas[:j] + lineas[i:j] * azar.randrange(2, 8) + lineas[j:])
+
+
+def anidar(texto, azar, corpus):
+    lineas = _lineas(texto)
+    i, j = _tramo(lineas, azar)
+    niveles = azar.randrange(1, 30)
+    cabeceras = ['if 1 < 2:', 'while 2 < 1:', 'if true:']
+    abre, cierra = [], []
+    for _ in range(niveles):
+        abre += [azar.choice(cabeceras), '{']
+        cierra.append('}')
+    return '\n'.join(lineas[:i] + abre + lineas[i:j] + cierra + lineas[j:])
+
+
+def comentario(texto, azar, corpus):
+    trozos = ["'", "''", "#", "\n", " ", "'a'", "x", "''''"]
+    cuerpo = ''.join(azar.choice(trozos) for _ in range(azar.randrange(1, 2000)))
+    cuerpo = cuerpo.replace("'''", "''")
+    lineas = _lineas(texto)
+    i = azar.randrange(len(lineas) + 1)
+    return '\n'.join(lineas[:i] + ["'''" + cuerpo + "'''"] + lineas[i:])
+
+
+def lineas_vacias(texto, azar, corpus):
+    relleno = azar.choice(['', '   ', '# nada', "'''x'''", '\t'])
+    lineas = _lineas(texto)
+    i = azar.randrange(len(lineas) + 1)
+    return '\n'.join(lineas[:i] + [relleno] * (2 ** azar.randrange(1, 14)) + lineas[i:])
+
+
+def cadena(texto, azar, corpus):
+    n = 2 ** azar.randrange(1, 12)
+    forma = azar.choice(['+ a', '* (a + 1)', '- -a', '&& t', '+ f(a)'])
+    if azar.random() < 0.3:
+        expresion = '(' * n + 'a' + ')' * n
+    else:
+        expresion = 'a ' + ' '.join([forma] * n)
+    tipo = 'bool' if '&&' in forma else 'int'
+    lineas = _lineas(texto)
+    i = azar.randrange(len(lineas) + 1)
+    return '\n'.join(lineas[:i] + [f"{tipo} z{azar.randrange(10**6)} = {expresion}"] + lineas[i:])
+
+
+def vector(texto, azar, corpus):
+    tamano = 10 ** azar.randrange(2, 7)
+    base = azar.choice(['int', 'float', 'bool', 'char', 'P'])
+    lineas = _lineas(texto)
+    i = azar.randrange(len(lineas) + 1)
+    return '\n'.join(lineas[:i] + [f"{base}[{tamano}] w{azar.randrange(10**6)}"] + lineas[i:])
+
+
+def caracteres(texto, azar, corpus):
+    alfabeto = "abcxyz019 \t\n+-*/=<>&|{}[]().:,;'\"#_$@"
+    for _ in range(azar.randrange(1, 8)):
+        i = azar.randrange(len(texto) + 1)
+        accion = azar.random()
+        if accion < 0.4:
+            texto = texto[:i] + azar.choice(alfabeto) + texto[i:]
+        elif accion < 0.7:
+            texto = texto[:i] + texto[i + azar.randrange(1, 8):]
+        else:
+            texto = texto[:i] + azar.choice(alfabeto) + texto[i + 1:]
+    return texto
+
+
+def empalmar(texto, azar, corpus):
+    otro = azar.choice(corpus).texto
+    lineas, otras = _lineas(texto), _lineas(otro)
+    i, j = azar.randrange(len(lineas) + 1), azar.randrange(len(otras) + 1)
+    return '\n'.join(lineas[:i] + otras[j:])
+
+
+MUTACIONES = (repetir_linea, repetir_bloque, anidar, comentario, lineas_vacias,
+              cadena, vector, caracteres, empalmar)
+
+#endregion
+
+
+#
+#region 3. MINIMIZACIÓN
+#
+
+def ddmin(unidades, falla, pruebas=PRUEBAS_DDMIN):
+    """
+    Lista mínima (1-mínima si no se acaban las pruebas) de 'unidades'
+    para la que falla(lista) sigue siendo cierto (ddmin de Zeller).
+    """
+    n = 2
+    while len(unidades) >= 2 and pruebas > 0:
+        tam = len(unidades) // n
+        trozos = [unidades[i:i + tam] for i in range(0, len(unidades), tam)] if tam else [unidades]
+        reducido = False
+        for i in range(len(trozos)):
+            if pruebas <= 0:
+                break
+            # primero cada trozo solo, luego cada complemento
+            for candidato in (trozos[i], [u for k, t in enumerate(trozos) if k != i for u in t]):
+                if not candidato or len(candidato) == len(unidades):
+                    continue
+                pruebas -= 1
+                if falla(candidato):
+                    unidades = candidato
+                    n = max(2, n - 1) if candidato is not trozos[i] else 2
+                    reducido = True
+                    break
+            if reducido:
+                break
+        if not reducido:
+            if n >= len(unidades):
+                break
+            n = min(len(unidades), n * 2)
+    return unidades
+
+#endregion
+
+
+#
+#region 4. BÚSQUEDA
+#
+
+class Entrada:
+    __slots__ = ('texto', 't_byte', 'm_byte')
+
+    def __init__(self, texto, t_byte, m_byte):
+        self.texto = texto
+        self.t_byte = t_byte
+        self.m_byte = m_byte
+
+
+def semillas():
+    """El programa SEMILLA y los ficheros de test_files."""
+    textos = [SEMILLA]
+    directorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_files')
+    for fichero in sorted(os.listdir(directorio)):
+        if os.path.splitext(fichero)[1] in ('', '.txt'):
+            with open(os.path.join(directorio, fichero)) as f:
+                textos.append(f.read())
+    return textos
+
+
+class Fuzzer:
+
+    def __init__(self, objetivo='comprobar', semilla=0, directorio=DIR_CORPUS, factor=FACTOR):
+        self.objetivo = Objetivo(objetivo)
+        self.azar = random.Random(semilla)
+        self.directorio = directorio
+        self.factor = factor
+        self.corpus = []
+        self.cubiertas = set()
+        self.hallazgos = []
+        self.guardados = set()
+        self.ejecuciones = 0
+        self.calibrar()
+        # lo que ya está en el corpus de regresión no se vuelve a guardar
+        for texto in reproductores(directorio).values():
+            self.guardados.add(self.forma(texto))
+
+    def medir(self, texto):
+        """(tiempo por byte, memoria por byte, características, fallo)."""
+        self.ejecuciones += 1
+        segundos, fallo = self.objetivo.tiempo(texto)
+        cubiertas, pico = self.objetivo.cobertura(texto) if fallo is None else (set(), 0)
+        tam = max(BYTES_MINIMOS, len(texto.encode()))
+        return segundos / tam, pico / tam, cubiertas, fallo
+
+    def calibrar(self):
+        tiempos, memorias = [], []
+        for texto in semillas():
+            t_byte, m_byte, cubiertas, _ = self.medir(texto)
+            self.cubiertas |= cubiertas
+            self.corpus.append(Entrada(texto, t_byte, m_byte))
+            tiempos.append(t_byte)
+            memorias.append(m_byte)
+        self.t_normal = statistics.median(tiempos)
+        self.m_normal = statistics.median(memorias)
+
+    def motivo(self, texto, t_byte, m_byte, fallo):
+        """Por qué 'texto' es un hallazgo ('tiempo', 'memoria', 'plazo', 'fallo') o None."""
+        if fallo == 'plazo':
+            return 'plazo'
+        if fallo is not None:
+            return 'fallo'
+        if t_byte > self.factor * self.t_normal:
+            # se confirma con otra medida: un solo tiempo alto puede ser ruido
+            segundos, _ = self.objetivo.tiempo(texto, repeticiones=2)
+            if segundos / max(BYTES_MINIMOS, len(texto.encode())) > self.factor * self.t_normal:
+                return 'tiempo'
+        if m_byte > self.factor * self.m_normal:
+            return 'memoria'
+        return None
+
+    def forma(self, texto):
+        lexer = self.objetivo.lexer
+        lexer.diagnosticos = Diagnosticos()
+        lexer.input(texto)
+        tipos = []
+        for tok in lexer:
+            tipo = 'TIPO' if tok.type in TIPOS else tok.type
+            if not tipos or tipos[-1] != tipo:
+                tipos.append(tipo)
+        # con espacios alrededor, 'in' sobre el texto busca tramos de tokens enteros
+        return ' ' + ' '.join(tipos) + ' '
+
+    def conocido(self, forma):
+        return any(guardada in forma for guardada in self.guardados)
+
+    def elegir(self):
+        # torneo: la más cara por byte de unas cuantas al azar
+        candidatas = [self.azar.choice(self.corpus) for _ in range(3)]
+        return max(candidatas, key=lambda e: e.t_byte + e.m_byte * self.t_normal / self.m_normal)
+
+    def vuelta(self):
+        madre = self.elegir()
+        mutacion = self.azar.choice(MUTACIONES)
+        texto = mutacion(madre.texto, self.azar, self.corpus)
+        if texto == madre.texto or len(texto.encode()) > TAMANO_MAXIMO:
+            return
+        t_byte, m_byte, cubiertas, fallo = self.medir(texto)
+        nuevas = cubiertas - self.cubiertas
+        if nuevas or t_byte > 1.2 * madre.t_byte or m_byte > 1.2 * madre.m_byte:
+            self.cubiertas |= nuevas
+            self.corpus.append(Entrada(texto, t_byte, m_byte))
+        motivo = self.motivo(texto, t_byte, m_byte, fallo)
+        if motivo is not None:
+            self.registrar(texto, motivo, mutacion.__name__)
+
+    def registrar(self, texto, motivo, mutacion):
+        # cada línea con su salto: sin el último, la última sentencia no se analiza
+        def sigue(lineas):
+            candidato = ''.join(lineas)
+            t_byte, m_byte, _, fallo = self.medir(candidato)
+            return self.motivo(candidato, t_byte, m_byte, fallo) == motivo
+
+        minimo = ''.join(ddmin([l + '\n' for l in texto.splitlines()], sigue))
+        forma = self.forma(minimo)
+        if self.conocido(forma):
+            return
+        self.guardados.add(forma)
+        clave = hashlib.sha256(minimo.encode()).hexdigest()[:12]
+        t_byte, m_byte, _, fallo = self.medir(minimo)
+        hallazgo = {'fichero': f"{motivo}-{clave}.viper", 'motivo': motivo,
+                    'objetivo': self.objetivo.nombre, 'mutacion': mutacion,
+                    'bytes': len(minimo.encode()), 'bytes_original': len(texto.encode()),
+                    'us_byte': round(t_byte * 1e6, 3), 'memoria_byte': round(m_byte, 1),
+                    'veces_normal_tiempo': round(t_byte / self.t_normal, 1),
+                    'veces_normal_memoria': round(m_byte / self.m_normal, 1),
+                    'fallo': fallo}
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(os.path.join(self.directorio, hallazgo['fichero']), 'w') as f:
+            f.write(minimo)
+        with open(os.path.join(self.directorio, INDICE), 'a') as f:
+            f.write(json.dumps(hallazgo, ensure_ascii=False) + '\n')
+        self.hallazgos.append(hallazgo)
+
+    def ejecutar(self, segundos):
+        fin = time.monotonic() + segundos
+        while time.monotonic() < fin:
+            self.vuelta()
+        return self.hallazgos
+
+#endregion
+
+
+def reproductores(directorio=DIR_CORPUS):
+    """{fichero: texto} de los reproductores guardados en 'directorio'."""
+    textos = {}
+    if os.path.isdir(directorio):
+        for fichero in sorted(os.listdir(directorio)):
+            if fichero.endswith('.viper'):
+                with open(os.path.join(directorio, fichero)) as f:
+                    textos[fichero] = f.read()
+    return textos
+
+
+def conocidos(directorio=DIR_CORPUS):
+    """{fichero: porqué} de los reproductores que el índice marca como coste aceptado."""
+    marcados = {}
+    ruta = os.path.join(directorio, INDICE)
+    if os.path.exists(ruta):
+        with open(ruta) as f:
+            for linea in f:
+                if linea.strip():
+                    hallazgo = json.loads(linea)
+                    if hallazgo.get('conocido'):
+                        marcados[hallazgo['fichero']] = hallazgo['conocido']
+    return marcados
+
+
+def regresion(directorio=DIR_CORPUS, objetivo='comprobar', factor=FACTOR):
+    """
+    ({fichero: motivo} de los reproductores que siguen siendo lentos,
+     {fichero: motivo} de los que siguen lentos pero son conocidos).
+    """
+    fuzzer = Fuzzer(objetivo, directorio=directorio, factor=factor)
+    marcados = conocidos(directorio)
+    lentos, aceptados = {}, {}
+    for fichero, texto in reproductores(directorio).items():
+        t_byte, m_byte, _, fallo = fuzzer.medir(texto)
+        motivo = fuzzer.motivo(texto, t_byte, m_byte, fallo)
+        if motivo is not None:
+            (aceptados if fichero in marcados else lentos)[fichero] = motivo
+    return lentos, aceptados
+
+
+def _opcion(args, nombre, defecto, tipo=int):
+    if nombre in args:
+        i = args.index(nombre)
+        valor = tipo(args[i + 1])
+        del args[i:i + 2]
+        return valor
+    return defecto
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    objetivo = _opcion(args, '--objetivo', 'comprobar', str)
+    if '--regresion' in args:
+        lentos, aceptados = regresion(objetivo=objetivo)
+        marcados = conocidos()
+        for fichero, motivo in aceptados.items():
+            print(f"{fichero}: {motivo} (conocido: {marcados[fichero]})")
+        for fichero, motivo in lentos.items():
+            print(f"{fichero}: {motivo}")
+        print(f"{len(lentos)} reproductores siguen por encima de {FACTOR:g} veces lo normal")
+        sys.exit(1 if lentos else 0)
+    segundos = _opcion(args, '--segundos', 60, float)
+    fuzzer = Fuzzer(objetivo, semilla=_opcion(args, '--semilla', 0))
+    print(f"normal: {fuzzer.t_normal * 1e6:.2f} us/byte, {fuzzer.m_normal:.0f} B/byte")
+    for h in fuzzer.ejecutar(segundos):
+        print(f"{h['fichero']}: {h['motivo']}, {h['bytes']} bytes, "
+              f"x{h['veces_normal_tiempo']} tiempo, x{h['veces_normal_memoria']} memoria")
+    print(f"{fuzzer.ejecuciones} ejecuciones, {len(fuzzer.corpus)} entradas en el corpus, "
+          f"{len(fuzzer.cubiertas)} características cubiertas")
@@ -0,0 +1,304 @@
+"""
+Generador de un driver LR especializado para la gramática de ParserClass.
+
+PLY recorre sus tablas genéricas en LRParser.parseopt: un diccionario de
+estados por defecto, un diccionario de acciones por estado y otro de
+saltos (goto) de dos niveles por reducción. Este módulo vuelca las tablas
+ya calculadas por PLY en parser_lr.py como literales densos:
+
+  ACCION[estado]   -> {tipo de token: acción}   (igual que PLY)
+  DEFECTO[estado]  -> reducción por defecto o None  (tupla, sin 'in dict')
+  IR_A[producción] -> {estado: estado siguiente}    (un solo nivel)
+  LONGITUD/NOMBRE  -> por producción
+
+y dos bucles, con y sin seguimiento de posiciones, que siguen paso a paso
+la semántica de parseopt (reducciones por defecto, recuperación de
+errores, p.lineno()/p.lexpos()), llamando directamente a los p_* de la
+instancia. parser_lr.FIRMA guarda el hash de las tablas: si la gramática
+cambia y no se regenera, ParserClass vuelve al driver de PLY.
+
+Uso: python generador_lr.py   (reescribe parser_lr.py)
+"""
+import hashlib
+import os
+import pprint
+
+DESTINO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parser_lr.py')
+
+
+def firma(lr):
+    """Hash de las tablas LALR de un LRParser de PLY."""
+    datos = repr((
+        [(p.name, p.len, p.func) for p in lr.productions],
+        sorted((s, sorted(a.items())) for s, a in lr.action.items()),
+        sorted((s, sorted(g.items())) for s, g in lr.goto.items()),
+    ))
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+# Bucle del driver. Las líneas marcadas con '#P' solo van en la versión
+# con seguimiento de posiciones (tracking=True de PLY).
+_BUCLE = '''
+def {nombre}(lr, lexer, texto=None):
+    acciones = _acciones(lr)
+    pslice = Produccion()
+    pslice.lexer = lexer
+    pslice.parser = lr
+    if texto is not None:
+        lexer.input(texto)
+    get_token = lr.token = lexer.token
+
+    lookahead = None
+    lookaheadstack = []
+    errorcount = 0
+    statestack = lr.statestack = [0]
+    sym = Simbolo()
+    sym.type = '$end'
+    symstack = lr.symstack = [sym]
+    pslice.stack = symstack
+    state = 0
+
+    while True:
+        t = DEFECTO[state]
+        if t is None:
+            if not lookahead:
+                if not lookaheadstack:
+                    lookahead = get_token()
+                else:
+                    lookahead = lookaheadstack.pop()
+                if not lookahead:
+                    lookahead = Simbolo()
+                    lookahead.type = '$end'
+            t = ACCION[state].get(lookahead.type)
+
+        if t is not None:
+            if t > 0:
+                # desplazamiento
+                statestack.append(t)
+                state = t
+                symstack.append(lookahead)
+                lookahead = None
+                if errorcount:
+                    errorcount -= 1
+                continue
+
+            if t < 0:
+                # reducción por la producción -t
+                n = -t
+                plen = LONGITUD[n]
+                sym = Simbolo()
+                sym.type = NOMBRE[n]
+                sym.value = None
+                if plen:
+                    targ = symstack[-plen-1:]
+                    targ[0] = sym
+#P                    t1 = targ[1]
+#P                    sym.lineno = t1.lineno
+#P                    sym.lexpos = t1.lexpos
+#P                    t1 = targ[-1]
+#P                    sym.endlineno = getattr(t1, 'endlineno', t1.lineno)
+#P                    sym.endlexpos = getattr(t1, 'endlexpos', t1.lexpos)
+                    pslice.slice = targ
+                    try:
+                        del symstack[-plen:]
+                        lr.state = state
+                        acciones[n](pslice)
+                        del statestack[-plen:]
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        symstack.extend(targ[1:-1])
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                else:
+#P                    sym.lineno = lexer.lineno
+#P                    sym.lexpos = lexer.lexpos
+                    pslice.slice = [sym]
+                    try:
+                        lr.state = state
+                        acciones[n](pslice)
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                continue
+
+            # t == 0: aceptar
+            return symstack[-1].value
+
+        # error sintáctico: misma recuperación que PLY
+        if errorcount == 0 or lr.errorok:
+            errorcount = error_count
+            lr.errorok = False
+            errtoken = lookahead
+            if errtoken.type == '$end':
+                errtoken = None
+            if lr.errorfunc:
+                if errtoken and not hasattr(errtoken, 'lexer'):
+                    errtoken.lexer = lexer
+                lr.state = state
+                # call_errorfunc usa globales de ply.yacc (errok/token/restart)
+                with _CERROJO_ERRORES:
+                    tok = call_errorfunc(lr.errorfunc, errtoken, lr)
+                if lr.errorok:
+                    lookahead = tok
+                    continue
+            else:
+                if errtoken:
+                    lineno = getattr(lookahead, 'lineno', 0)
+                    if lineno:
+                        sys.stderr.write('yacc: Syntax error at line %d, token=%s\\n' % (lineno, errtoken.type))
+                    else:
+                        sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                else:
+                    sys.stderr.write('yacc: Parse error in input. EOF\\n')
+                    return
+        else:
+            errorcount = error_count
+
+        if len(statestack) <= 1 and lookahead.type != '$end':
+            lookahead = None
+            state = 0
+            del lookaheadstack[:]
+            continue
+
+        if lookahead.type == '$end':
+            return
+
+        if lookahead.type != 'error':
+            sym = symstack[-1]
+            if sym.type == 'error':
+#P                sym.endlineno = getattr(lookahead, 'lineno', sym.lineno)
+#P                sym.endlexpos = getattr(lookahead, 'lexpos', sym.lexpos)
+                lookahead = None
+                continue
+            t = Simbolo()
+            t.type = 'error'
+            if hasattr(lookahead, 'lineno'):
+                t.lineno = t.endlineno = lookahead.lineno
+            if hasattr(lookahead, 'lexpos'):
+                t.lexpos = t.endlexpos = lookahead.lexpos
+            t.value = lookahead
+            lookaheadstack.append(lookahead)
+            lookahead = t
+        else:
+            sym = symstack.pop()
+#P            lookahead.lineno = sym.lineno
+#P            lookahead.lexpos = sym.lexpos
+            statestack.pop()
+            state = statestack[-1]
+'''
+
+_CABECERA = '''"""
+Driver LR especializado para la gramática de ParserClass.
+Generado por generador_lr.py a partir de las tablas de PLY: no editar.
+"""
+import sys
+import threading
+
+from ply.yacc import YaccProduction, call_errorfunc, error_count
+
+FIRMA = {firma!r}
+
+_CERROJO_ERRORES = threading.Lock()
+
+
+class Simbolo:
+    """Símbolo de la pila (el YaccSymbol de PLY, con __slots__)."""
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'endlineno', 'endlexpos', 'lexer')
+
+    def __str__(self):
+        return self.type
+
+    def __repr__(self):
+        return str(self)
+
+
+class Produccion(YaccProduction):
+    """
+    El 'p' de las acciones: misma interfaz que YaccProduction, con el
+    acceso p[n] por índice entero (el caso normal) resuelto primero.
+    """
+    __slots__ = ('slice', 'stack', 'lexer', 'parser')
+
+    def __init__(self):
+        self.slice = self.stack = self.lexer = self.parser = None
+
+    def __getitem__(self, n):
+        if n.__class__ is int:
+            if n >= 0:
+                return self.slice[n].value
+            return self.stack[n].value
+        return [s.value for s in self.slice[n]]
+
+
+def _acciones(lr):
+    # métodos p_* ya enlazados a la instancia dueña de 'lr', por producción
+    acciones = getattr(lr, 'acciones_lr', None)
+    if acciones is None:
+        acciones = lr.acciones_lr = tuple(p.callable for p in lr.productions)
+    return acciones
+
+'''
+
+
+def _bucle(nombre, posiciones):
+    lineas = []
+    for linea in _BUCLE.format(nombre=nombre).splitlines():
+        if linea.startswith('#P'):
+            if not posiciones:
+                continue
+            linea = linea[2:]
+        lineas.append(linea)
+    return '\n'.join(lineas) + '\n'
+
+
+def generar(lr, destino=DESTINO):
+    """Escribe el módulo del driver especializado para las tablas de 'lr'."""
+    n_estados = max(lr.action) + 1
+    accion = tuple(lr.action.get(s, {}) for s in range(n_estados))
+    defecto = tuple(lr.defaulted_states.get(s) for s in range(n_estados))
+
+    # goto de un solo nivel: las producciones de un mismo no terminal comparten dict
+    por_no_terminal = {}
+    for s, saltos in lr.goto.items():
+        for nt, destino_nt in saltos.items():
+            por_no_terminal.setdefault(nt, {})[s] = destino_nt
+    no_terminales = sorted(por_no_terminal)
+
+    partes = [_CABECERA.format(firma=firma(lr))]
+    filas = ''.join(f"    {fila!r},  # estado {s}\n" for s, fila in enumerate(accion))
+    partes.append(f"ACCION = (\n{filas})\n\n")
+    partes.append(f"DEFECTO = {defecto!r}\n\n")
+    partes.append(f"_IR_A = {pprint.pformat({nt: por_no_terminal[nt] for nt in no_terminales}, width=100)}\n\n")
+    partes.append("# Producción n: símbolo que produce, longitud y acción que la reduce\n")
+    partes.append("# " + "\n# ".join(f"{i}: {p.str}  ({p.func})" for i, p in enumerate(lr.productions)) + "\n")
+    partes.append(f"NOMBRE = {tuple(p.name for p in lr.productions)!r}\n\n")
+    partes.append(f"LONGITUD = {tuple(p.len for p in lr.productions)!r}\n\n")
+    partes.append("IR_A = tuple(_IR_A.get(nombre) for nombre in NOMBRE)\n\n")
+    partes.append(_bucle('analizar_con_posiciones', True))
+    partes.append(_bucle('analizar_sin_posiciones', False))
+
+    with open(destino, 'w') as f:
+        f.write(''.join(partes))
+
+
+if __name__ == '__main__':
+    from parser import ParserClass
+    generar(ParserClass(None, debug=False).parser)
+    print(f"Driver generado en {DESTINO}")
@@ -1,12 +1,19 @@
+import re
+from enum import IntEnum
+from types import MappingProxyType
 import ply.lex as lex
+from mapa_fuente import MapaFuente
+from diagnosticos import Diagnostico, ILEGAL, LEXICO
 
-class LexerClass:
-    Comentadas = []
-    states = (
-        ('comment', 'exclusive'),
-    )
+_BLANCOS = re.compile(r'[ \t]*')
+_FIN_COMENTARIO = re.compile(r'\#[^\n]*')
+_SALTO_O_COMENTARIO = re.compile(r"\n|'''|\#[^\n]*")
+# Caracteres con los que no empieza ningún token (ni blanco, ni comentario)
+_SIN_TOKEN = re.compile(r"[^ \t\n0-9a-zA-Z_\u0080-\u00FF;=+\-*/,.:<>&|{}\[\]()'\"\#]*")
 
-    reserved = {
+class LexerClass:
+    # Solo lectura: la comparten todos los lexers (y todos los hilos)
+    reserved = MappingProxyType({
         'int': 'INT',
         'float': 'FLOAT',
         'char': 'CHAR',
@@ -20,12 +27,16 @@ class LexerClass:
         'else': 'ELSE',
         'not': 'NOT',
         'while': 'WHILE',
+        'for': 'FOR',
+        'in': 'IN',
         'sin': 'SEN',
         'cos': 'COS',
         'log': 'LOG',
         'exp': 'EXP', 
-        'len': 'LEN'
-    }
+        'len': 'LEN',
+        'import': 'IMPORT',     # palabra reservada desde el modo proyecto: ya no vale como nombre
+        'load': 'LOAD'
+    })
 
     tokens = (
         'ENTERO',
@@ -54,28 +65,26 @@ class LexerClass:
         'AND',
         'OR',
         'DPNTO',
-        'PNTOCOMA'
+        'PNTOCOMA',
+        'CADENA',
+        'RANGO'
     ) + tuple(reserved.values())
+
+    # Tipos de token como enteros pequeños (1..N) para las tablas de despacho.
+    # Los operadores y las palabras reservadas salen del lexer con el suyo
+    # en tok.codigo; CODIGOS traduce un nombre de tok.type a su entero
+    # (con qualname para que pickle encuentre la clase: los tokens viajan entre procesos)
+    TipoToken = IntEnum('TipoToken', tokens, module=__name__, qualname='LexerClass.TipoToken')
+    CODIGOS = dict(zip(tokens, range(1, len(tokens) + 1)))
     t_ignore = ' \t'
 
     t_PNTOCOMA = r';'
     t_EQ = r'='
-    t_SUM = r'\+'
-    t_RES = r'\-'
-    t_MUL = r'\*'
-    t_DIV = r'/'
     t_COMA = r','
     t_PNTO = r'\.'
+    t_RANGO = r'\.\.'
     t_DPNTO = r':'
 
-    t_I = r'=='
-    t_M = r'>'
-    t_m = r'<'
-    t_MI = r'>='
-    t_mI = r'<='
-    t_AND = r'\&\&'
-    t_OR = r'\|\|'
-
     t_LLE = r'{'
     t_LLA = r'}'
     t_CE = r'\['
@@ -85,6 +94,76 @@ class LexerClass:
 
 
 
+    # Operadores: reglas-función para que el token lleve su código. PLY
+    # prueba las funciones en el orden en que están escritas y antes que
+    # las cadenas, así que van primero los de dos caracteres (y '==' ya
+    # gana a t_EQ)
+    @staticmethod
+    def t_I(t):
+        r'=='
+        t.codigo = _T.I
+        return t
+
+    @staticmethod
+    def t_MI(t):
+        r'>='
+        t.codigo = _T.MI
+        return t
+
+    @staticmethod
+    def t_mI(t):
+        r'<='
+        t.codigo = _T.mI
+        return t
+
+    @staticmethod
+    def t_AND(t):
+        r'\&\&'
+        t.codigo = _T.AND
+        return t
+
+    @staticmethod
+    def t_OR(t):
+        r'\|\|'
+        t.codigo = _T.OR
+        return t
+
+    @staticmethod
+    def t_M(t):
+        r'>'
+        t.codigo = _T.M
+        return t
+
+    @staticmethod
+    def t_m(t):
+        r'<'
+        t.codigo = _T.m
+        return t
+
+    @staticmethod
+    def t_SUM(t):
+        r'\+'
+        t.codigo = _T.SUM
+        return t
+
+    @staticmethod
+    def t_RES(t):
+        r'\-'
+        t.codigo = _T.RES
+        return t
+
+    @staticmethod
+    def t_MUL(t):
+        r'\*'
+        t.codigo = _T.MUL
+        return t
+
+    @staticmethod
+    def t_DIV(t):
+        r'/'
+        t.codigo = _T.DIV
+        return t
+
     @staticmethod
     def t_REAL(t):
         r'\d+\.\d+([eE][+-]?\d+)?|\d+[eE][+-]?\d+'
@@ -112,6 +191,13 @@ class LexerClass:
         t.value = t.value[1:-1]
         return t
 
+    @staticmethod
+    def t_CADENA(t):
+        r'"[^"\n]*"'
+        # por ahora solo se usa para rutas de fichero (load)
+        t.value = t.value[1:-1]
+        return t
+
     @staticmethod
     def t_COM(t):
         r'\#.*'
@@ -120,49 +206,172 @@ class LexerClass:
     @staticmethod
     def t_COMMLinit(t):
         r"'''"
-        t.lexer.begin('comment')
-        pass
-
-    @staticmethod
-    def t_comment_COMMLfin(t):
-        r"'''"
-        t.lexer.begin('INITIAL')
-        pass
-
-    @staticmethod
-    def t_comment_COMMLcont(t):
-        r"([^']|'[^']|''[^'])+"
-        t.lexer.lineno += t.value.count('\n')
-        pass
-
-    t_comment_ignore = ''
-
-    @staticmethod
-    def t_comment_error(t):
-        pass
+        # Saltamos directamente al cierre con find en lugar de ir
+        # consumiendo el comentario trozo a trozo en un estado de PLY
+        lexer = t.lexer
+        inicio = lexer.lexpos
+        fin = lexer.lexdata.find("'''", inicio)
+        if fin < 0:
+            LexerClass.informar(lexer, LEXICO, t.lexpos,
+                                "Comentario ''' sin cerrar, ERROR LEXICO (línea {linea}, columna {columna})")
+            fin = lexer.lexlen
+        else:
+            fin += 3
+        lexer.lineno += lexer.lexdata.count('\n', inicio, fin)
+        lexer.lexpos = fin
 
     @staticmethod
     def t_error(t):
-        print(f"Carácter ilegal, ERROR LEXICO:'{t.value[0]}'")
-        t.lexer.skip(1)
+        # Se salta de una vez la racha de caracteres con los que no empieza
+        # ningún token: un solo diagnóstico y no uno por carácter
+        lexer = t.lexer
+        fin = _SIN_TOKEN.match(lexer.lexdata, t.lexpos + 1).end()
+        LexerClass.informar(lexer, ILEGAL, t.lexpos, None, fin=fin)
+        lexer.skip(fin - t.lexpos)
 
 
     @staticmethod
     def t_NEWLINE(t):
         r'\n'
-        t.lexer.lineno += 1
+        # El salto que cierra una línea con código va solo; el de una línea
+        # vacía o de solo comentarios se junta con las de ese tipo que le
+        # siguen: el parser reduce una sentencia vacía por tramo, no una
+        # por línea, y sigue viendo dos NEWLINE donde la gramática solo
+        # admite uno (entre ':' y '{', por ejemplo). t.value es el tramo
+        lexer = t.lexer
+        if not LexerClass.linea_vacia(lexer.lexdata, t.lexpos):
+            lexer.lineno += 1
+            return t
+        fin = LexerClass.fin_lineas_vacias(lexer.lexdata, lexer.lexpos)
+        t.value = lexer.lexdata[t.lexpos:fin]
+        lexer.lineno += t.value.count('\n')
+        lexer.lexpos = fin
         return t
 
     @staticmethod
     def t_ID(t):
         r'[a-zA-Z_\u0080-\u00FF][a-zA-Z_0-9\u0080-\u00FF]*'
-        t.type = LexerClass.reserved.get(t.value, 'ID')
+        reservada = _RESERVADAS.get(t.value)
+        if reservada is None:
+            t.type = 'ID'
+        else:
+            t.type, t.codigo = reservada
         return t
 
 
     def __init__(self):        
         self.lexerObj = lex.lex(module=self)
 
+    @staticmethod
+    def linea_vacia(texto, pos):
+        """
+        Si la línea que acaba en el salto 'pos' solo tiene blancos o un
+        comentario #. Con ''' en ella no se sabe sin más (puede cerrar un
+        comentario de varias líneas) y se toma como línea con código.
+        """
+        inicio = _BLANCOS.match(texto, texto.rfind('\n', 0, pos) + 1).end()
+        if inicio == pos:
+            return True
+        return texto.startswith('#', inicio) and texto.find("'''", inicio, pos) < 0
+
+    @staticmethod
+    def fin_lineas_vacias(texto, pos):
+        """
+        Fin de las líneas en blanco o de solo comentarios (#, '''...''')
+        que empiezan en 'pos' (inicio de línea): la posición de la primera
+        línea con código, o de la última sin '\\n' final.
+        """
+        fin = pos
+        while True:
+            m = _BLANCOS.match(texto, pos)
+            pos = m.end()
+            if texto.startswith("'''", pos):
+                cierre = texto.find("'''", pos + 3)
+                if cierre < 0:
+                    return fin      # sin cerrar: lo informa t_COMMLinit
+                pos = cierre + 3
+                continue
+            if texto.startswith('#', pos):
+                pos = _FIN_COMENTARIO.match(texto, pos).end()
+            if not texto.startswith('\n', pos):
+                return fin
+            pos = fin = pos + 1
+
+    @staticmethod
+    def saltos(tok):
+        """
+        lexpos de cada salto de línea que representa un NEWLINE: los de
+        fuera de comentarios, uno por línea como en el .token de siempre.
+        """
+        valor, base = tok.value, tok.lexpos
+        saltos = []
+        m = _SALTO_O_COMENTARIO.search(valor)
+        while m is not None:
+            pos = m.end()
+            if m.group() == '\n':
+                saltos.append(base + m.start())
+            elif m.group() == "'''":
+                pos = valor.find("'''", pos) + 3
+            m = _SALTO_O_COMENTARIO.search(valor, pos)
+        return saltos
+
+    @staticmethod
+    def texto_token(tok, compacto=False):
+        """
+        Líneas del .token para 'tok': un NEWLINE por línea aunque el lexer
+        las junte, o uno por tramo con su número de líneas en modo compacto.
+        """
+        if tok.type != 'NEWLINE':
+            return f"{tok.type} {tok.value}\n"
+        if compacto:
+            return f"{tok.type} {len(LexerClass.saltos(tok))}\n"
+        return f"{tok.type} \n\n" * len(LexerClass.saltos(tok))
+
+    @staticmethod
+    def informar(lexer, tipo, pos, plantilla, *args, fin=None):
+        """
+        Diagnóstico en 'pos' del texto de 'lexer' (o del parser que lo usa).
+        Con un colector en lexer.diagnosticos se guarda sin formatear; si
+        no, se escribe ya en LexerClass.salida(lexer).
+        """
+        if fin is None and pos is not None:
+            fin = pos + 1
+        diagnostico = Diagnostico(tipo, plantilla, args, pos, LexerClass.mapa(lexer), fin=fin)
+        colector = getattr(lexer, 'diagnosticos', None)
+        if colector is not None:
+            colector.anotar(diagnostico)
+        else:
+            print(diagnostico.mensaje(), file=LexerClass.salida(lexer))
+
+    @staticmethod
+    def salida(lexer):
+        """
+        Dónde escribe sus mensajes 'lexer' (y el parser que lo usa): su
+        atributo 'salida' o, si no lo tiene (None), sys.stdout. Así cada
+        sesión desvía sus mensajes sin tocar sys.stdout, que es de todos
+        los hilos.
+        """
+        return getattr(lexer, 'salida', None)
+
+    @staticmethod
+    def mapa(lexer):
+        """
+        Mapa de posiciones del texto que está analizando 'lexer'.
+        Se crea la primera vez que se pide (no cuesta nada por token) y se
+        rehace solo si el lexer ha recibido otra entrada.
+        """
+        mapa = getattr(lexer, 'mapa_fuente', None)
+        if mapa is None or mapa.texto is not lexer.lexdata:
+            mapa = lexer.mapa_fuente = MapaFuente(lexer.lexdata)
+        return mapa
+
     @staticmethod
     def getTokens():
         return LexerClass.tokens
+
+
+# Para las reglas que ponen tok.codigo: los operadores y t_ID, que con
+# palabra -> (tipo, código) pone los dos con una sola búsqueda
+_T = LexerClass.TipoToken
+_RESERVADAS = MappingProxyType({palabra: (tipo, _T[tipo])
+                                for palabra, tipo in LexerClass.reserved.items()})
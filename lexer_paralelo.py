@@ -0,0 +1,143 @@
+"""
+Análisis léxico en paralelo de un fichero grande.
+
+1. Un pre-escaneo barato busca saltos de línea donde el lexer en serie
+   empezaría un token nuevo: fuera de bloques ''', de comentarios # y de
+   literales de carácter (que pueden contener un '\\n'), y detrás de las
+   líneas vacías o de comentarios que el lexer junta en el mismo NEWLINE.
+2. Cada trozo entre dos cortes se analiza en un pool de procesos.
+3. Se concatenan los tokens corrigiendo lexpos con el offset del trozo;
+   lineno ya sale bien porque cada trozo empieza con el lineno que
+   llevaría el lexer en serie (que no cuenta los '\\n' de un literal de
+   carácter), y los errores usan un MapaFuente con la línea real del trozo.
+
+El resultado es el mismo flujo de tokens (tipo, valor, lineno, lexpos)
+que LexerClass en serie, y los errores léxicos llegan en el mismo orden
+(cada trozo los recoge en un colector de diagnósticos).
+"""
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from ply.lex import LexToken
+
+from lexer import LexerClass
+from diagnosticos import Diagnosticos
+from mapa_fuente import MapaFuente
+
+# Por debajo de este tamaño el pool cuesta más de lo que ahorra
+UMBRAL = 1 << 20
+
+# Lo único que puede ocultar un salto de línea al lexer en serie, o
+# contener comillas o '#' que no abren nada (las cadenas).
+# Mismo orden de prioridad que en LexerClass: t_CARACTER antes que t_COMMLinit
+_OCULTAN = re.compile(r"'[^']'|'''|\#[^\n]*|\"[^\"\n]*\"")
+
+_texto = None       # texto completo en cada proceso trabajador
+_lexer = None
+
+
+def puntos_de_corte(texto, n_trozos):
+    """
+    Inicio de cada trozo como (offset, lineno): el primero es (0, 1) y el
+    resto están justo donde acaba un NEWLINE del lexer en serie (tras el
+    '\\n' y las líneas vacías o de comentarios que lo siguen). lineno es el
+    que llevaría el lexer en serie en ese punto.
+    """
+    objetivo = max(1, len(texto) // n_trozos)
+    cortes = [(0, 1)]
+    siguiente = objetivo
+    pos = 0
+    saltos_en_caracter = 0      # literales '\\n': t_CARACTER no suma lineno
+    while True:
+        m = _OCULTAN.search(texto, pos)
+        oculto = m.start() if m else len(texto)
+        # en [pos, oculto) no hay comillas ni '#': cualquier '\n' es seguro
+        while siguiente < oculto:
+            salto = texto.find('\n', max(siguiente, pos), oculto)
+            if salto < 0:
+                break
+            # el NEWLINE se extiende por las líneas vacías que siguen; en
+            # ellas no hay literales de carácter que descontar
+            corte = LexerClass.fin_lineas_vacias(texto, salto + 1)
+            lineno = 1 + texto.count('\n', 0, corte) - saltos_en_caracter
+            cortes.append((corte, lineno))
+            siguiente = corte + objetivo
+        if m is None:
+            break
+        if m.group() == "'''":
+            fin = texto.find("'''", m.end())
+            pos = len(texto) if fin < 0 else fin + 3
+        else:
+            if m.group() == "'\n'":
+                saltos_en_caracter += 1
+            pos = m.end()
+    if cortes[-1][0] >= len(texto) and len(cortes) > 1:
+        cortes.pop()
+    return cortes
+
+
+def _iniciar(texto):
+    global _texto
+    _texto = texto
+
+
+def _lexear_trozo(inicio, fin, lineno):
+    """(tokens como tuplas, diagnósticos) del trozo [inicio, fin)."""
+    global _lexer
+    if _lexer is None:
+        _lexer = LexerClass().lexerObj
+    _lexer.diagnosticos = Diagnosticos()
+    trozo = _texto[inicio:fin]
+    _lexer.input(trozo)
+    _lexer.lineno = lineno
+    # los mensajes de error dan la línea del fichero, no la del trozo
+    _lexer.mapa_fuente = MapaFuente(trozo, 1 + _texto.count('\n', 0, inicio))
+    tokens = [(t.type, t.value, t.lineno, t.lexpos + inicio, getattr(t, 'codigo', None))
+              for t in _lexer]
+    # viajan ya resueltos (línea y columna), sin el texto del trozo
+    return tokens, _lexer.diagnosticos
+
+
+def _token(tipo, valor, lineno, lexpos, codigo):
+    tok = LexToken()
+    tok.type, tok.value, tok.lineno, tok.lexpos = tipo, valor, lineno, lexpos
+    if codigo is not None:
+        tok.codigo = codigo     # operadores y palabras reservadas, como en serie
+    return tok
+
+
+def tokenizar(texto, trabajadores=None, diagnosticos=None):
+    """
+    Lista de tokens de 'texto', en paralelo si es lo bastante grande.
+    Los errores léxicos van al colector 'diagnosticos' o, sin él, se imprimen.
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    if len(texto) < UMBRAL or trabajadores == 1:
+        lexer = LexerClass().lexerObj
+        lexer.diagnosticos = diagnosticos
+        lexer.input(texto)
+        return list(lexer)
+
+    # varios trozos por trabajador para repartir mejor la carga
+    cortes = puntos_de_corte(texto, trabajadores * 4)
+    fines = [inicio for inicio, _ in cortes[1:]] + [len(texto)]
+    tramos = [(inicio, fin, lineno) for (inicio, lineno), fin in zip(cortes, fines)]
+
+    # con fork el texto se hereda sin serializarlo
+    metodo = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with ProcessPoolExecutor(max_workers=trabajadores,
+                             mp_context=multiprocessing.get_context(metodo),
+                             initializer=_iniciar, initargs=(texto,)) as pool:
+        futuros = [pool.submit(_lexear_trozo, *tramo) for tramo in tramos]
+        tokens = []
+        for futuro in futuros:
+            trozo, colector = futuro.result()
+            if diagnosticos is not None:
+                diagnosticos.unir(colector)
+            else:
+                colector.escribir(sys.stdout)
+            tokens.extend(_token(*t) for t in trozo)
+    return tokens
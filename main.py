@@ -3,27 +3,39 @@ import os
 from parser import ParserClass
 import traceback
 from lexer import LexerClass
-
-def guardar_tokens(archivo):
+from lexer_paralelo import tokenizar
+from diagnosticos import Diagnosticos
+from optimizador import optimizar, informe
+import rangos
+from proyecto import construir
+from transpilador import compilar, ejecutar, formatear
+import preludio
+
+def guardar_tokens(archivo, compacto=False):
     """
     Genera un .token con el mismo nombre base que el .symbol y .record.
     Ejemplo: si archivo="test.c", creará "test.token".
+    El lexer junta las líneas vacías seguidas en un solo NEWLINE; el .token
+    sigue teniendo un NEWLINE por línea salvo en modo compacto, que escribe
+    uno por tramo con el número de líneas ("NEWLINE 3").
     """
     # 1) Calculamos el nombre base sin extensión
     base = os.path.splitext(archivo)[0]
     # 2) Construimos la ruta de salida con extensión .token
     ruta_salida = base + '.token'
 
-    # 3) Obtenemos el lexer
-    lexer = LexerClass().lexerObj
+    # 3) Tokenizamos (en paralelo si el fichero es grande); los errores
+    #    léxicos se recogen y se escriben de una vez
+    diagnosticos = Diagnosticos()
     with open(archivo, 'r') as f:
         contenido = f.read()
-        lexer.input(contenido)
+        tokens = tokenizar(contenido, diagnosticos=diagnosticos)
+        diagnosticos.escribir(sys.stdout)
 
         # 4) Escribimos cada token en el nuevo fichero
         with open(ruta_salida, 'w') as out:
-            for tok in lexer:
-                out.write(f"{tok.type} {tok.value}\n")
+            for tok in tokens:
+                out.write(LexerClass.texto_token(tok, compacto))
 
 
 def analizar_lexico(archivo):
@@ -31,16 +43,19 @@ def analizar_lexico(archivo):
     lexer = LexerClass().lexerObj
     try:
         with open(archivo, 'r') as f:
-            lineas = f.readlines()
-            contenido = ''.join(lineas)
+            contenido = f.read()
             lexer.input(contenido)
+            mapa = LexerClass.mapa(lexer)
 
             for tok in lexer:
-                print(f"{tok.type} {tok.value}")
-                if tok.type == "NEWLINE":
-                    num_linea = tok.lineno - 1  # Las líneas empiezan en 1
-                    if 0 <= num_linea < len(lineas):
-                        print(f">>> Línea {tok.lineno + 1}")
+                if tok.type != "NEWLINE":
+                    print(f"{tok.type} {tok.value}")
+                    continue
+                # Un NEWLINE por línea aunque el lexer junte las vacías; la
+                # línea que empieza tras cada salto se resuelve con el mapa
+                for salto in LexerClass.saltos(tok):
+                    print(f"{tok.type} \n")
+                    print(f">>> Línea {mapa.linea(salto + 1)}")
         
     except Exception as e:
         print(f"Error durante el análisis léxico: {e}")
@@ -48,84 +63,150 @@ def analizar_lexico(archivo):
 
 
 
-def analizar_parser(archivo):
+def cargar_preludio(parser, ruta):
+    """
+    Analiza el programa encima del preludio de 'ruta' (instantánea de la
+    caché si no ha cambiado). Devuelve False si el preludio tiene errores.
+    """
+    if ruta is None:
+        return True
+    resultado = preludio.preparar(ruta)
+    if resultado['error']:
+        print(resultado['error'], end='')
+        return False
+    preludio.aplicar(parser, resultado['instantanea'])
+    return True
+
+def analizar_parser(archivo, ruta_preludio=None):
     parser = ParserClass(archivo)
     parser.entorno = {}
     parser.tipos_registro = {}
+    diagnosticos = parser.lexer.diagnosticos = Diagnosticos()
 
     try:
+        if not cargar_preludio(parser, ruta_preludio):
+            return
+
         # 1) Leemos todo el contenido
         with open(archivo, 'r') as f:
             contenido = f.read()
 
-        # 2) Parseamos el contenido y capturamos el resultado
-        resultado = parser.parse(contenido)
-        # 2.a) Comprobamos errores semánticos individuales
-        # Si parse devuelve un dict con 'error', lo mostramos y salimos
-        if isinstance(resultado, dict) and 'error' in resultado:
-            print(f"Error semántico: {resultado['error']} en línea {resultado.get('line')}")
+        # 2) Comprobamos sin construir el AST (cada sentencia se descarta al
+        #    reducirse); el primer error semántico corta el análisis. Solo si
+        #    hay algún error se repite el análisis con posiciones
+        error = parser.comprobar(contenido)
+        if error is not None:
+            diagnosticos.semantico(parser, error)
+        else:
+            # 3) Escritura de símbolos y registros solo si no hubo errores
+            parser.escribir_tablas(archivo)
+        # 4) Todos los diagnósticos de una vez
+        diagnosticos.escribir(sys.stdout)
+
+    except Exception as e:
+        print(f"Error al ejecutar el parser: {e}")
+        traceback.print_exc()
+
+def analizar_optimizacion(archivo, ruta_preludio=None):
+    """Analiza el fichero y muestra las estadísticas de los pases del optimizador."""
+    parser = ParserClass(archivo)
+    diagnosticos = parser.lexer.diagnosticos = Diagnosticos()
+    try:
+        if not cargar_preludio(parser, ruta_preludio):
             return
 
-        # Si es una lista de sentencias, buscamos errores dentro
-        if isinstance(resultado, list):
-            for nodo in resultado:
-                if isinstance(nodo, dict) and 'error' in nodo:
-                    print(f"Error semántico: {nodo['error']} en línea {nodo.get('line')}")
-                    return
-
-        # 3) Escritura de símbolos solo si no hubo errores
-        base = os.path.splitext(archivo)[0]
-
-
-        with open(base + '.symbol', 'w') as f_sym:
-            for nombre, info in parser.entorno.items():
-                if isinstance(info, dict) and info.get('type') == 'registro':
-                    tipo = info.get('tipo_registro')
-                elif isinstance(info, dict):
-                    tipo = info['type']
-                else:
-                    tipo = type(info).__name__
-                f_sym.write(f"{nombre} : {tipo}\n")
-
-        # 4) Escritura de registros
-        if getattr(parser, 'tipos_registro', None) is not None:
-            with open(base + '.record', 'w') as f_rec:
-                for nombre, props in parser.tipos_registro.items():
-                    if isinstance(props, dict):
-                        # Construimos "campo:tipo" para cada par
-                        campos = ','.join(f"{campo}:{tipo}" for campo, tipo in props.items())
-                        f_rec.write(f"{nombre} : {campos}\n")
-                    else:
-                        print(f"Registro '{nombre}' ignorado: esperaba dict, obtuvo {type(props).__name__}")
+        with open(archivo, 'r') as f:
+            contenido = f.read()
+
+        # El optimizador necesita el programa completo, no el modo streaming
+        programa = parser.parse(contenido)
+        if isinstance(programa, dict) and 'error' in programa:
+            diagnosticos.semantico(parser, programa)
+        diagnosticos.escribir(sys.stdout)
+        if isinstance(programa, dict) and 'error' in programa:
+            return
+
+        _, estadisticas = optimizar(programa, parser.func_prototypes)
+        print("=== OPTIMIZACIÓN ===")
+        print(informe(estadisticas))
+        # comprobaciones de rango que el análisis de los 'for' ha eliminado
+        print(rangos.informe(rangos.estadisticas(programa)))
 
     except Exception as e:
-        print(f"Error al ejecutar el parser: {e}")
+        print(f"Error al optimizar: {e}")
+        traceback.print_exc()
+
+def analizar_ejecucion(archivo):
+    """Traduce el fichero a Python (o reutiliza la traducción en caché) y lo ejecuta."""
+    try:
+        resultado = compilar(archivo)
+        if resultado['error']:
+            print(resultado['error'], end='')
+            return
+
+        variables = ejecutar(resultado['codigo'])
+        print("=== EJECUCIÓN ===")
+        for nombre, valor in variables.items():
+            print(f"{nombre} = {formatear(valor)}")
+        print("(código de la caché)" if resultado['cache'] else "(código traducido y guardado en caché)")
+
+    except Exception as e:
+        print(f"Error al ejecutar: {e}")
         traceback.print_exc()
 
+def analizar_proyecto(directorio):
+    """Construcción incremental de todos los módulos del directorio."""
+    estados = construir(directorio)
+    print("=== PROYECTO ===")
+    for modulo in sorted(estados):
+        print(f"{modulo}: {estados[modulo]}")
+
 def main():
     if len(sys.argv) < 2:
-        print("Uso: python3 main.py <archivo>")
+        print("Uso: python3 main.py <archivo | directorio del proyecto> [--compacto] [--preludio <archivo>]")
         sys.exit(1)
     
     archivo = sys.argv[1]
+    opciones = sys.argv[2:]
+    # registros, funciones y globales comunes ya analizados (opciones 2 y 3)
+    ruta_preludio = None
+    if '--preludio' in opciones:
+        i = opciones.index('--preludio')
+        if i + 1 >= len(opciones) or not os.path.isfile(opciones[i + 1]):
+            print("Error: --preludio necesita un archivo existente.")
+            sys.exit(1)
+        ruta_preludio = opciones[i + 1]
+
+    # Un directorio se analiza como proyecto de varios módulos
+    if os.path.isdir(archivo):
+        analizar_proyecto(archivo)
+        return
     
     if not os.path.isfile(archivo):
         print(f"Error: El archivo '{archivo}' no existe.")
         sys.exit(1)
 
     # Siempre genera archivo de tokens
-    guardar_tokens(archivo)
+    guardar_tokens(archivo, compacto='--compacto' in opciones)
     print("Tokens guardados en 'tokens.token'.")
 
     print("¿Qué análisis deseas realizar?")
     print("1 - Solo léxico (tokens)")
     print("2 - Léxico + sintáctico (parser)")
-    eleccion = input("Elige una opción (1/2): ")
+    print("3 - Optimización (estadísticas de los pases)")
+    print("4 - Ejecutar (traducido a Python)")
+    eleccion = input("Elige una opción (1/2/3/4): ")
 
     if eleccion == "1":
         analizar_lexico(archivo)
     elif eleccion == "2":
-        analizar_parser(archivo)
+        analizar_parser(archivo, ruta_preludio)
+    elif eleccion == "3":
+        analizar_optimizacion(archivo, ruta_preludio)
+    elif eleccion == "4":
+        if ruta_preludio is not None:
+            print("El preludio solo se usa en el análisis (opciones 2 y 3); no se traduce.")
+        analizar_ejecucion(archivo)
     else:
         print("Opción inválida.")
         sys.exit(1)
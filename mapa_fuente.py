@@ -0,0 +1,54 @@
+from array import array
+from bisect import bisect_left
+import re
+
+_SALTO = re.compile('\n')
+
+
+class MapaFuente:
+    """
+    Índice de saltos de línea de un fichero fuente.
+    Se construye una sola vez, la primera vez que se pide una posición,
+    y traduce offsets (lexpos) a (línea, columna) en O(log n).
+    Líneas y columnas empiezan en 1; si el texto es un trozo de un fichero
+    mayor, 'primera_linea' es la línea del fichero en la que empieza.
+    """
+
+    def __init__(self, texto, primera_linea=1):
+        self.texto = texto
+        self.primera_linea = primera_linea
+        self._saltos = None
+
+    def _indice(self):
+        if self._saltos is None:
+            self._saltos = array('q', [m.start() for m in _SALTO.finditer(self.texto)])
+        return self._saltos
+
+    def posicion(self, offset):
+        """Devuelve (línea, columna) del carácter en 'offset'."""
+        saltos = self._indice()
+        # número de saltos de línea estrictamente antes de offset
+        n = bisect_left(saltos, offset)
+        inicio = saltos[n - 1] + 1 if n else 0
+        return n + self.primera_linea, offset - inicio + 1
+
+    def linea(self, offset):
+        return bisect_left(self._indice(), offset) + self.primera_linea
+
+    def columna(self, offset):
+        return self.posicion(offset)[1]
+
+    def num_lineas(self):
+        saltos = self._indice()
+        # la última línea cuenta aunque no acabe en salto
+        if self.texto and not self.texto.endswith('\n'):
+            return len(saltos) + 1
+        return len(saltos)
+
+    def texto_linea(self, linea):
+        """Texto de la línea 'linea' sin el salto final."""
+        saltos = self._indice()
+        linea -= self.primera_linea - 1
+        inicio = saltos[linea - 2] + 1 if linea > 1 else 0
+        fin = saltos[linea - 1] if linea - 1 < len(saltos) else len(self.texto)
+        return self.texto[inicio:fin]
@@ -0,0 +1,101 @@
+"""
+Nodos de expresión compartidos (hash-consing).
+
+El código generado repite mucho las mismas subexpresiones ('a*b+c' cien
+veces). Cada nodo de expresión bien tipado se guarda en una tabla por su
+clave estructural; si la misma expresión vuelve a aparecer con el mismo
+entorno, se devuelve el nodo ya construido y no se repite la comprobación
+de tipos.
+
+Claves:
+  - Los hijos entran por identidad (id): ya son nodos compartidos, y el
+    padre los mantiene vivos mientras esté en la tabla, así que su id no
+    se reutiliza.
+  - Lo que depende del entorno (variables, vectores, funciones) lleva la
+    versión del nombre: cada cambio de su entrada le da una versión nueva
+    del contador, y cada ámbito de función tiene su propio número. Una
+    misma clave siempre describe el mismo contenido.
+
+La tabla guarda como mucho MAXIMO nodos y olvida primero los que hace
+más tiempo que no se piden (LRU): las claves con versiones ya superadas
+no vuelven a acertar nunca, y sin límite la tabla crecería con todo el
+fichero en vez de con la sentencia más grande. Olvidar un nodo solo
+cuesta compartir menos: un padre que siga en la tabla mantiene vivos a
+sus hijos, así que sus id no se reutilizan mientras su clave exista.
+
+Los nodos compartidos no se deben modificar; el optimizador ya trabaja
+sobre copias (con_hijos, mapear_expresiones). Los nodos de error llevan
+posición y no se comparten.
+"""
+import sys
+from collections import OrderedDict
+
+# Nodos que se conservan; de sobra para las subexpresiones repetidas de
+# una función o de un tramo de sentencias seguidas
+MAXIMO = 4096
+
+
+class TablaNodos:
+
+    def __init__(self, maximo=MAXIMO):
+        self.maximo = maximo
+        self._nodos = OrderedDict()
+        self.version = 0          # contador de cambios del entorno
+        self._versiones = {}      # nombre -> versión de su último cambio
+        self._ambito = 0
+        self._ambitos = []        # ámbitos exteriores (funciones anidadas)
+        self.pedidos = 0
+        self.compartidos = 0
+        self.bytes_ahorrados = 0
+
+    def buscar(self, clave):
+        """Nodo ya construido para 'clave', o None."""
+        self.pedidos += 1
+        nodo = self._nodos.get(clave)
+        if nodo is not None:
+            self._nodos.move_to_end(clave)
+            self.compartidos += 1
+            self.bytes_ahorrados += sys.getsizeof(nodo)
+        return nodo
+
+    def guardar(self, clave, nodo):
+        self._nodos[clave] = nodo
+        if len(self._nodos) > self.maximo:
+            self._nodos.popitem(last=False)
+        return nodo
+
+    def clave_nombre(self, nombre):
+        """Parte de la clave que identifica la entrada actual de 'nombre'."""
+        return (nombre, self._ambito, self._versiones.get(nombre))
+
+    def modificado(self, nombre):
+        """La entrada de 'nombre' ha cambiado: sus nodos antiguos ya no valen."""
+        self.version += 1
+        self._versiones[nombre] = self.version
+
+    def entrar_ambito(self):
+        self.version += 1
+        self._ambitos.append(self._ambito)
+        self._ambito = self.version
+
+    def salir_ambito(self):
+        # el ámbito exterior no pudo cambiar mientras no era visible
+        if self._ambitos:
+            self._ambito = self._ambitos.pop()
+        else:
+            self.vaciar()
+
+    def vaciar(self):
+        """Olvida los nodos (el entorno se ha restaurado o reiniciado)."""
+        self._nodos.clear()
+        self._ambitos.clear()
+        self._ambito = self.version = self.version + 1
+
+    def estadisticas(self):
+        return {
+            'nodos': len(self._nodos),
+            'pedidos': self.pedidos,
+            'compartidos': self.compartidos,
+            'proporcion': self.compartidos / self.pedidos if self.pedidos else 0.0,
+            'bytes_ahorrados': self.bytes_ahorrados,
+        }
@@ -0,0 +1,60 @@
+"""
+Tablas de despacho de operadores, indexadas por el código entero del token
+(el TipoToken que el lexer deja en tok.codigo) y los tipos (tipos.Tipo) de
+los operandos.
+
+TABLA_BINARIA[(op, tipo_izq, tipo_der)] -> tipo del resultado
+TABLA_UNARIA[(op, tipo)]                -> tipo del resultado
+Si la combinación no está en la tabla, el error se construye con la
+plantilla de ERRORES_BINARIOS / ERRORES_UNARIOS del operador.
+"""
+from lexer import LexerClass
+from tipos import INT, FLOAT, BOOL, NUMERICOS
+
+T = LexerClass.TipoToken
+CODIGOS = LexerClass.CODIGOS
+
+ARITMETICOS = (T.SUM, T.RES, T.MUL, T.DIV)
+LOGICOS = (T.AND, T.OR)
+RELACIONALES = (T.I, T.M, T.m, T.MI, T.mI)
+FUNCIONES = (T.COS, T.SEN, T.LOG, T.EXP)
+
+TABLA_BINARIA = {}
+ERRORES_BINARIOS = {}
+
+for _op in ARITMETICOS:
+    for _izq in NUMERICOS:
+        for _der in NUMERICOS:
+            TABLA_BINARIA[(_op, _izq, _der)] = FLOAT if FLOAT in (_izq, _der) else INT
+    ERRORES_BINARIOS[_op] = "Operador '{op}' requiere operandos numéricos, no {izq} y {der}"
+
+for _op in LOGICOS:
+    TABLA_BINARIA[(_op, BOOL, BOOL)] = BOOL
+    ERRORES_BINARIOS[_op] = "Operador lógico '{op}' requiere booleanos, no {izq} y {der}"
+
+for _op in RELACIONALES:
+    TABLA_BINARIA[(_op, INT, INT)] = BOOL
+    ERRORES_BINARIOS[_op] = "Operador relacional '{op}' requiere enteros, no {izq} y {der}"
+
+TABLA_UNARIA = {}
+ERRORES_UNARIOS = {}
+
+for _op in (T.RES, T.SUM):
+    for _t in NUMERICOS:
+        TABLA_UNARIA[(_op, _t)] = _t
+    ERRORES_UNARIOS[_op] = "Operador unario '{op}' requiere int o float, no {tipo}"
+
+TABLA_UNARIA[(T.NOT, BOOL)] = BOOL
+ERRORES_UNARIOS[T.NOT] = "Operador 'not' requiere expresión booleana"
+
+for _op in FUNCIONES:
+    for _t in NUMERICOS:
+        # trig/log siempre float
+        TABLA_UNARIA[(_op, _t)] = FLOAT
+    ERRORES_UNARIOS[_op] = "Función '{nombre}' requiere int o float, no {tipo}"
+
+# Clase de nodo AST que produce cada operador unario
+NODO_UNARIO = {T.RES: 'un', T.SUM: 'un', T.NOT: 'un',
+               T.COS: 'func', T.SEN: 'func', T.LOG: 'func', T.EXP: 'func'}
+
+del _op, _izq, _der, _t
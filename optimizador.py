@@ -0,0 +1,616 @@
+"""
+Optimizador del programa ya comprobado por ParserClass.
+
+Trabaja sobre la lista de sentencias que devuelve ParserClass.parse()
+(nodos 'decl', 'asig', 'if', 'while', 'for', 'funcion' y expresiones) y aplica,
+por orden, los pases de PASES. Cada pase devuelve el programa nuevo y un
+dict con sus estadísticas; los nodos de entrada no se modifican.
+"""
+import functools
+import itertools
+
+# Nodos que son expresiones (todas llevan 'tipo' y 'valor')
+EXPRESIONES = {'lit', 'var', 'bin', 'un', 'func', 'call', 'index', 'len', 'asig'}
+
+# Candidatas a CSE / hoisting: las que hacen algún cálculo
+CALCULOS = {'bin', 'un', 'func', 'call', 'index'}
+
+# Tamaño máximo (en nodos) de la expresión de retorno de una función inlinable
+MAX_INLINE = 8
+
+_temporales = itertools.count()
+
+
+def _temporal(prefijo):
+    return f"_{prefijo}{next(_temporales)}"
+
+
+#
+#region 1. UTILIDADES SOBRE EXPRESIONES
+#
+
+def es_expresion(n):
+    return isinstance(n, dict) and n.get('node') in EXPRESIONES
+
+
+def hijos(e):
+    """Subexpresiones directas de e."""
+    kind = e.get('node')
+    if kind == 'bin':
+        return [e['izq'], e['der']]
+    if kind in ('un', 'func', 'asig'):
+        return [e['expr']]
+    if kind == 'call':
+        return list(e['args'])
+    if kind == 'index':
+        return [e['indice']]
+    return []
+
+
+def con_hijos(e, nuevos):
+    """Copia de e con las subexpresiones sustituidas (mismo orden que hijos())."""
+    e = dict(e)
+    kind = e.get('node')
+    if kind == 'bin':
+        e['izq'], e['der'] = nuevos
+    elif kind in ('un', 'func', 'asig'):
+        e['expr'], = nuevos
+    elif kind == 'call':
+        e['args'] = list(nuevos)
+    elif kind == 'index':
+        e['indice'], = nuevos
+    return e
+
+
+def clave(e):
+    """Clave estructural hashable de una expresión pura, o None."""
+    kind = e.get('node')
+    if kind == 'lit':
+        return ('lit', e['tipo'], e['valor'])
+    if kind == 'var':
+        return ('var', e['nombre'])
+    if kind == 'len':
+        return ('len', e['nombre'])
+    if kind in ('bin', 'un', 'func'):
+        claves = tuple(clave(h) for h in hijos(e))
+        return None if None in claves else (kind, e['op']) + claves
+    if kind in ('call', 'index'):
+        claves = tuple(clave(h) for h in hijos(e))
+        return None if None in claves else (kind, e['nombre']) + claves
+    return None     # asignaciones anidadas y nodos desconocidos
+
+
+def lecturas(e, acc=None):
+    """Nombres de variable que lee una expresión."""
+    acc = set() if acc is None else acc
+    kind = e.get('node')
+    if kind in ('var', 'index', 'len'):     # v.len también lee v
+        acc.add(e['nombre'])
+    for h in hijos(e):
+        lecturas(h, acc)
+    return acc
+
+
+def tamano(e):
+    return 1 + sum(tamano(h) for h in hijos(e))
+
+
+def _contiene(e, kinds, ops=()):
+    if e.get('node') in kinds or e.get('op') in ops:
+        return True
+    return any(_contiene(h, kinds, ops) for h in hijos(e))
+
+
+def es_pura(e):
+    # las funciones de Viper no ven el ámbito global: solo las asignaciones
+    # anidadas tienen efectos
+    return not _contiene(e, {'asig'})
+
+
+def es_segura(e):
+    # sin divisiones, log, accesos a vector ni llamadas: se puede evaluar
+    # antes de tiempo sin introducir un fallo que el original no tenía
+    return not _contiene(e, {'asig', 'index', 'call'}, ops={'DIV', 'log'})
+
+
+def valor_constante(e):
+    """(True, valor) si la expresión solo depende de literales, si no (False, None)."""
+    kind = e.get('node')
+    if kind == 'lit':
+        return True, e['valor']
+    if kind == 'un':
+        ok, v = valor_constante(e['expr'])
+        if not ok:
+            return False, None
+        return True, {'NOT': lambda x: not x, 'RES': lambda x: -x, 'SUM': lambda x: x}[e['op']](v)
+    if kind == 'bin':
+        ok1, a = valor_constante(e['izq'])
+        ok2, b = valor_constante(e['der'])
+        if not (ok1 and ok2):
+            return False, None
+        op = e['op']
+        if op in _PLEGABLES:
+            return True, _PLEGABLES[op](a, b)
+    return False, None
+
+
+_PLEGABLES = {
+    'AND': lambda a, b: a and b,
+    'OR':  lambda a, b: a or b,
+    'I':   lambda a, b: a == b,
+    'M':   lambda a, b: a > b,
+    'm':   lambda a, b: a < b,
+    'MI':  lambda a, b: a >= b,
+    'mI':  lambda a, b: a <= b,
+    'SUM': lambda a, b: a + b,
+    'RES': lambda a, b: a - b,
+    'MUL': lambda a, b: a * b,
+}
+
+
+def variable(nombre, tipo):
+    return {'node': 'var', 'nombre': nombre, 'tipo': tipo, 'valor': None}
+
+
+def declaracion(nombre, expr, line):
+    return {'node': 'decl', 'tipo_var': expr['tipo'], 'decls': [(nombre, expr)], 'line': line}
+
+#endregion
+
+
+#
+#region 2. UTILIDADES SOBRE SENTENCIAS
+#
+
+def expresiones_de(s):
+    """Expresiones evaluadas directamente por la sentencia s (sin bloques)."""
+    if es_expresion(s):
+        return [s]
+    kind = s.get('node') if isinstance(s, dict) else None
+    if kind == 'decl':
+        return [init for _, init in s['decls'] if init is not None]
+    if kind in ('if', 'while'):
+        return [s['cond']]
+    if kind == 'for':
+        return [s['desde'], s['hasta']]
+    return []
+
+
+def con_expresiones(s, nuevas):
+    """Copia de s con sus expresiones directas sustituidas."""
+    if es_expresion(s):
+        return nuevas[0]
+    s = dict(s)
+    kind = s['node']
+    if kind == 'decl':
+        it = iter(nuevas)
+        s['decls'] = [(n, None if init is None else next(it)) for n, init in s['decls']]
+    elif kind in ('if', 'while'):
+        s['cond'] = nuevas[0]
+    elif kind == 'for':
+        s['desde'], s['hasta'] = nuevas
+    return s
+
+
+def bloques_de(s):
+    """Nombres de los bloques de sentencias anidados en s."""
+    kind = s.get('node') if isinstance(s, dict) else None
+    if kind == 'if':
+        return ('then', 'else')
+    if kind in ('while', 'for'):
+        return ('body',)
+    if kind == 'funcion':
+        return ('cuerpo',)
+    return ()
+
+
+def escrituras(s, acc=None):
+    """Nombres de variable asignados o declarados en s (incluidos sus bloques)."""
+    acc = set() if acc is None else acc
+    if not isinstance(s, dict):
+        return acc
+    kind = s.get('node')
+    if kind == 'decl':
+        acc.update(n for n, _ in s['decls'])
+    if kind == 'for':
+        acc.add(s['var'])
+    if kind == 'funcion':
+        return acc          # el cuerpo tiene su propio ámbito
+    for e in expresiones_de(s):
+        _escrituras_expr(e, acc)
+    for b in bloques_de(s):
+        for t in _lista(s[b]):
+            escrituras(t, acc)
+    return acc
+
+
+def _escrituras_expr(e, acc):
+    if e.get('node') == 'asig':
+        acc.add(e['destino'][1])
+    for h in hijos(e):
+        _escrituras_expr(h, acc)
+    if e.get('node') == 'asig' and e['destino'][0] == 'index':
+        _escrituras_expr(e['destino'][2], acc)
+
+
+def lecturas_sentencia(s, acc):
+    if not isinstance(s, dict):
+        return acc
+    for e in expresiones_de(s):
+        lecturas(e, acc)
+        _lecturas_destinos(e, acc)
+    for b in bloques_de(s):
+        for t in _lista(s[b]):
+            lecturas_sentencia(t, acc)
+    if s.get('node') == 'funcion' and es_expresion(s.get('ret')):
+        lecturas(s['ret'], acc)
+    return acc
+
+
+def _lecturas_destinos(e, acc):
+    # el índice de un destino v[i] = ... también se lee
+    if e.get('node') == 'asig' and e['destino'][0] == 'index':
+        lecturas(e['destino'][2], acc)
+    for h in hijos(e):
+        _lecturas_destinos(h, acc)
+
+
+def _lista(bloque):
+    return bloque if isinstance(bloque, list) else []
+
+
+def mapear_bloques(s, f):
+    """Copia de s aplicando f a cada uno de sus bloques anidados."""
+    nombres = bloques_de(s)
+    if not nombres:
+        return s
+    s = dict(s)
+    for b in nombres:
+        if isinstance(s[b], list):
+            s[b] = f(s[b])
+    return s
+
+
+def mapear_expresiones(s, f):
+    """Copia de s aplicando f a cada expresión directa."""
+    exprs = expresiones_de(s)
+    if not exprs:
+        return s
+    return con_expresiones(s, [f(e) for e in exprs])
+
+#endregion
+
+
+#
+#region 3. PASES
+#
+
+def pase_ramas_constantes(programa, prototipos):
+    """Elimina ramas 'if' con condición constante y cuerpos de 'while false'."""
+    stats = {'if_eliminados': 0, 'while_eliminados': 0}
+
+    def bloque(sentencias):
+        salida = []
+        for s in sentencias:
+            s = mapear_bloques(s, bloque)
+            kind = s.get('node') if isinstance(s, dict) else None
+            if kind in ('if', 'while'):
+                ok, v = valor_constante(s['cond'])
+                if ok and kind == 'if':
+                    stats['if_eliminados'] += 1
+                    salida.extend(_lista(s['then'] if v else s['else']))
+                    continue
+                if ok and kind == 'while' and not v:
+                    stats['while_eliminados'] += 1
+                    continue
+            salida.append(s)
+        return salida
+
+    return bloque(programa), stats
+
+
+def pase_inlining(programa, prototipos):
+    """Sustituye llamadas a funciones pequeñas (cuerpo vacío, return corto) por su return."""
+    stats = {'funciones_inlinables': 0, 'llamadas_inlinadas': 0}
+    inlinables = {}
+    for nombre, proto in prototipos.items():
+        ret = proto.get('ret')
+        cuerpo = [s for s in _lista(proto.get('cuerpo')) if isinstance(s, dict)]
+        if (not cuerpo and es_expresion(ret) and es_pura(ret)
+                and tamano(ret) <= MAX_INLINE
+                and not _llama_a(ret, nombre)):
+            inlinables[nombre] = proto
+    stats['funciones_inlinables'] = len(inlinables)
+
+    def expr(e):
+        e = con_hijos(e, [expr(h) for h in hijos(e)])
+        if e.get('node') != 'call' or e['nombre'] not in inlinables:
+            return e
+        proto = inlinables[e['nombre']]
+        sustituciones = {pname: arg for (_, pname), arg in zip(proto['params'], e['args'])}
+        usos = {}
+        _contar_usos(proto['ret'], usos)
+        # un argumento no trivial usado varias veces se evaluaría varias veces
+        for pname, arg in sustituciones.items():
+            if usos.get(pname, 0) > 1 and arg.get('node') not in ('lit', 'var'):
+                return e
+        stats['llamadas_inlinadas'] += 1
+        cuerpo = _sustituir(proto['ret'], sustituciones)
+        # el resultado conserva el tipo declarado de la función
+        return dict(cuerpo, tipo=e['tipo'])
+
+    def bloque(sentencias):
+        return [mapear_expresiones(mapear_bloques(s, bloque), expr) for s in sentencias]
+
+    return bloque(programa), stats
+
+
+def _llama_a(e, nombre):
+    if e.get('node') == 'call' and e['nombre'] == nombre:
+        return True
+    return any(_llama_a(h, nombre) for h in hijos(e))
+
+
+def _contar_usos(e, usos):
+    if e.get('node') == 'var':
+        usos[e['nombre']] = usos.get(e['nombre'], 0) + 1
+    for h in hijos(e):
+        _contar_usos(h, usos)
+
+
+def _sustituir(e, sustituciones):
+    if e.get('node') == 'var' and e['nombre'] in sustituciones:
+        return sustituciones[e['nombre']]
+    return con_hijos(e, [_sustituir(h, sustituciones) for h in hijos(e)])
+
+
+def pase_invariantes(programa, prototipos):
+    """Saca de los bucles las expresiones que no dependen de nada asignado en ellos."""
+    stats = {'expresiones_sacadas': 0}
+
+    def bloque(sentencias):
+        salida = []
+        for s in sentencias:
+            s = mapear_bloques(s, bloque)
+            if isinstance(s, dict) and s.get('node') in ('while', 'for'):
+                # en un 'for' el contador cambia en cada vuelta y los límites
+                # se evalúan una sola vez: solo se saca del cuerpo
+                asignadas = escrituras(s) if s['node'] == 'for' else set()
+                for t in _lista(s['body']):
+                    escrituras(t, asignadas)
+                temporales = {}
+                if s['node'] == 'while':
+                    s = mapear_expresiones(s, lambda e: sacar(e, asignadas, temporales))
+                else:
+                    s = dict(s)
+                s['body'] = interior(_lista(s['body']), asignadas, temporales)
+                for nombre, e in temporales.values():
+                    salida.append(declaracion(nombre, e, s.get('line')))
+                    stats['expresiones_sacadas'] += 1
+            salida.append(s)
+        return salida
+
+    def interior(sentencias, asignadas, temporales):
+        # cuerpo del bucle, entrando en los 'if' pero no en los bucles anidados,
+        # que ya han sacado lo suyo
+        salida = []
+        for t in sentencias:
+            if isinstance(t, dict) and t.get('node') not in ('while', 'for', 'funcion'):
+                t = mapear_expresiones(t, lambda e: sacar(e, asignadas, temporales))
+                t = mapear_bloques(t, lambda b: interior(b, asignadas, temporales))
+            salida.append(t)
+        return salida
+
+    def sacar(e, asignadas, temporales):
+        k = clave(e)
+        if (e.get('node') in CALCULOS and k is not None and es_segura(e)
+                and not (lecturas(e) & asignadas)):
+            if k not in temporales:
+                temporales[k] = (_temporal('inv'), e)
+            return variable(temporales[k][0], e['tipo'])
+        return con_hijos(e, [sacar(h, asignadas, temporales) for h in hijos(e)])
+
+    return bloque(programa), stats
+
+
+def pase_cse(programa, prototipos):
+    """Eliminación de subexpresiones comunes dentro de cada bloque básico."""
+    stats = {'subexpresiones_reutilizadas': 0, 'temporales': 0}
+
+    def bloque(sentencias):
+        salida = []
+        for segmento in _bloques_basicos([mapear_bloques(s, bloque) for s in sentencias]):
+            salida.extend(_cse_segmento(segmento, stats))
+        return salida
+
+    return bloque(programa), stats
+
+
+def _bloques_basicos(sentencias):
+    """Parte una lista de sentencias en bloques básicos."""
+    actual = []
+    for s in sentencias:
+        kind = s.get('node') if isinstance(s, dict) else None
+        if kind in ('while', 'for', 'funcion'):
+            # la condición del while se evalúa en cada vuelta: va sola
+            if actual:
+                yield actual
+            yield [s]
+            actual = []
+        else:
+            actual.append(s)
+            if kind == 'if':
+                yield actual
+                actual = []
+    if actual:
+        yield actual
+
+
+def _cse_segmento(segmento, stats):
+    if len(segmento) == 1 and bloques_de(segmento[0]) and segmento[0].get('node') != 'if':
+        return segmento
+    epocas = {}
+
+    def firma(e, k):
+        # una misma clave en otra "época" de sus variables es otra expresión
+        return k, tuple(sorted((v, epocas.get(v, 0)) for v in lecturas(e)))
+
+    def avanzar(s):
+        for v in escrituras(s):
+            epocas[v] = epocas.get(v, 0) + 1
+
+    # 1) Contar apariciones; una aparición repetida se sustituirá entera,
+    #    así que no se cuentan sus subexpresiones
+    cuenta = {}
+
+    def contar(e):
+        k = clave(e)
+        if e.get('node') in CALCULOS and k is not None:
+            f = firma(e, k)
+            cuenta[f] = cuenta.get(f, 0) + 1
+            if cuenta[f] > 1:
+                return
+        for h in hijos(e):
+            contar(h)
+
+    for s in segmento:
+        for e in expresiones_de(s):
+            contar(e)
+        avanzar(s)
+
+    # 2) Reescribir: la primera aparición de una expresión repetida pasa a un
+    #    temporal declarado justo antes de su sentencia
+    epocas.clear()
+    temporales = {}
+    salida = []
+    linea = [None]
+
+    def reescribir(e):
+        k = clave(e)
+        if e.get('node') in CALCULOS and k is not None:
+            f = firma(e, k)
+            if f in temporales:
+                stats['subexpresiones_reutilizadas'] += 1
+                return variable(temporales[f], e['tipo'])
+            if cuenta.get(f, 0) > 1:
+                inicial = con_hijos(e, [reescribir(h) for h in hijos(e)])
+                nombre = temporales[f] = _temporal('cse')
+                salida.append(declaracion(nombre, inicial, linea[0]))
+                stats['temporales'] += 1
+                return variable(nombre, e['tipo'])
+        return con_hijos(e, [reescribir(h) for h in hijos(e)])
+
+    for s in segmento:
+        linea[0] = s.get('line') if isinstance(s, dict) else None
+        salida.append(mapear_expresiones(s, reescribir))
+        avanzar(s)
+    return salida
+
+
+def pase_almacenes_muertos(programa, prototipos, conservar=()):
+    """
+    Quita declaraciones y asignaciones de variables que nunca se leen
+    (salvo las de 'conservar', que se leen desde fuera del programa).
+    """
+    stats = {'declaraciones_eliminadas': 0, 'asignaciones_eliminadas': 0}
+    leidas = set(conservar)
+    for s in programa:
+        lecturas_sentencia(s, leidas)
+    for proto in prototipos.values():
+        if es_expresion(proto.get('ret')):
+            lecturas(proto['ret'], leidas)
+    # variables que siguen recibiendo valores desde asignaciones que no se pueden quitar
+    retenidas = set()
+    for s in programa:
+        _retenidas(s, retenidas)
+    vivas = leidas | retenidas
+
+    def bloque(sentencias):
+        salida = []
+        for s in sentencias:
+            s = mapear_bloques(s, bloque)
+            kind = s.get('node') if isinstance(s, dict) else None
+            if kind == 'decl':
+                quedan = [(n, init) for n, init in s['decls']
+                          if n in vivas or (init is not None and not es_pura(init))]
+                stats['declaraciones_eliminadas'] += len(s['decls']) - len(quedan)
+                if not quedan:
+                    continue
+                s = dict(s, decls=quedan)
+            elif kind == 'asig' and s['destino'][1] not in vivas and _asignacion_pura(s):
+                stats['asignaciones_eliminadas'] += 1
+                continue
+            salida.append(s)
+        return salida
+
+    return bloque(programa), stats
+
+
+def _asignacion_pura(s):
+    return es_pura(s['expr']) and (s['destino'][0] != 'index' or es_pura(s['destino'][2]))
+
+
+def _retenidas(s, acc):
+    if not isinstance(s, dict):
+        return
+    if s.get('node') == 'asig' and not _asignacion_pura(s):
+        acc.add(s['destino'][1])
+    for e in expresiones_de(s):
+        for h in hijos(e):
+            _destinos(h, acc)
+    for b in bloques_de(s):
+        for t in _lista(s[b]):
+            _retenidas(t, acc)
+
+
+def _destinos(e, acc):
+    # asignaciones anidadas dentro de una expresión: siempre se conservan
+    if e.get('node') == 'asig':
+        acc.add(e['destino'][1])
+    for h in hijos(e):
+        _destinos(h, acc)
+
+#endregion
+
+
+PASES = (
+    ('ramas_constantes', pase_ramas_constantes),
+    ('inlining', pase_inlining),
+    ('invariantes', pase_invariantes),
+    ('cse', pase_cse),
+    ('almacenes_muertos', pase_almacenes_muertos),
+)
+
+
+def optimizar(programa, prototipos=None, pases=PASES):
+    """
+    Aplica los pases al programa (lista de sentencias de ParserClass.parse).
+    Devuelve (programa_optimizado, {nombre_pase: estadísticas}).
+    """
+    prototipos = prototipos or {}
+    estadisticas = {}
+    for nombre, pase in pases:
+        programa, estadisticas[nombre] = pase(programa, prototipos)
+    return programa, estadisticas
+
+
+def globales(programa):
+    """Variables declaradas en el nivel superior del programa, en orden."""
+    return [nombre for s in programa if isinstance(s, dict) and s.get('node') == 'decl'
+            for nombre, _ in s['decls']]
+
+
+def conservando(pases, nombres):
+    """Los mismos pases, pero el de almacenes muertos no quita nada de 'nombres'."""
+    return tuple((nombre, functools.partial(pase, conservar=frozenset(nombres)))
+                 if pase is pase_almacenes_muertos else (nombre, pase)
+                 for nombre, pase in pases)
+
+
+def informe(estadisticas):
+    """Texto con las estadísticas de cada pase, una línea por pase."""
+    lineas = []
+    for nombre, stats in estadisticas.items():
+        detalle = ', '.join(f"{k}={v}" for k, v in stats.items())
+        lineas.append(f"{nombre}: {detalle}")
+    return '\n'.join(lineas)
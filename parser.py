@@ -1,6 +1,58 @@
+import io
+import os
 import ply.yacc as yacc
 from lexer import LexerClass
-from copy import deepcopy
+from copy import copy
+from vectores import crear_valores, cargar
+from tipos import INT, FLOAT, CHAR, BOOL, primitivo, registro, vector, asignable, ensanchable
+from generador_lr import firma
+from nodos import TablaNodos
+from diagnosticos import SINTACTICO, AVISO
+from rangos import en_rango, fuera_de_rango, rango_for
+
+try:
+    import parser_lr
+except ImportError:      # sin driver generado se usa el de PLY
+    parser_lr = None
+from operadores import (TABLA_BINARIA, ERRORES_BINARIOS,
+                        TABLA_UNARIA, ERRORES_UNARIOS, NODO_UNARIO)
+
+
+# Lo que había en una clave que no existía antes de un cambio (diario)
+_AUSENTE = object()
+
+
+class AnalisisDetenido(Exception):
+    """Corta el análisis en modo streaming; args[0] es el nodo que lo provocó."""
+
+
+def _descartar(nodo):
+    pass
+
+
+class _HayDiagnostico(Exception):
+    """La pasada rápida de comprobar() ha encontrado algo que informar."""
+
+
+class _SalidaVigilada(io.TextIOBase):
+    # salida de la pasada rápida: cualquier mensaje (error léxico o
+    # sintáctico) la corta, porque hay que repetirla con posiciones
+    def write(self, texto):
+        raise _HayDiagnostico()
+
+
+_driver_valido = None    # None: sin comprobar; luego True/False para todo el proceso
+
+
+def _driver_generado(lr):
+    """parser_lr si existe y se generó con estas mismas tablas, si no None."""
+    global _driver_valido
+    if parser_lr is None:
+        return None
+    if _driver_valido is None:
+        _driver_valido = parser_lr.FIRMA == firma(lr)
+    return parser_lr if _driver_valido else None
+
 
 class ParserClass:
     tokens = LexerClass.tokens
@@ -26,28 +78,58 @@ class ParserClass:
 
 
 
-    def __init__(self, ruta_archivo):
-        self.lexer = LexerClass().lexerObj
+    def __init__(self, ruta_archivo, debug=True, gramatica=None):
         self.ruta_archivo = ruta_archivo
-        self.parser = yacc.yacc(
-            module      = self,
-            write_tables= False,
-            debug       = True,
-            debugfile   = "parser.out"
-        )
+        if gramatica is None:
+            self.lexer = LexerClass().lexerObj
+            # debug=False no reescribe parser.out (procesos del modo proyecto)
+            self.parser = yacc.yacc(
+                module      = self,
+                write_tables= False,
+                debug       = debug,
+                debugfile   = "parser.out"
+            )
+        else:
+            # sesión de una Gramatica: tablas compartidas, lexer y pilas propios
+            self.lexer = gramatica.lexer.clone()
+            self.parser = gramatica.enlazar(self)
+        self.driver = _driver_generado(self.parser)
         self.entorno = {}            # variables y vectores
         self.tipos_registro = {}     # tipos registro definidos
         self.entorno_stack = []      # pila de entornos para funciones
         self.func_prototypes = {}
+        self.consumidor = None       # callback del modo streaming (None = AST completo)
+        self.parar_en_error = True
+        self.interfaces = {}         # módulo -> interfaz importable (modo proyecto)
+        self.importados = set()      # registros y funciones que vienen de un import
+        self.nodos = TablaNodos()    # expresiones compartidas (hash-consing)
+        self.diario = None           # cambios desde _estado(), para deshacerlos
+        self.admite_carga = True     # False en un preludio: no se guardan datos de 'load'
 
 
     #
     #region 1. PROGRAMA y SENTENCIAS
     #
     def p_programa(self, p):
-        "programa : lista_sentencias"
+        "programa : lista_programa"
         p[0] = p[1]
 
+    def p_lista_programa(self, p):
+        """lista_programa :
+                         | lista_programa sentencia"""
+        # Sin consumidor se construye la lista completa, como en un bloque
+        if self.consumidor is None:
+            self.p_lista_sentencias(p)
+            return
+        # Modo streaming: cada sentencia de primer nivel se entrega y se suelta
+        p[0] = None
+        if len(p) == 1 or p[2] is None:
+            return
+        sent = p[2]
+        self.consumidor(sent)
+        if self.parar_en_error and isinstance(sent, dict) and 'error' in sent:
+            raise AnalisisDetenido(sent)
+
     def p_lista_sentencias(self, p):
         """lista_sentencias :
                         | lista_sentencias sentencia"""
@@ -63,11 +145,11 @@ class ParserClass:
             elif isinstance(sent, dict) and 'error' in sent:
                 p[0] = sent
             else:
-                # 3) Añadimos todo lo que no sea None
+                # 3) Añadimos todo lo que no sea None; la lista se amplía en
+                #    su sitio (prev + [sent] la copiaría en cada sentencia)
                 if sent is not None:
-                    p[0] = prev + [sent]
-                else:
-                    p[0] = prev
+                    prev.append(sent)
+                p[0] = prev
 
 
 
@@ -80,12 +162,18 @@ class ParserClass:
                       | function_decl NEWLINE
                       | if_stmt NEWLINE
                       | while_stmt NEWLINE
+                      | for_stmt NEWLINE
                       | return_stmt NEWLINE
+                      | import_stmt NEWLINE
                       | NEWLINE"""
         # si solo tenemos un NEWLINE, devolvemos un nodo de línea vacía
         if len(p) == 2:
-            # p.lineno(1) es el número de línea del token NEWLINE
-            p[0] = ('blank', p.lineno(1))
+            # en streaming las líneas vacías no generan ningún nodo
+            if self.consumidor is not None:
+                p[0] = None
+            else:
+                # p.lineno(1) es el número de línea del token NEWLINE
+                p[0] = ('blank', p.lineno(1))
         else:
             # para los demás casos devolvemos el AST de la sentencia
             p[0] = p[1]
@@ -97,6 +185,36 @@ class ParserClass:
     #
 
 
+    ## Importación de registros y prototipos de otro módulo
+    def p_import_stmt(self, p):
+        "import_stmt : IMPORT ID"
+        modulo = p[2]
+        interfaz = self.interfaces.get(modulo)
+        if interfaz is None:
+            p[0] = self._error(p, 2, f"Módulo '{modulo}' no encontrado")
+            return
+
+        # Los nombres importados no pueden chocar con definiciones propias
+        for nombre, props in interfaz['registros'].items():
+            if nombre in self.tipos_registro and nombre not in self.importados:
+                p[0] = self._error(p, 2, f"Registro '{nombre}' de '{modulo}' ya definido")
+                return
+            self._anotar(self.tipos_registro, nombre)
+            self._anotar(self.importados, nombre)
+            self.tipos_registro[nombre] = props
+            self.importados.add(nombre)
+        for nombre, proto in interfaz['funciones'].items():
+            if nombre in self.func_prototypes and nombre not in self.importados:
+                p[0] = self._error(p, 2, f"Función '{nombre}' de '{modulo}' ya definida")
+                return
+            self._anotar(self.func_prototypes, nombre)
+            self._anotar(self.importados, nombre)
+            self.func_prototypes[nombre] = dict(proto)
+            self.importados.add(nombre)
+            self.nodos.modificado(('funcion', nombre))
+
+        p[0] = {'node': 'import', 'modulo': modulo, 'line': p.lineno(1)}
+
     ## Declaración de registros
     def p_tipo_registro_decl(self, p):
         "tipo_registro_decl : TYPE ID DPNTO NEWLINE LLE NEWLINE bloque_propiedades LLA"
@@ -104,7 +222,10 @@ class ParserClass:
         nombre = p[2]
         props  = p[7]     
         if nombre in self.tipos_registro:
-            raise SyntaxError(f"Registro '{nombre}' ya definido")
+            # un SyntaxError aquí solo ponía a PLY en recuperación, sin mensaje
+            p[0] = self._error(p, 2, f"Registro '{nombre}' ya definido")
+            return
+        self._anotar(self.tipos_registro, nombre)
         self.tipos_registro[nombre] = props
 
     #para acceder a elemento de un registro
@@ -114,22 +235,21 @@ class ParserClass:
 
         # 1) El identificador debe existir en el entorno
         if nombre not in self.entorno:
-            p[0] = f"Error: Variable '{nombre}' no declarada"
+            p[0] = self._error(p, 1, f"Variable '{nombre}' no declarada")
             return
 
         entry = self.entorno[nombre]
         tipo_var = entry.get('type')
 
         # 2) Debe ser un registro (su tipo debe estar en tipos_registro)
-        if tipo_var not in self.tipos_registro:
-            p[0] = f"Error: '{nombre}' no es un registro"
+        if not tipo_var.es_registro or tipo_var.nombre not in self.tipos_registro:
+            p[0] = self._error(p, 1, f"'{nombre}' no es un registro")
             return
 
         # 3) El campo debe pertenecer a ese registro
-        props = self.tipos_registro[tipo_var]
+        props = self.tipos_registro[tipo_var.nombre]
         if campo not in props:
-            p[0] = (f"Error: Campo '{campo}' no existe en registro "
-                    f"'{tipo_var}'")
+            p[0] = self._error(p, 3, f"Campo '{campo}' no existe en registro '{tipo_var}'")
             return
 
         # 4) Todo OK: devuelvo tipo y valor actual (o None si no inicializado)
@@ -181,10 +301,9 @@ class ParserClass:
         tipo_ast, declaracs = p[1], p[2]
 
         for nombre, init_expr in declaracs:
-            # 1) No repetir nombre
-            if nombre in self.entorno:
-                p[0] = {'error': f"Variable '{nombre}' ya declarada",
-                        'line': p.lineno(2)}
+            # 1) No repetir nombre (un local sí puede ocultar a un parámetro)
+            if nombre in self.entorno and not self.entorno[nombre].get('param'):
+                p[0] = self._error(p, 2, f"Variable '{nombre}' ya declarada")
                 return
 
             # 2) Si hay inicializador, primero propagamos errores de la expresión
@@ -196,46 +315,35 @@ class ParserClass:
 
                 # b) Asegurarnos de que viene con tipo
                 if not isinstance(init_expr, dict) or 'tipo' not in init_expr:
-                    p[0] = {'error': f"Inicializador de '{nombre}' sin tipo válido",
-                            'line': p.lineno(2)}
+                    p[0] = self._error(p, 2, f"Inicializador de '{nombre}' sin tipo válido")
                     return
 
                 init_type = init_expr['tipo']
 
                 # c) Chequeo de que el tipo de init coincide o es compatible
-                implicit = {'float': ['int'], 'int': ['char'], 'char': [], 'bool': []}
-                # — structs deben coincidir exactamente —
-                if isinstance(tipo_ast, str) and tipo_ast not in implicit:
-                    if init_type != tipo_ast:
-                        p[0] = {'error': f"No se puede inicializar {tipo_ast} con {init_type}",
-                                'line': p.lineno(2)}
-                        return
-                else:
-                    # primitivos con conversión implícita
-                    if init_type != tipo_ast:
-                        if tipo_ast in implicit and init_type in implicit[tipo_ast]:
-                            # permitir char→int o int→float
-                            pass
-                        else:
-                            p[0] = {'error': f"No se puede inicializar {tipo_ast} con {init_type}",
-                                    'line': p.lineno(2)}
-                            return
+                #    (structs y vectores por identidad, primitivos ensanchando)
+                if not asignable(tipo_ast, init_type):
+                    p[0] = self._error(p, 2, f"No se puede inicializar {tipo_ast} con {init_type}")
+                    return
 
                 # d) Insertamos la variable inicializada
+                self._anotar(self.entorno, nombre)
                 self.entorno[nombre] = {
                     'type':        tipo_ast,
                     'value':       init_expr.get('valor'),
                     'initialized': True
                 }
+                self.nodos.modificado(nombre)
             else:
                 # 3) Sin inicializador: declaramos sin inicializar
-                if isinstance(tipo_ast, tuple) and tipo_ast[0] == 'vector':
-                    _, base, size = tipo_ast
+                self._anotar(self.entorno, nombre)
+                if tipo_ast.es_vector:
+                    base, size = tipo_ast.base, tipo_ast.size
                     self.entorno[nombre] = {
-                        'type':        'vector',
+                        'type':        tipo_ast,
                         'base':        base,
                         'size':        size,
-                        'values':      [None] * size,
+                        'values':      crear_valores(base.nombre, size),
                         'initialized': False
                     }
                 else:
@@ -244,10 +352,56 @@ class ParserClass:
                         'value':       None,
                         'initialized': False
                     }
+                self.nodos.modificado(nombre)
 
+        p[0] = {'node': 'decl', 'tipo_var': tipo_ast, 'decls': declaracs, 'line': p.lineno(1)}
 
     
 
+    def p_declaracion_carga(self, p):
+        "declaracion_variable : tipo ID LOAD CADENA"
+        tipo_ast, nombre, fichero = p[1], p[2], p[4]
+
+        # 1) Solo vectores, y sin repetir nombre (como en p_declaracion_variable).
+        #    En un preludio no: su instantánea guardaría una copia de los
+        #    datos, que no cambiaría al cambiar el fichero
+        if not self.admite_carga:
+            p[0] = self._error(p, 3, f"'load' no se admite en un preludio ('{nombre}')")
+            return
+        if not tipo_ast.es_vector:
+            p[0] = self._error(p, 3, f"'load' necesita un vector, no {tipo_ast}")
+            return
+        if nombre in self.entorno and not self.entorno[nombre].get('param'):
+            p[0] = self._error(p, 2, f"Variable '{nombre}' ya declarada")
+            return
+
+        # 2) La ruta es relativa al fichero que se analiza
+        ruta = fichero
+        if self.ruta_archivo and not os.path.isabs(ruta):
+            ruta = os.path.join(os.path.dirname(self.ruta_archivo), ruta)
+
+        # 3) Mapeo del fichero: tamaño y tipo se comprueban contra la declaración
+        base, size = tipo_ast.base, tipo_ast.size
+        try:
+            valores = cargar(ruta, base.nombre, size)
+        except (OSError, ValueError) as e:
+            p[0] = self._error(p, 4, f"No se puede cargar '{fichero}' en '{nombre}': {e}")
+            return
+
+        self._anotar(self.entorno, nombre)
+        self.entorno[nombre] = {
+            'type':        tipo_ast,
+            'base':        base,
+            'size':        size,
+            'values':      valores,
+            'initialized': True
+        }
+        self.nodos.modificado(nombre)
+        # el nodo lleva la ruta como está escrita: el código traducido la
+        # resuelve contra el directorio del fuente, no contra el actual
+        p[0] = {'node': 'decl', 'tipo_var': tipo_ast, 'decls': [(nombre, None)],
+                'carga': fichero, 'line': p.lineno(1)}
+
     def p_lista_declaraciones(self, p):
         """lista_declaraciones : lista_identificadores
                                 | lista_identificadores EQ expresion"""
@@ -265,116 +419,121 @@ class ParserClass:
     #region 3. ASIGNACIÓN
     #
 
-    def p_asignacion(self, p):
+    def p_asignacion_indice(self, p):
         """asignacion : ID CE expresion CA EQ expresion
-        | ID CE expresion CA EQ asignacion
-        | ID EQ expresion
-        | ID EQ asignacion
-        | elem_registro EQ expresion
-        | elem_registro EQ asignacion"""
+        | ID CE expresion CA EQ asignacion"""
+        var_name  = p[1]
+        idx_expr  = p[3]
 
-        # — 1) Detectar el caso índice (vector) —
-        if p.slice[2].type == 'CE':
-            # gramática: ID CE expresion CA EQ (expresion|asignacion)
-            var_name  = p[1]
-            idx_expr  = p[3]
-            rhs       = p[6]
-            destino_kind = 'index'
-
-            # a) Verificar existencia y tipo vector
-            if var_name not in self.entorno:
-                p[0] = {'error': f"Variable '{var_name}' no declarada", 'line': p.lineno(1)}
-                return
-            entry = self.entorno[var_name]
-            if entry.get('type') != 'vector':
-                p[0] = {'error': f"'{var_name}' no es un vector", 'line': p.lineno(1)}
-                return
+        # a) Verificar existencia y tipo vector
+        if var_name not in self.entorno:
+            p[0] = self._error(p, 1, f"Variable '{var_name}' no declarada")
+            return
+        entry = self.entorno[var_name]
+        if not entry['type'].es_vector:
+            p[0] = self._error(p, 1, f"'{var_name}' no es un vector")
+            return
 
-            # b) Índice debe ser entero literal dentro de rango
-            if not isinstance(idx_expr, dict) or idx_expr.get('tipo') != 'int':
-                p[0] = {'error': f"Índice de '{var_name}' debe ser entero", 'line': p.lineno(3)}
-                return
-            idx_val = idx_expr['valor']
-            if not isinstance(idx_val, int):
-                p[0] = {'error': f"Índice de '{var_name}' debe ser un entero literal", 'line': p.lineno(3)}
-                return
-            size = entry['size']
-            if idx_val < 0 or idx_val >= size:
-                p[0] = {'error': f"Índice {idx_val} fuera de rango para '{var_name}' (tamaño {size})",
-                        'line': p.lineno(3)}
-                return
+        # b) Índice entero; si se demuestra que cae fuera, error
+        if isinstance(idx_expr, dict) and 'error' in idx_expr:
+            p[0] = idx_expr
+            return
+        if not isinstance(idx_expr, dict) or idx_expr.get('tipo') is not INT:
+            p[0] = self._error(p, 3, f"Índice de '{var_name}' debe ser entero")
+            return
+        size = entry['size']
+        fuera = fuera_de_rango(idx_expr, size)
+        if fuera is not None:
+            p[0] = self._error(p, 3, f"Índice {fuera} fuera de rango para '{var_name}' (tamaño {size})")
+            return
 
-            # c) Tipo destino es la base del vector
-            tipo_dest = entry['base']
+        # c) Tipo destino es la base del vector
+        self._asignar(p, 6, entry, entry['base'], ('index', var_name, idx_expr))
+        # d) Sin comprobación al ejecutar si el análisis de rangos lo demuestra
+        if p[0].get('node') == 'asig':
+            p[0]['sin_comprobacion'] = en_rango(idx_expr, size)
 
+    def p_asignacion(self, p):
+        """asignacion : ID EQ expresion
+        | ID EQ asignacion
+        | elem_registro EQ expresion
+        | elem_registro EQ asignacion"""
+        lhs = p[1]
+        # el acceso a campo ya es un error (variable, registro o campo)
+        if isinstance(lhs, dict) and 'error' in lhs:
+            p[0] = lhs
+            return
+        if isinstance(lhs, tuple) and lhs[0] == 'field':
+            # elem_registro devolvió ('field', var_name, field)
+            destino = lhs
+            var_name = lhs[1]
         else:
-            # — resto de casos: variable simple o campo de registro —
-            lhs = p[1]
-            rhs = p[3]
-            if isinstance(lhs, tuple) and lhs[0] == 'field':
-                # elem_registro devolvió ('field', var_name, field)
-                _, var_name, field = lhs
-                destino_kind = 'field'
-            else:
-                var_name     = lhs
-                field        = None
-                destino_kind = 'var'
+            destino = ('var', lhs)
+            var_name = lhs
 
-            # Verificar existencia de la variable/registro
-            if var_name not in self.entorno:
-                p[0] = {'error': f"Variable '{var_name}' no declarada", 'line': p.lineno(1)}
-                return
-            entry = self.entorno[var_name]
-
-            # Determinar tipo destino según el kind
-            if destino_kind == 'field':
-                # entry['type'] almacena el nombre del struct
-                struct_tipo = entry['type']
-                campos = self.tipos_registro.get(struct_tipo, {})
-                # campo ya validado en p_elem_registro
-                tipo_dest = campos[field]
-            else:
-                tipo_dest = entry['type']
+        # Verificar existencia de la variable/registro
+        if var_name not in self.entorno:
+            p[0] = self._error(p, 1, f"Variable '{var_name}' no declarada")
+            return
+        entry = self.entorno[var_name]
+        # El contador de un for no cambia dentro del bucle (análisis de rangos)
+        if destino[0] == 'var' and entry.get('contador'):
+            p[0] = self._error(p, 1, f"No se puede asignar '{var_name}', variable del bucle 'for'")
+            return
+
+        # Determinar tipo destino según el kind
+        if destino[0] == 'field':
+            # entry['type'] almacena el nombre del struct;
+            # el campo ya se validó en p_elem_registro
+            tipo_dest = self.tipos_registro.get(entry['type'].nombre, {})[destino[2]]
+        else:
+            tipo_dest = entry['type']
+        self._asignar(p, 3, entry, tipo_dest, destino)
 
-        # — 2) Propagar error de RHS si viene así —
+    def _asignar(self, p, n_rhs, entry, tipo_dest, destino):
+        """Parte común de las asignaciones: comprueba el RHS (p[n_rhs]) y asigna."""
+        rhs = p[n_rhs]
+        # — 1) Propagar error de RHS si viene así —
         if isinstance(rhs, dict) and 'error' in rhs:
             p[0] = rhs
             return
         if not isinstance(rhs, dict) or 'tipo' not in rhs:
-            err_line = p.lineno(6) if destino_kind == 'index' else p.lineno(3)
-            p[0] = {'error': "RHS no tiene tipo válido", 'line': err_line}
+            p[0] = self._error(p, n_rhs, "RHS no tiene tipo válido")
             return
         tipo_orig = rhs['tipo']
         valor     = rhs.get('valor', None)
 
-        # — 3) Compatibilidad estricta de tipos —
-        numeric_rank = {'char':1, 'int':2, 'float':3}
-        if tipo_dest in numeric_rank:
-            if tipo_orig not in numeric_rank or numeric_rank[tipo_orig] > numeric_rank[tipo_dest]:
-                p[0] = {'error': f"No se puede asignar {tipo_orig} a {tipo_dest}", 'line': p.lineno(2)}
-                return
-        elif tipo_dest == 'bool':
-            if tipo_orig != 'bool':
-                p[0] = {'error': f"No se puede asignar {tipo_orig} a bool", 'line': p.lineno(2)}
-                return
+        # — 2) Compatibilidad de tipos: ensanchando por rango (char -> float vale) —
+        if not ensanchable(tipo_dest, tipo_orig):
+            p[0] = self._error(p, 2, f"No se puede asignar {tipo_orig} a {tipo_dest}")
+            return
 
-        # — 4) Realizar la asignación —
-        if destino_kind == 'var':
-            entry['value']       = valor
-            entry['initialized'] = True
-        elif destino_kind == 'field':
+        # — 3) Realizar la asignación (anotando lo que se pisa) —
+        kind = destino[0]
+        self._anotar(entry, 'initialized')
+        if kind == 'var':
+            self._anotar(entry, 'value')
+            entry['value'] = valor
+        elif kind == 'field':
             if entry.get('value') is None:
+                self._anotar(entry, 'value')
                 entry['value'] = {}
-            entry['value'][field] = valor
-            entry['initialized']   = True
-        else:  # index
-            entry['values'][idx_val] = valor
-            entry['initialized']     = True
-
-        # — 5) Devolver RHS para permitir encadenar —
-        p[0] = rhs
-
+            self._anotar(entry['value'], destino[2])
+            entry['value'][destino[2]] = valor
+        elif isinstance(destino[2]['valor'], int) and 0 <= destino[2]['valor'] < entry['size']:
+            # index conocido (el valor que lleva el analizador, como con los escalares)
+            self._anotar(entry['values'], destino[2]['valor'])
+            entry['values'][destino[2]['valor']] = valor
+        else:
+            # índice desconocido: cualquier elemento ha podido cambiar
+            self._anotar(entry, 'values')
+            entry['values'] = crear_valores(entry['base'].nombre, entry['size'])
+        entry['initialized'] = True
+        self.nodos.modificado(destino[1])
 
+        # — 4) Nodo de asignación; lleva tipo y valor del RHS para permitir encadenar —
+        p[0] = {'node': 'asig', 'destino': destino, 'expr': rhs,
+                'tipo': tipo_orig, 'valor': valor, 'line': p.lineno(1)}
 
 
     #endregion
@@ -394,121 +553,78 @@ class ParserClass:
                     | expresion MI expresion
                     | expresion mI expresion"""
         izq, der = p[1], p[3]
-        op_type = p.slice[2].type
         # 1) Propagar errores
         for side in (izq, der):
             if isinstance(side, dict) and 'error' in side:
                 p[0] = side
                 return
 
-        # 2) Aritméticas
-        if op_type in ('SUM', 'RES', 'MUL', 'DIV'):
-            if izq['tipo'] not in ('int', 'float') or der['tipo'] not in ('int', 'float'):
-                p[0] = {
-                    'error': f"Operador '{op_type}' requiere operandos numéricos, no {izq['tipo']} y {der['tipo']}",
-                    'line': p.lineno(2)
-                }
-            else:
-                result_type = 'float' if 'float' in (izq['tipo'], der['tipo']) else 'int'
-                p[0] = {'tipo': result_type, 'valor': None}
-            return
-
-        # 3) Lógicos
-        if op_type in ('AND', 'OR'):
-            if izq['tipo'] != 'bool' or der['tipo'] != 'bool':
-                p[0] = {
-                    'error': f"Operador lógico '{op_type}' requiere booleanos, no {izq['tipo']} y {der['tipo']}",
-                    'line': p.lineno(2)
-                }
-            else:
-                p[0] = {'tipo': 'bool', 'valor': None}
+        # 2) La misma operación sobre los mismos nodos ya está comprobada
+        # (el lexer deja en tok.codigo el entero del operador)
+        operador = p.slice[2]
+        op = operador.codigo
+        clave = (op, id(izq), id(der))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
             return
 
-        # 4) Relacionales personalizados
-        if op_type in ('I', 'M', 'm', 'MI', 'mI'):
-            if izq['tipo'] != 'int' or der['tipo'] != 'int':
-                p[0] = {
-                    'error': f"Operador relacional '{op_type}' requiere enteros, no {izq['tipo']} y {der['tipo']}",
-                    'line': p.lineno(2)
-                }
-            else:
-                p[0] = {'tipo': 'bool', 'valor': None}
-            return
-
-        # 5) Desconocido
-        p[0] = {
-            'error': f"Operador desconocido '{op_type}'",
-            'line': p.lineno(2)
-        }
+        # 3) Una consulta a la tabla (op, tipo, tipo) sustituye las cadenas de if
+        op_type = operador.type
+        result_type = TABLA_BINARIA.get((op, izq['tipo'], der['tipo']))
+        if result_type is None:
+            p[0] = self._error(p, 2, ERRORES_BINARIOS[op].format(
+                op=op_type, izq=izq['tipo'], der=der['tipo']))
+        else:
+            p[0] = self.nodos.guardar(clave, {'node': 'bin', 'op': op_type, 'izq': izq, 'der': der,
+                                              'tipo': result_type, 'valor': None})
 
 
     # Unarios
 
-    def p_expresion_uminus(self, p):
-        'expresion : RES expresion %prec UMINUS'
+    def _unaria(self, p):
+        """Operadores prefijos: p[1] es el operador y p[2] el operando."""
         expr = p[2]
         # 1) Propagar error si existe
         if isinstance(expr, dict) and 'error' in expr:
             p[0] = expr
             return
-        # 2) Sólo sobre int o float
-        if expr['tipo'] not in ('int', 'float'):
-            p[0] = {
-                'error': f"Operador unario '{p[1]}' requiere int o float, no {expr['tipo']}",
-                'line': p.lineno(1)
-            }
-        else:
-            p[0] = {'tipo': expr['tipo'], 'valor': None}
+        # 2) Tipo del resultado según la tabla, si no está ya comprobado
+        operador = p.slice[1]
+        op = operador.codigo
+        clave = (op, id(expr))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+            return
+        op_type = operador.type
+        result_type = TABLA_UNARIA.get((op, expr['tipo']))
+        if result_type is None:
+            p[0] = self._error(p, 1, ERRORES_UNARIOS[op].format(
+                op=p[1], nombre=op_type.lower(), tipo=expr['tipo']))
+            return
+        nodo = NODO_UNARIO[op]
+        p[0] = self.nodos.guardar(clave, {'node': nodo, 'op': p[1] if nodo == 'func' else op_type,
+                                          'expr': expr, 'tipo': result_type, 'valor': None})
 
+    def p_expresion_uminus(self, p):
+        'expresion : RES expresion %prec UMINUS'
+        self._unaria(p)
 
     def p_expresion_uplus(self, p):
         'expresion : SUM expresion %prec UPLUS'
-        expr = p[2]
-        if isinstance(expr, dict) and 'error' in expr:
-            p[0] = expr
-            return
-        if expr['tipo'] not in ('int', 'float'):
-            p[0] = {
-                'error': f"Operador unario '{p[1]}' requiere int o float, no {expr['tipo']}",
-                'line': p.lineno(1)
-            }
-        else:
-            p[0] = {'tipo': expr['tipo'], 'valor': None}
-
+        self._unaria(p)
 
     def p_expresion_not(self, p):
         'expresion : NOT expresion'
-        expr = p[2]
-        if isinstance(expr, dict) and 'error' in expr:
-            p[0] = expr
-            return
-        if expr['tipo'] != 'bool':
-            p[0] = {
-                'error': "Operador 'not' requiere expresión booleana",
-                'line': p.lineno(1)
-            }
-        else:
-            p[0] = {'tipo': 'bool', 'valor': None}
-
+        self._unaria(p)
 
     def p_expresion_func(self, p):
         '''expresion : COS expresion
                     | SEN expresion
                     | LOG expresion
                     | EXP expresion'''
-        op_token = p.slice[1].type  # 'COS','SEN','LOG','EXP'
-        expr     = p[2]
-        if isinstance(expr, dict) and 'error' in expr:
-            p[0] = expr
-            return
-        if expr['tipo'] not in ('int', 'float'):
-            p[0] = {
-                'error': f"Función '{op_token.lower()}' requiere int o float, no {expr['tipo']}",
-                'line': p.lineno(1)
-            }
-        else:
-            # trig/log siempre float
-            p[0] = {'tipo': 'float', 'valor': None}
+        self._unaria(p)
 
     def p_expresion_group(self, p):
         "expresion : PE expresion PA"
@@ -522,27 +638,43 @@ class ParserClass:
                     | FALSE"""
         tok_type = p.slice[1].type
         val      = p[1]
+        clave = ('lit', tok_type, val)
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+            return
         if tok_type == 'ENTERO':
-            p[0] = {'tipo': 'int',   'valor': int(val)}
+            nodo = {'node': 'lit', 'tipo': INT,   'valor': int(val)}
         elif tok_type == 'REAL':
-            p[0] = {'tipo': 'float', 'valor': float(val)}
+            nodo = {'node': 'lit', 'tipo': FLOAT, 'valor': float(val)}
         elif tok_type == 'CARACTER':
-            p[0] = {'tipo': 'char',  'valor': val}
+            nodo = {'node': 'lit', 'tipo': CHAR,  'valor': val}
         else:  # TRUE o FALSE
-            p[0] = {'tipo': 'bool',  'valor': (tok_type == 'TRUE')}
+            nodo = {'node': 'lit', 'tipo': BOOL,  'valor': (tok_type == 'TRUE')}
+        p[0] = self.nodos.guardar(clave, nodo)
 
     def p_expresion_id(self, p):
         "expresion : ID"
         nombre = p[1]
-        if nombre not in self.entorno:
-            p[0] = {'error': f"Variable '{nombre}' no declarada", 'line': p.lineno(1)}
+        clave = ('var', self.nodos.clave_nombre(nombre))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+        elif nombre not in self.entorno:
+            p[0] = self._error(p, 1, f"Variable '{nombre}' no declarada")
         elif not self.entorno[nombre].get('initialized', False):
-            p[0] = {'error': f"Variable '{nombre}' no inicializada", 'line': p.lineno(1)}
+            p[0] = self._error(p, 1, f"Variable '{nombre}' no inicializada")
         else:
-            p[0] = {
+            nodo = {
+                'node': 'var',
+                'nombre': nombre,
                 'tipo': self.entorno[nombre]['type'],
                 'valor': self.entorno[nombre].get('value')
             }
+            # contador de un for: intervalo de valores para el análisis de rangos
+            if self.entorno[nombre].get('rango') is not None:
+                nodo['rango'] = self.entorno[nombre]['rango']
+            p[0] = self.nodos.guardar(clave, nodo)
 
 
     def p_expresion_func_call(self, p):
@@ -550,49 +682,47 @@ class ParserClass:
         nombre = p[1]
         args   = p[3]  # lista de dicts {'tipo':…, 'valor':…}
 
+        # 0) Misma función (misma versión del prototipo) con los mismos argumentos
+        clave = ('call', self.nodos.clave_nombre(('funcion', nombre)), tuple(map(id, args)))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+            return
+
         # 1) existe la función?
         if nombre not in self.func_prototypes:
-            p[0] = f"Error: Función '{nombre}' no declarada"
+            p[0] = self._error(p, 1, f"Función '{nombre}' no declarada")
             return
 
         proto = self.func_prototypes[nombre]
-        expected_params = proto['params']   # p. ej. [('int','x'), ('Persona','p')]
-        ret_type       = proto['ret_type']  # p. ej. 'Persona' o 'int'
+        expected_params = proto['params']   # p. ej. [(INT,'x'), (registro('Persona'),'p')]
+        ret_type       = proto['ret_type']  # p. ej. registro('Persona') o INT
 
         # 2) ¿coincide el número de argumentos?
         if len(args) != len(expected_params):
-            p[0] = (f"Error: Llamada a '{nombre}' espera "
-                    f"{len(expected_params)} args, recibidos {len(args)}")
+            p[0] = self._error(p, 1, f"Llamada a '{nombre}' espera "
+                                     f"{len(expected_params)} args, recibidos {len(args)}")
             return
 
         # 3) Chequeo de tipos de cada argumento
-        implicit = {'float': ['int'], 'int': ['char'], 'char': [], 'bool': []}
         for i, (arg, (t_expected, _)) in enumerate(zip(args, expected_params), start=1):
+            if isinstance(arg, dict) and 'error' in arg:
+                p[0] = arg
+                return
             if not isinstance(arg, dict) or 'tipo' not in arg:
-                p[0] = f"Error: Argumento {i} de '{nombre}' sin tipo válido"
+                p[0] = self._error(p, 1, f"Argumento {i} de '{nombre}' sin tipo válido")
                 return
             t_arg = arg['tipo']
 
-            compatible = False
-
-            # 3.a) Si el tipo esperado es un registro (ID en tipos_registro):
-            if t_expected in self.tipos_registro:
-                compatible = (t_arg == t_expected)
-
-            # 3.b) Si es un tipo primitivo, aplico conversión implícita
-            else:
-                if t_arg == t_expected:
-                    compatible = True
-                elif t_expected in implicit and t_arg in implicit[t_expected]:
-                    compatible = True
-
-            if not compatible:
-                p[0] = (f"Error: En llamada a '{nombre}', arg {i} debe ser "
-                        f"{t_expected}, no {t_arg}")
+            # registros por identidad; primitivos con conversión implícita
+            if not asignable(t_expected, t_arg):
+                p[0] = self._error(p, 1, f"En llamada a '{nombre}', arg {i} debe ser "
+                                         f"{t_expected}, no {t_arg}")
                 return
 
         # 4) Todo bien: resultado lleva el tipo de retorno (puede ser struct o primitivo)
-        p[0] = {'tipo': ret_type, 'valor': None}
+        p[0] = self.nodos.guardar(clave, {'node': 'call', 'nombre': nombre, 'args': args,
+                                          'tipo': ret_type, 'valor': None})
 
 
     # lista_expresiones ya no es recursiva ni tiene empty interno
@@ -621,59 +751,70 @@ class ParserClass:
         "expresion : ID CE expresion CA"
         nombre   = p[1]
         idx_expr = p[3]
+        clave = ('index', self.nodos.clave_nombre(nombre), id(idx_expr))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+            return
         # 1) Comprobar que 'nombre' exista y sea un vector
         if nombre not in self.entorno:
-            p[0] = f"Error: Variable '{nombre}' no declarada"
+            p[0] = self._error(p, 1, f"Variable '{nombre}' no declarada")
             return
         entry = self.entorno[nombre]
-        if not isinstance(entry, dict) or entry.get('type') != 'vector':
-            p[0] = f"Error: '{nombre}' no es un vector"
+        if not isinstance(entry, dict) or not entry['type'].es_vector:
+            p[0] = self._error(p, 1, f"'{nombre}' no es un vector")
             return
 
-        # 2) El índice debe ser un entero literal
-        if not isinstance(idx_expr, dict) or idx_expr.get('tipo') != 'int':
-            p[0] = f"Error: Índice de '{nombre}' debe ser entero"
+        # 2) El índice debe ser entero
+        if isinstance(idx_expr, dict) and 'error' in idx_expr:
+            p[0] = idx_expr
             return
-        idx_val = idx_expr.get('valor')
-        if not isinstance(idx_val, int):
-            p[0] = f"Error: Índice de '{nombre}' debe ser un entero literal"
+        if not isinstance(idx_expr, dict) or idx_expr.get('tipo') is not INT:
+            p[0] = self._error(p, 3, f"Índice de '{nombre}' debe ser entero")
             return
+        idx_val = idx_expr.get('valor')
 
-        # 3) Comprobar rango
+        # 3) Error solo si el análisis de rangos demuestra que cae fuera;
+        #    si no, lo comprueba _viper_pos al ejecutar
         size = entry['size']
-        if idx_val < 0 or idx_val >= size:
-            p[0] = f"Error: Índice {idx_val} fuera de rango para vector '{nombre}' (tamaño {size})"
+        fuera = fuera_de_rango(idx_expr, size)
+        if fuera is not None:
+            p[0] = self._error(p, 3, f"Índice {fuera} fuera de rango para vector '{nombre}' (tamaño {size})")
             return
 
-        # 4) Todo OK: devuelvo el elemento
-        elemento = entry['values'][idx_val]
-        # Si es un struct, elemento ya es un dict de campos;
-        # si es primitivo, lo envuelvo con tipo y valor:
-        if isinstance(elemento, dict):
-            p[0] = elemento
-        else:
-            p[0] = {'tipo': entry['base'], 'valor': elemento}
+        # 4) Todo OK: devuelvo el elemento con el tipo base del vector
+        #    (si es un struct, su valor es el dict de campos). Sin
+        #    comprobación al ejecutar si el análisis de rangos lo demuestra
+        elemento = entry['values'][idx_val] if isinstance(idx_val, int) and 0 <= idx_val < size else None
+        p[0] = self.nodos.guardar(clave, {'node': 'index', 'nombre': nombre, 'indice': idx_expr,
+                                          'tipo': entry['base'], 'valor': elemento,
+                                          'sin_comprobacion': en_rango(idx_expr, size)})
 
 
     def p_expresion_len(self, p):
         "expresion : ID PNTO LEN"
         nombre = p[1]
+        clave = ('len', self.nodos.clave_nombre(nombre))
+        nodo = self.nodos.buscar(clave)
+        if nodo is not None:
+            p[0] = nodo
+            return
 
         # 1) Existe en el entorno?
         if nombre not in self.entorno:
-            p[0] = f"Error: Variable '{nombre}' no declarada"
+            p[0] = self._error(p, 1, f"Variable '{nombre}' no declarada")
             return
 
         entry = self.entorno[nombre]
         # 2) Es un vector?
-        if not isinstance(entry, dict) or entry.get('type') != 'vector':
-            p[0] = f"Error: '{nombre}' no es un vector"
+        if not isinstance(entry, dict) or not entry['type'].es_vector:
+            p[0] = self._error(p, 1, f"'{nombre}' no es un vector")
             return
 
         # 3) Devuelvo el tamaño del vector
         size = entry['size']
         # Si lo tratas como expresión entera literal:
-        p[0] = {'tipo': 'int', 'valor': size}
+        p[0] = self.nodos.guardar(clave, {'node': 'len', 'nombre': nombre, 'tipo': INT, 'valor': size})
 
 
     #endregion
@@ -689,17 +830,14 @@ class ParserClass:
             p[0] = cond
             return
         # 2) Verificar que sea bool
-        if cond.get('tipo') != 'bool':
-            p[0] = {
-                'error': f"Condición de 'if' debe ser bool, no {cond.get('tipo')}",
-                'line': p.lineno(1)
-            }
+        if cond.get('tipo') is not BOOL:
+            p[0] = self._error(p, 1, f"Condición de 'if' debe ser bool, no {cond.get('tipo')}")
             return
         # 3) Extraer then-block (siempre en p[7])
         then_block = p[7]
-        # 4) else
+        # 4) else (p[13] es el NEWLINE tras la llave; el bloque es p[14])
         if len(p) > 9:
-            else_block = p[13]
+            else_block = p[14]
         else:
             else_block = []
         # 5) Construir nodo AST
@@ -724,11 +862,8 @@ class ParserClass:
 
         # 2) Verificar que sea bool
         tipo_cond = cond.get('tipo') if isinstance(cond, dict) else None
-        if tipo_cond != 'bool':
-            p[0] = {
-                'error': f"Condición de 'while' debe ser bool, no {tipo_cond}",
-                'line': p.lineno(1)
-            }
+        if tipo_cond is not BOOL:
+            p[0] = self._error(p, 1, f"Condición de 'while' debe ser bool, no {tipo_cond}")
             return
 
         # 3) Extraer el cuerpo del while (siempre en p[7])
@@ -742,6 +877,61 @@ class ParserClass:
             'line': p.lineno(1)
         }
 
+    def p_for_cabecera(self, p):
+        "for_cabecera : ID IN expresion RANGO expresion"
+        nombre, desde, hasta = p[1], p[3], p[5]
+        # 1) Propagar errores de los límites; los dos son int
+        for n, limite in ((3, desde), (5, hasta)):
+            if isinstance(limite, dict) and 'error' in limite:
+                p[0] = limite
+                return
+            tipo = limite.get('tipo') if isinstance(limite, dict) else None
+            if tipo is not INT:
+                p[0] = self._error(p, n, f"Límites de 'for' deben ser int, no {tipo}")
+                return
+        # 2) El contador es nuevo (un parámetro sí se puede ocultar)
+        anterior = self.entorno.get(nombre)
+        if anterior is not None and not anterior.get('param'):
+            p[0] = self._error(p, 1, f"Variable '{nombre}' ya declarada")
+            return
+        # 3) Visible en el cuerpo, que se reduce después, con su intervalo
+        #    de valores [desde, hasta) si se conoce
+        self._anotar(self.entorno, nombre)
+        self.entorno[nombre] = {
+            'type':        INT,
+            'value':       None,
+            'initialized': True,
+            'contador':    True,
+            'rango':       rango_for(desde, hasta),
+        }
+        self.nodos.modificado(nombre)
+        p[0] = {'var': nombre, 'desde': desde, 'hasta': hasta, 'anterior': anterior}
+
+    def p_for_stmt(self, p):
+        "for_stmt : FOR for_cabecera DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA"
+        cabecera = p[2]
+        # 1) Propagar error de la cabecera (el contador no llegó a declararse)
+        if 'error' in cabecera:
+            p[0] = cabecera
+            return
+        # 2) El contador deja de ser visible al salir del bucle
+        nombre = cabecera['var']
+        self._anotar(self.entorno, nombre)
+        if cabecera['anterior'] is None:
+            del self.entorno[nombre]
+        else:
+            self.entorno[nombre] = cabecera['anterior']
+        self.nodos.modificado(nombre)
+        # 3) Nodo AST del for: i toma los valores desde, desde+1, ..., hasta-1
+        p[0] = {
+            'node': 'for',
+            'var': nombre,
+            'desde': cabecera['desde'],
+            'hasta': cabecera['hasta'],
+            'body': p[7],
+            'line': p.lineno(1)
+        }
+
 
     #endregion
     #
@@ -753,22 +943,26 @@ class ParserClass:
         ret_type = p[2]
         name     = p[3]
         params   = p[5]
+        self._anotar(self.func_prototypes, name)
         self.func_prototypes[name] = {
             'params':   params,
             'ret_type': ret_type,
         }
+        self.nodos.modificado(('funcion', name))
 
         # 2) Inicializar parámetros en ámbito local
         for ptype, pname in params:
+            self._anotar(self.entorno, pname)
             self.entorno[pname] = {
                 'type':        ptype,
                 'value':       None,
                 'initialized': True,
             }
+            self.nodos.modificado(pname)
 
-        # 3) Recoger cuerpo y return (pueden ser None)
-        body = p[11]
-        ret  = p[12]
+        # 3) Recoger cuerpo y return (p[11] es el marcador push_scope)
+        body = p[12]
+        ret  = p[13]
 
         # 4) Si body es None, lo convertimos en lista vacía
         if body is None:
@@ -790,8 +984,18 @@ class ParserClass:
             p[0] = ret
             return
 
-        # 8) Todo OK: salimos del ámbito local
-        p[0] = None
+        # 8) Todo OK: el prototipo guarda el cuerpo para poder inlinarlo
+        self.func_prototypes[name]['cuerpo'] = body
+        self.func_prototypes[name]['ret'] = ret
+        p[0] = {
+            'node':     'funcion',
+            'nombre':   name,
+            'params':   params,
+            'ret_type': ret_type,
+            'cuerpo':   body,
+            'ret':      ret,
+            'line':     p.lineno(1)
+        }
 
 
 
@@ -799,8 +1003,8 @@ class ParserClass:
     def p_lista_param(self, p):
         """lista_param :
                     | param_list"""
-        
-        if p[1] is None:
+        # producción vacía: función sin parámetros
+        if len(p) == 1:
             p[0] = []
         else:
             p[0] = p[1]
@@ -834,36 +1038,30 @@ class ParserClass:
         if nombre not in self.tipos_registro:
             # Si no existe como registro, error
             raise SyntaxError(f"Tipo de registro '{nombre}' no definido")
-        p[0] = nombre
+        p[0] = registro(nombre)
 
     def p_tipo(self, p):
         """
         tipo : tipo_base
-            | tipo_base CE ENTERO CA       
-            | registro_tipo               
-            | registro_tipo CE ENTERO CA   
+            | registro_tipo
         """
-        if p.slice[1].type == 'tipo_base':
-            # caso primitivo
-            if len(p) == 2:
-                p[0] = p[1]
-            else:
-                # p[1] es primitivo, p[3] tamaño
-                p[0] = ('vector', p[1], int(p[3]))
-        else:
-            # p[1] vino de registro_tipo, ya validado
-            if len(p) == 2:
-                p[0] = p[1]
-            else:
-                # vector de registro
-                p[0] = ('vector', p[1], int(p[3]))
+        # p[1] es primitivo o vino de registro_tipo, ya validado
+        p[0] = p[1]
+
+    def p_tipo_vector(self, p):
+        """
+        tipo : tipo_base CE ENTERO CA
+            | registro_tipo CE ENTERO CA
+        """
+        # vector de primitivos o de registros; p[3] es el tamaño
+        p[0] = vector(p[1], int(p[3]))
 
     def p_tipo_base(self, p):
         """tipo_base : INT
                      | FLOAT
                      | CHAR
                      | BOOL"""
-        p[0] = p[1].lower()
+        p[0] = primitivo(p[1].lower())
         
     #endregion
     #
@@ -875,23 +1073,255 @@ class ParserClass:
         # guarda el entorno actual y crea uno nuevo
         self.entorno_stack.append(self.entorno)
         self.entorno = {}
+        self.nodos.entrar_ambito()
+        # Pila: DEF tipo ID PE lista_param PA DPNTO NEWLINE LLE NEWLINE . push_scope
+        # Los parámetros (p[-6]) ya son visibles en el cuerpo, y el prototipo
+        # se registra antes del cuerpo para admitir llamadas recursivas
+        ret_type, name, params = p[-9], p[-8], p[-6]
+        self._anotar(self.func_prototypes, name)
+        self.func_prototypes[name] = {'params': params, 'ret_type': ret_type}
+        self.nodos.modificado(('funcion', name))
+        for ptype, pname in params:
+            self.entorno[pname] = {
+                'type':        ptype,
+                'value':       None,
+                'initialized': True,
+                'param':       True,
+            }
+            self.nodos.modificado(pname)
 
     def p_pop_scope(self, p):
         "pop_scope :"
         # restaura el entorno anterior
         self.entorno = self.entorno_stack.pop()
+        self.nodos.salir_ambito()
 
     def p_empty(self, p):
         "empty :"
         p[0] = None
 
+    def _error(self, p, n, mensaje):
+        """Nodo de error semántico situado en el símbolo n de la producción."""
+        return {'error': mensaje, 'line': p.lineno(n), 'pos': p.lexpos(n)}
+
+    def posicion(self, nodo):
+        """(línea, columna) de un nodo de error, resuelta con el mapa de fuente."""
+        if nodo.get('pos') is None:
+            return nodo.get('line'), None
+        return LexerClass.mapa(self.lexer).posicion(nodo['pos'])
+
     def p_error(self, p):
         # Si p es None significa fin de archivo, lo ignoramos
         if p is None:
             return
         # En cualquier otro caso, lo reportamos
-        print(f"Error sintáctico en token '{p.value}' (línea {p.lineno})")
+        # un NEWLINE lleva el texto de todas las líneas vacías que junta
+        valor = '\n' if p.type == 'NEWLINE' else p.value
+        LexerClass.informar(p.lexer, SINTACTICO, p.lexpos,
+                            "Error sintáctico en token '{0}' (línea {linea}, columna {columna})",
+                            valor)
+
+    def interfaz(self):
+        """
+        Lo que otro módulo ve al importar este: sus registros y los
+        prototipos (sin cuerpo) de sus funciones, sin lo que él importó.
+        """
+        return {
+            'registros': {n: props for n, props in self.tipos_registro.items()
+                          if n not in self.importados},
+            'funciones': {n: {'params': proto['params'], 'ret_type': proto['ret_type']}
+                          for n, proto in self.func_prototypes.items()
+                          if n not in self.importados},
+        }
 
-    def parse(self, texto):
-        # Activamos el tracking aquí para que p.lineno() funcione
-        return self.parser.parse(texto, lexer=self.lexer, tracking=True)
+    def escribir_tablas(self, archivo):
+        """Escribe el .symbol y el .record de 'archivo' tras un análisis sin errores."""
+        base = os.path.splitext(archivo)[0]
+        simbolos, registros = self.tablas()
+        with open(base + '.symbol', 'w') as f_sym:
+            f_sym.write(simbolos)
+        with open(base + '.record', 'w') as f_rec:
+            f_rec.write(registros)
+
+    def tablas(self):
+        """(texto del .symbol, texto del .record) tras un análisis sin errores."""
+        simbolos = []
+        for nombre, info in self.entorno.items():
+            if isinstance(info, dict):
+                # str(Tipo): 'int', nombre del registro o 'vector'
+                tipo = info['type']
+            else:
+                tipo = type(info).__name__
+            simbolos.append(f"{nombre} : {tipo}\n")
+
+        registros = []
+        for nombre, props in self.tipos_registro.items():
+            if nombre in self.importados:
+                continue
+            if isinstance(props, dict):
+                # Construimos "campo:tipo" para cada par
+                campos = ','.join(f"{campo}:{tipo}" for campo, tipo in props.items())
+                registros.append(f"{nombre} : {campos}\n")
+            else:
+                LexerClass.informar(self.lexer, AVISO, None,
+                                    "Registro '{0}' ignorado: esperaba dict, obtuvo {1}",
+                                    nombre, type(props).__name__)
+        return ''.join(simbolos), ''.join(registros)
+
+    def reiniciar(self):
+        """Deja el analizador listo para otro fichero sin reconstruir las tablas."""
+        self.entorno = {}
+        self.tipos_registro = {}
+        self.entorno_stack = []
+        self.func_prototypes = {}
+        self.interfaces = {}
+        self.importados = set()
+        self.nodos = TablaNodos()
+        self.diario = None
+        self.lexer.lineno = 1
+        self.lexer.begin('INITIAL')
+
+    def parse(self, texto, posiciones=True):
+        # Activamos el tracking aquí para que p.lineno() funcione en los
+        # no terminales; sin él, solo los tokens llevan línea y posición
+        if self.driver is not None:
+            if posiciones:
+                return self.driver.analizar_con_posiciones(self.parser, self.lexer, texto)
+            return self.driver.analizar_sin_posiciones(self.parser, self.lexer, texto)
+        return self.parser.parse(texto, lexer=self.lexer, tracking=posiciones)
+
+    def comprobar(self, texto):
+        """
+        Comprobación completa de 'texto' sin construir el AST: devuelve el
+        nodo del primer error semántico, o None.
+        Primero se analiza sin posiciones y sin dejar salir ningún
+        mensaje; solo si aparece un diagnóstico (error semántico, léxico o
+        sintáctico) se vuelve al estado inicial y se repite con
+        posiciones, así mensajes y líneas son los mismos que con parse().
+        La salida se vigila en el propio lexer y no en sys.stdout, que
+        comparten todos los hilos; el colector de diagnósticos del lexer,
+        si lo tiene, se aparta en la pasada rápida y solo recibe los de
+        la segunda.
+        """
+        inicial = self._estado()
+        anterior = getattr(self.lexer, 'salida', None)
+        colector = getattr(self.lexer, 'diagnosticos', None)
+        self.lexer.salida = _SalidaVigilada()
+        self.lexer.diagnosticos = None
+        try:
+            error = self.parse_stream(texto, _descartar, posiciones=False)
+        except _HayDiagnostico:
+            error = True
+        finally:
+            self.lexer.salida = anterior
+            self.lexer.diagnosticos = colector
+        if error is None:
+            self._confirmar()
+            return None
+        # diagnóstico: se repite con posiciones desde el estado inicial
+        self._restaurar(inicial)
+        return self.parse_stream(texto, _descartar)
+
+    def _estado(self):
+        """
+        Punto al que _restaurar() puede volver. No copia nada: abre un
+        diario donde cada cambio (_anotar) guarda lo que pisa, así que
+        volver cuesta lo que se ha cambiado y no lo que hay definido (un
+        vector de millones de elementos no se copia en cada entrada del REPL).
+        """
+        self.diario = []
+        return (self.diario, self.entorno, self.tipos_registro, list(self.entorno_stack),
+                self.func_prototypes, self.importados, self.lexer.lineno)
+
+    def _anotar(self, contenedor, clave):
+        """Con un diario abierto, guarda contenedor[clave] antes de cambiarlo."""
+        if self.diario is None:
+            return
+        if isinstance(contenedor, set):
+            antes = clave if clave in contenedor else _AUSENTE
+        elif isinstance(contenedor, dict):
+            antes = contenedor.get(clave, _AUSENTE)
+        else:
+            antes = contenedor[clave]       # elemento de un vector
+        self.diario.append((contenedor, clave, antes))
+
+    def _confirmar(self):
+        """Da por buenos los cambios desde _estado() y deja de anotarlos."""
+        self.diario = None
+
+    def _restaurar(self, estado):
+        """Deshace, del último al primero, los cambios anotados desde _estado()."""
+        (diario, self.entorno, self.tipos_registro, self.entorno_stack,
+         self.func_prototypes, self.importados, self.lexer.lineno) = estado
+        for contenedor, clave, antes in reversed(diario):
+            if isinstance(contenedor, set):
+                if antes is _AUSENTE:
+                    contenedor.discard(clave)
+                else:
+                    contenedor.add(clave)
+            elif antes is _AUSENTE:
+                del contenedor[clave]
+            else:
+                contenedor[clave] = antes
+        self.diario = None
+        self.nodos.vaciar()
+
+    def parse_stream(self, texto, consumidor, parar_en_error=True, posiciones=True):
+        """
+        Analiza 'texto' entregando cada sentencia de primer nivel a 'consumidor'
+        en cuanto se reduce, sin acumular el programa en memoria.
+        'consumidor' puede ser una función o un generador (se le hace send()).
+        Devuelve el nodo de error que detuvo el análisis, o None.
+        """
+        if hasattr(consumidor, 'send'):
+            generador = consumidor
+            next(generador)
+            consumidor = generador.send
+        self.consumidor = consumidor
+        self.parar_en_error = parar_en_error
+        try:
+            self.parse(texto, posiciones)
+        except AnalisisDetenido as e:
+            return e.args[0]
+        except StopIteration:
+            # el generador consumidor terminó: paramos sin error
+            pass
+        finally:
+            self.consumidor = None
+        return None
+
+
+class Gramatica:
+    """
+    Gramática construida una sola vez para analizar desde varios hilos.
+
+    Las tablas LALR, las producciones y las expresiones regulares del
+    lexer se comparten y nadie las modifica; cada sesion() es un
+    ParserClass con su propio estado semántico, su lexer (clonado) y su
+    LRParser (pilas, acciones enlazadas a la sesión y p_error).
+    Una sesión no debe usarse desde dos hilos a la vez.
+    """
+
+    def __init__(self, debug=False):
+        base = ParserClass(None, debug=debug)
+        self.lexer = base.lexer
+        self.parser = base.parser
+
+    def enlazar(self, sesion):
+        """LRParser nuevo sobre las tablas compartidas, con las acciones de 'sesion'."""
+        base = self.parser
+        lr = yacc.LRParser.__new__(yacc.LRParser)
+        lr.productions = []
+        for prod in base.productions:
+            prod = copy(prod)
+            prod.callable = getattr(sesion, prod.func) if prod.func else None
+            lr.productions.append(prod)
+        lr.action = base.action
+        lr.goto = base.goto
+        lr.defaulted_states = base.defaulted_states
+        lr.errorfunc = sesion.p_error
+        lr.errorok = True
+        return lr
+
+    def sesion(self, ruta_archivo=None):
+        return ParserClass(ruta_archivo, gramatica=self)
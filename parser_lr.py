@@ -0,0 +1,772 @@
+"""
+Driver LR especializado para la gramática de ParserClass.
+Generado por generador_lr.py a partir de las tablas de PLY: no editar.
+"""
+import sys
+import threading
+
+from ply.yacc import YaccProduction, call_errorfunc, error_count
+
+FIRMA = 'feec52617f5ac895adaff525cc7f11d95ffd8b8b74cfaa295bd8fc081faf19ec'
+
+_CERROJO_ERRORES = threading.Lock()
+
+
+class Simbolo:
+    """Símbolo de la pila (el YaccSymbol de PLY, con __slots__)."""
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'endlineno', 'endlexpos', 'lexer')
+
+    def __str__(self):
+        return self.type
+
+    def __repr__(self):
+        return str(self)
+
+
+class Produccion(YaccProduction):
+    """
+    El 'p' de las acciones: misma interfaz que YaccProduction, con el
+    acceso p[n] por índice entero (el caso normal) resuelto primero.
+    """
+    __slots__ = ('slice', 'stack', 'lexer', 'parser')
+
+    def __init__(self):
+        self.slice = self.stack = self.lexer = self.parser = None
+
+    def __getitem__(self, n):
+        if n.__class__ is int:
+            if n >= 0:
+                return self.slice[n].value
+            return self.stack[n].value
+        return [s.value for s in self.slice[n]]
+
+
+def _acciones(lr):
+    # métodos p_* ya enlazados a la instancia dueña de 'lr', por producción
+    acciones = getattr(lr, 'acciones_lr', None)
+    if acciones is None:
+        acciones = lr.acciones_lr = tuple(p.callable for p in lr.productions)
+    return acciones
+
+ACCION = (
+    {'NEWLINE': -2, 'ID': -2, 'RES': -2, 'SUM': -2, 'NOT': -2, 'COS': -2, 'SEN': -2, 'LOG': -2, 'EXP': -2, 'PE': -2, 'ENTERO': -2, 'REAL': -2, 'CARACTER': -2, 'TRUE': -2, 'FALSE': -2, 'TYPE': -2, 'DEF': -2, 'IF': -2, 'WHILE': -2, 'FOR': -2, 'RETURN': -2, 'IMPORT': -2, 'INT': -2, 'FLOAT': -2, 'CHAR': -2, 'BOOL': -2, '$end': -2},  # estado 0
+    {'$end': 0},  # estado 1
+    {'$end': -1, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'RETURN': 36, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 2
+    {'NEWLINE': -3, 'ID': -3, 'RES': -3, 'SUM': -3, 'NOT': -3, 'COS': -3, 'SEN': -3, 'LOG': -3, 'EXP': -3, 'PE': -3, 'ENTERO': -3, 'REAL': -3, 'CARACTER': -3, 'TRUE': -3, 'FALSE': -3, 'TYPE': -3, 'DEF': -3, 'IF': -3, 'WHILE': -3, 'FOR': -3, 'RETURN': -3, 'IMPORT': -3, 'INT': -3, 'FLOAT': -3, 'CHAR': -3, 'BOOL': -3, '$end': -3},  # estado 3
+    {'NEWLINE': 44},  # estado 4
+    {'NEWLINE': -16, 'ID': -16, 'RES': -16, 'SUM': -16, 'NOT': -16, 'COS': -16, 'SEN': -16, 'LOG': -16, 'EXP': -16, 'PE': -16, 'ENTERO': -16, 'REAL': -16, 'CARACTER': -16, 'TRUE': -16, 'FALSE': -16, 'TYPE': -16, 'DEF': -16, 'IF': -16, 'WHILE': -16, 'FOR': -16, 'RETURN': -16, 'IMPORT': -16, 'INT': -16, 'FLOAT': -16, 'CHAR': -16, 'BOOL': -16, '$end': -16, 'LLA': -16},  # estado 5
+    {'NEWLINE': 45},  # estado 6
+    {'NEWLINE': 46, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 7
+    {'NEWLINE': 58},  # estado 8
+    {'NEWLINE': 59},  # estado 9
+    {'NEWLINE': 60},  # estado 10
+    {'NEWLINE': 61},  # estado 11
+    {'NEWLINE': 62},  # estado 12
+    {'NEWLINE': 63},  # estado 13
+    {'NEWLINE': 64},  # estado 14
+    {'ID': 66},  # estado 15
+    {'CE': 68, 'EQ': 69, 'NEWLINE': -59, 'SUM': -59, 'RES': -59, 'MUL': -59, 'DIV': -59, 'AND': -59, 'OR': -59, 'I': -59, 'M': -59, 'm': -59, 'MI': -59, 'mI': -59, 'PE': 70, 'PNTO': 71, 'ID': -79},  # estado 16
+    {'EQ': 72},  # estado 17
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 18
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 19
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 20
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 21
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 22
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 23
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 24
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 25
+    {'NEWLINE': -54, 'SUM': -54, 'RES': -54, 'MUL': -54, 'DIV': -54, 'AND': -54, 'OR': -54, 'I': -54, 'M': -54, 'm': -54, 'MI': -54, 'mI': -54, 'PA': -54, 'DPNTO': -54, 'CA': -54, 'RANGO': -54},  # estado 26
+    {'NEWLINE': -55, 'SUM': -55, 'RES': -55, 'MUL': -55, 'DIV': -55, 'AND': -55, 'OR': -55, 'I': -55, 'M': -55, 'm': -55, 'MI': -55, 'mI': -55, 'PA': -55, 'DPNTO': -55, 'CA': -55, 'RANGO': -55},  # estado 27
+    {'NEWLINE': -56, 'SUM': -56, 'RES': -56, 'MUL': -56, 'DIV': -56, 'AND': -56, 'OR': -56, 'I': -56, 'M': -56, 'm': -56, 'MI': -56, 'mI': -56, 'PA': -56, 'DPNTO': -56, 'CA': -56, 'RANGO': -56},  # estado 28
+    {'NEWLINE': -57, 'SUM': -57, 'RES': -57, 'MUL': -57, 'DIV': -57, 'AND': -57, 'OR': -57, 'I': -57, 'M': -57, 'm': -57, 'MI': -57, 'mI': -57, 'PA': -57, 'DPNTO': -57, 'CA': -57, 'RANGO': -57},  # estado 29
+    {'NEWLINE': -58, 'SUM': -58, 'RES': -58, 'MUL': -58, 'DIV': -58, 'AND': -58, 'OR': -58, 'I': -58, 'M': -58, 'm': -58, 'MI': -58, 'mI': -58, 'PA': -58, 'DPNTO': -58, 'CA': -58, 'RANGO': -58},  # estado 30
+    {'ID': 82},  # estado 31
+    {'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43, 'ID': 84},  # estado 32
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 33
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 34
+    {'ID': 88},  # estado 35
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 36
+    {'ID': 90},  # estado 37
+    {'ID': -80, 'CE': 91},  # estado 38
+    {'ID': -81, 'CE': 92},  # estado 39
+    {'CE': -84, 'ID': -84},  # estado 40
+    {'CE': -85, 'ID': -85},  # estado 41
+    {'CE': -86, 'ID': -86},  # estado 42
+    {'CE': -87, 'ID': -87},  # estado 43
+    {'NEWLINE': -6, 'ID': -6, 'RES': -6, 'SUM': -6, 'NOT': -6, 'COS': -6, 'SEN': -6, 'LOG': -6, 'EXP': -6, 'PE': -6, 'ENTERO': -6, 'REAL': -6, 'CARACTER': -6, 'TRUE': -6, 'FALSE': -6, 'TYPE': -6, 'DEF': -6, 'IF': -6, 'WHILE': -6, 'FOR': -6, 'RETURN': -6, 'IMPORT': -6, 'INT': -6, 'FLOAT': -6, 'CHAR': -6, 'BOOL': -6, '$end': -6, 'LLA': -6},  # estado 44
+    {'NEWLINE': -7, 'ID': -7, 'RES': -7, 'SUM': -7, 'NOT': -7, 'COS': -7, 'SEN': -7, 'LOG': -7, 'EXP': -7, 'PE': -7, 'ENTERO': -7, 'REAL': -7, 'CARACTER': -7, 'TRUE': -7, 'FALSE': -7, 'TYPE': -7, 'DEF': -7, 'IF': -7, 'WHILE': -7, 'FOR': -7, 'RETURN': -7, 'IMPORT': -7, 'INT': -7, 'FLOAT': -7, 'CHAR': -7, 'BOOL': -7, '$end': -7, 'LLA': -7},  # estado 45
+    {'NEWLINE': -8, 'ID': -8, 'RES': -8, 'SUM': -8, 'NOT': -8, 'COS': -8, 'SEN': -8, 'LOG': -8, 'EXP': -8, 'PE': -8, 'ENTERO': -8, 'REAL': -8, 'CARACTER': -8, 'TRUE': -8, 'FALSE': -8, 'TYPE': -8, 'DEF': -8, 'IF': -8, 'WHILE': -8, 'FOR': -8, 'RETURN': -8, 'IMPORT': -8, 'INT': -8, 'FLOAT': -8, 'CHAR': -8, 'BOOL': -8, '$end': -8, 'LLA': -8},  # estado 46
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 47
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 48
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 49
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 50
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 51
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 52
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 53
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 54
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 55
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 56
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 57
+    {'NEWLINE': -9, 'ID': -9, 'RES': -9, 'SUM': -9, 'NOT': -9, 'COS': -9, 'SEN': -9, 'LOG': -9, 'EXP': -9, 'PE': -9, 'ENTERO': -9, 'REAL': -9, 'CARACTER': -9, 'TRUE': -9, 'FALSE': -9, 'TYPE': -9, 'DEF': -9, 'IF': -9, 'WHILE': -9, 'FOR': -9, 'RETURN': -9, 'IMPORT': -9, 'INT': -9, 'FLOAT': -9, 'CHAR': -9, 'BOOL': -9, '$end': -9, 'LLA': -9},  # estado 58
+    {'NEWLINE': -10, 'ID': -10, 'RES': -10, 'SUM': -10, 'NOT': -10, 'COS': -10, 'SEN': -10, 'LOG': -10, 'EXP': -10, 'PE': -10, 'ENTERO': -10, 'REAL': -10, 'CARACTER': -10, 'TRUE': -10, 'FALSE': -10, 'TYPE': -10, 'DEF': -10, 'IF': -10, 'WHILE': -10, 'FOR': -10, 'RETURN': -10, 'IMPORT': -10, 'INT': -10, 'FLOAT': -10, 'CHAR': -10, 'BOOL': -10, '$end': -10, 'LLA': -10},  # estado 59
+    {'NEWLINE': -11, 'ID': -11, 'RES': -11, 'SUM': -11, 'NOT': -11, 'COS': -11, 'SEN': -11, 'LOG': -11, 'EXP': -11, 'PE': -11, 'ENTERO': -11, 'REAL': -11, 'CARACTER': -11, 'TRUE': -11, 'FALSE': -11, 'TYPE': -11, 'DEF': -11, 'IF': -11, 'WHILE': -11, 'FOR': -11, 'RETURN': -11, 'IMPORT': -11, 'INT': -11, 'FLOAT': -11, 'CHAR': -11, 'BOOL': -11, '$end': -11, 'LLA': -11},  # estado 60
+    {'NEWLINE': -12, 'ID': -12, 'RES': -12, 'SUM': -12, 'NOT': -12, 'COS': -12, 'SEN': -12, 'LOG': -12, 'EXP': -12, 'PE': -12, 'ENTERO': -12, 'REAL': -12, 'CARACTER': -12, 'TRUE': -12, 'FALSE': -12, 'TYPE': -12, 'DEF': -12, 'IF': -12, 'WHILE': -12, 'FOR': -12, 'RETURN': -12, 'IMPORT': -12, 'INT': -12, 'FLOAT': -12, 'CHAR': -12, 'BOOL': -12, '$end': -12, 'LLA': -12},  # estado 61
+    {'NEWLINE': -13, 'ID': -13, 'RES': -13, 'SUM': -13, 'NOT': -13, 'COS': -13, 'SEN': -13, 'LOG': -13, 'EXP': -13, 'PE': -13, 'ENTERO': -13, 'REAL': -13, 'CARACTER': -13, 'TRUE': -13, 'FALSE': -13, 'TYPE': -13, 'DEF': -13, 'IF': -13, 'WHILE': -13, 'FOR': -13, 'RETURN': -13, 'IMPORT': -13, 'INT': -13, 'FLOAT': -13, 'CHAR': -13, 'BOOL': -13, '$end': -13, 'LLA': -13},  # estado 62
+    {'NEWLINE': -14, 'ID': -14, 'RES': -14, 'SUM': -14, 'NOT': -14, 'COS': -14, 'SEN': -14, 'LOG': -14, 'EXP': -14, 'PE': -14, 'ENTERO': -14, 'REAL': -14, 'CARACTER': -14, 'TRUE': -14, 'FALSE': -14, 'TYPE': -14, 'DEF': -14, 'IF': -14, 'WHILE': -14, 'FOR': -14, 'RETURN': -14, 'IMPORT': -14, 'INT': -14, 'FLOAT': -14, 'CHAR': -14, 'BOOL': -14, '$end': -14, 'LLA': -14},  # estado 63
+    {'NEWLINE': -15, 'ID': -15, 'RES': -15, 'SUM': -15, 'NOT': -15, 'COS': -15, 'SEN': -15, 'LOG': -15, 'EXP': -15, 'PE': -15, 'ENTERO': -15, 'REAL': -15, 'CARACTER': -15, 'TRUE': -15, 'FALSE': -15, 'TYPE': -15, 'DEF': -15, 'IF': -15, 'WHILE': -15, 'FOR': -15, 'RETURN': -15, 'IMPORT': -15, 'INT': -15, 'FLOAT': -15, 'CHAR': -15, 'BOOL': -15, '$end': -15, 'LLA': -15},  # estado 64
+    {'NEWLINE': -25},  # estado 65
+    {'LOAD': 104, 'EQ': -23, 'NEWLINE': -23, 'COMA': 105},  # estado 66
+    {'NEWLINE': -27, 'EQ': 106},  # estado 67
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 68
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 108},  # estado 69
+    {'PA': -90, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 70
+    {'LEN': 116, 'ID': 115},  # estado 71
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 108},  # estado 72
+    {'NEWLINE': -47, 'SUM': -47, 'RES': -47, 'MUL': -47, 'DIV': -47, 'AND': -47, 'OR': -47, 'I': -47, 'M': -47, 'm': -47, 'MI': -47, 'mI': -47, 'PA': -47, 'DPNTO': -47, 'CA': -47, 'RANGO': -47},  # estado 73
+    {'SUM': -59, 'RES': -59, 'MUL': -59, 'DIV': -59, 'AND': -59, 'OR': -59, 'I': -59, 'M': -59, 'm': -59, 'MI': -59, 'mI': -59, 'NEWLINE': -59, 'PA': -59, 'DPNTO': -59, 'CA': -59, 'RANGO': -59, 'PE': 70, 'CE': 119, 'PNTO': 120},  # estado 74
+    {'NEWLINE': -46, 'SUM': -46, 'RES': -46, 'MUL': -46, 'DIV': -46, 'AND': -46, 'OR': -46, 'I': -46, 'M': -46, 'm': -46, 'MI': -46, 'mI': -46, 'PA': -46, 'DPNTO': -46, 'CA': -46, 'RANGO': -46},  # estado 75
+    {'NEWLINE': -48, 'SUM': -48, 'RES': -48, 'MUL': -48, 'DIV': -48, 'AND': -48, 'OR': -48, 'I': -48, 'M': -48, 'm': -48, 'MI': -48, 'mI': -48, 'PA': -48, 'DPNTO': -48, 'CA': -48, 'RANGO': -48},  # estado 76
+    {'NEWLINE': -49, 'SUM': -49, 'RES': -49, 'MUL': -49, 'DIV': -49, 'AND': -49, 'OR': -49, 'I': -49, 'M': -49, 'm': -49, 'MI': -49, 'mI': -49, 'PA': -49, 'DPNTO': -49, 'CA': -49, 'RANGO': -49},  # estado 77
+    {'NEWLINE': -50, 'SUM': -50, 'RES': -50, 'MUL': -50, 'DIV': -50, 'AND': -50, 'OR': -50, 'I': -50, 'M': -50, 'm': -50, 'MI': -50, 'mI': -50, 'PA': -50, 'DPNTO': -50, 'CA': -50, 'RANGO': -50},  # estado 78
+    {'NEWLINE': -51, 'SUM': -51, 'RES': -51, 'MUL': -51, 'DIV': -51, 'AND': -51, 'OR': -51, 'I': -51, 'M': -51, 'm': -51, 'MI': -51, 'mI': -51, 'PA': -51, 'DPNTO': -51, 'CA': -51, 'RANGO': -51},  # estado 79
+    {'NEWLINE': -52, 'SUM': -52, 'RES': -52, 'MUL': -52, 'DIV': -52, 'AND': -52, 'OR': -52, 'I': -52, 'M': -52, 'm': -52, 'MI': -52, 'mI': -52, 'PA': -52, 'DPNTO': -52, 'CA': -52, 'RANGO': -52},  # estado 80
+    {'PA': 121, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 81
+    {'DPNTO': 122},  # estado 82
+    {'ID': 123},  # estado 83
+    {'CE': -79, 'ID': -79},  # estado 84
+    {'DPNTO': 124, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 85
+    {'DPNTO': 125, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 86
+    {'DPNTO': 126},  # estado 87
+    {'IN': 127},  # estado 88
+    {'NEWLINE': 128, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 89
+    {'NEWLINE': -17},  # estado 90
+    {'ENTERO': 129},  # estado 91
+    {'ENTERO': 130},  # estado 92
+    {'NEWLINE': -35, 'SUM': -35, 'RES': -35, 'MUL': 49, 'DIV': 50, 'AND': -35, 'OR': -35, 'I': -35, 'M': -35, 'm': -35, 'MI': -35, 'mI': -35, 'PA': -35, 'DPNTO': -35, 'CA': -35, 'RANGO': -35},  # estado 93
+    {'NEWLINE': -36, 'SUM': -36, 'RES': -36, 'MUL': 49, 'DIV': 50, 'AND': -36, 'OR': -36, 'I': -36, 'M': -36, 'm': -36, 'MI': -36, 'mI': -36, 'PA': -36, 'DPNTO': -36, 'CA': -36, 'RANGO': -36},  # estado 94
+    {'NEWLINE': -37, 'SUM': -37, 'RES': -37, 'MUL': -37, 'DIV': -37, 'AND': -37, 'OR': -37, 'I': -37, 'M': -37, 'm': -37, 'MI': -37, 'mI': -37, 'PA': -37, 'DPNTO': -37, 'CA': -37, 'RANGO': -37},  # estado 95
+    {'NEWLINE': -38, 'SUM': -38, 'RES': -38, 'MUL': -38, 'DIV': -38, 'AND': -38, 'OR': -38, 'I': -38, 'M': -38, 'm': -38, 'MI': -38, 'mI': -38, 'PA': -38, 'DPNTO': -38, 'CA': -38, 'RANGO': -38},  # estado 96
+    {'NEWLINE': -39, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -39, 'OR': -39, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57, 'PA': -39, 'DPNTO': -39, 'CA': -39, 'RANGO': -39},  # estado 97
+    {'NEWLINE': -40, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': -40, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57, 'PA': -40, 'DPNTO': -40, 'CA': -40, 'RANGO': -40},  # estado 98
+    {'NEWLINE': -41, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -41, 'OR': -41, 'I': -41, 'M': -41, 'm': -41, 'MI': -41, 'mI': -41, 'PA': -41, 'DPNTO': -41, 'CA': -41, 'RANGO': -41},  # estado 99
+    {'NEWLINE': -42, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -42, 'OR': -42, 'I': -42, 'M': -42, 'm': -42, 'MI': -42, 'mI': -42, 'PA': -42, 'DPNTO': -42, 'CA': -42, 'RANGO': -42},  # estado 100
+    {'NEWLINE': -43, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -43, 'OR': -43, 'I': -43, 'M': -43, 'm': -43, 'MI': -43, 'mI': -43, 'PA': -43, 'DPNTO': -43, 'CA': -43, 'RANGO': -43},  # estado 101
+    {'NEWLINE': -44, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -44, 'OR': -44, 'I': -44, 'M': -44, 'm': -44, 'MI': -44, 'mI': -44, 'PA': -44, 'DPNTO': -44, 'CA': -44, 'RANGO': -44},  # estado 102
+    {'NEWLINE': -45, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': -45, 'OR': -45, 'I': -45, 'M': -45, 'm': -45, 'MI': -45, 'mI': -45, 'PA': -45, 'DPNTO': -45, 'CA': -45, 'RANGO': -45},  # estado 103
+    {'CADENA': 131},  # estado 104
+    {'ID': 132},  # estado 105
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 106
+    {'CA': 135, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 107
+    {'SUM': -59, 'RES': -59, 'MUL': -59, 'DIV': -59, 'AND': -59, 'OR': -59, 'I': -59, 'M': -59, 'm': -59, 'MI': -59, 'mI': -59, 'NEWLINE': -59, 'PE': 70, 'CE': 136, 'PNTO': 71, 'EQ': 69},  # estado 108
+    {'NEWLINE': -31, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 109
+    {'NEWLINE': -32},  # estado 110
+    {'PA': 137},  # estado 111
+    {'PA': -61},  # estado 112
+    {'PA': -62, 'NEWLINE': 138},  # estado 113
+    {'NEWLINE': -63, 'PA': -63, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 114
+    {'EQ': -19},  # estado 115
+    {'NEWLINE': -66, 'SUM': -66, 'RES': -66, 'MUL': -66, 'DIV': -66, 'AND': -66, 'OR': -66, 'I': -66, 'M': -66, 'm': -66, 'MI': -66, 'mI': -66, 'PA': -66, 'DPNTO': -66, 'CA': -66, 'RANGO': -66},  # estado 116
+    {'NEWLINE': -33, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 117
+    {'NEWLINE': -34},  # estado 118
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 119
+    {'LEN': 116},  # estado 120
+    {'NEWLINE': -53, 'SUM': -53, 'RES': -53, 'MUL': -53, 'DIV': -53, 'AND': -53, 'OR': -53, 'I': -53, 'M': -53, 'm': -53, 'MI': -53, 'mI': -53, 'PA': -53, 'DPNTO': -53, 'CA': -53, 'RANGO': -53},  # estado 121
+    {'NEWLINE': 140},  # estado 122
+    {'PE': 141},  # estado 123
+    {'NEWLINE': 142},  # estado 124
+    {'NEWLINE': 143},  # estado 125
+    {'NEWLINE': 144},  # estado 126
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 127
+    {'NEWLINE': -78, 'LLA': -78},  # estado 128
+    {'CA': 146},  # estado 129
+    {'CA': 147},  # estado 130
+    {'NEWLINE': -26},  # estado 131
+    {'EQ': -23, 'NEWLINE': -23, 'COMA': 105},  # estado 132
+    {'EQ': -24, 'NEWLINE': -24},  # estado 133
+    {'NEWLINE': -28, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 134
+    {'EQ': 148, 'NEWLINE': -65, 'SUM': -65, 'RES': -65, 'MUL': -65, 'DIV': -65, 'AND': -65, 'OR': -65, 'I': -65, 'M': -65, 'm': -65, 'MI': -65, 'mI': -65},  # estado 135
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 136
+    {'NEWLINE': -60, 'SUM': -60, 'RES': -60, 'MUL': -60, 'DIV': -60, 'AND': -60, 'OR': -60, 'I': -60, 'M': -60, 'm': -60, 'MI': -60, 'mI': -60, 'PA': -60, 'DPNTO': -60, 'CA': -60, 'RANGO': -60},  # estado 137
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 138
+    {'CA': 151, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 139
+    {'LLE': 152},  # estado 140
+    {'PA': -73, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43, 'ID': 84},  # estado 141
+    {'LLE': 157},  # estado 142
+    {'LLE': 158},  # estado 143
+    {'LLE': 159},  # estado 144
+    {'RANGO': 160, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 145
+    {'ID': -82},  # estado 146
+    {'ID': -83},  # estado 147
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 108},  # estado 148
+    {'CA': 163, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 149
+    {'NEWLINE': -64, 'PA': -64, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 150
+    {'SUM': -65, 'RES': -65, 'MUL': -65, 'DIV': -65, 'AND': -65, 'OR': -65, 'I': -65, 'M': -65, 'm': -65, 'MI': -65, 'mI': -65, 'NEWLINE': -65, 'PA': -65, 'DPNTO': -65, 'CA': -65, 'RANGO': -65},  # estado 151
+    {'NEWLINE': 164},  # estado 152
+    {'ID': 165},  # estado 153
+    {'PA': 166},  # estado 154
+    {'PA': -74, 'PNTOCOMA': 167},  # estado 155
+    {'PNTOCOMA': -75, 'PA': -75},  # estado 156
+    {'NEWLINE': 168},  # estado 157
+    {'NEWLINE': 169},  # estado 158
+    {'NEWLINE': 170},  # estado 159
+    {'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'ID': 74},  # estado 160
+    {'NEWLINE': -29, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 161
+    {'NEWLINE': -30},  # estado 162
+    {'SUM': -65, 'RES': -65, 'MUL': -65, 'DIV': -65, 'AND': -65, 'OR': -65, 'I': -65, 'M': -65, 'm': -65, 'MI': -65, 'mI': -65, 'NEWLINE': -65, 'EQ': 148},  # estado 163
+    {'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43, 'ID': 84},  # estado 164
+    {'PNTOCOMA': -77, 'PA': -77},  # estado 165
+    {'DPNTO': 175},  # estado 166
+    {'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43, 'ID': 84},  # estado 167
+    {'LLA': -4, 'NEWLINE': -4, 'ID': -4, 'RES': -4, 'SUM': -4, 'NOT': -4, 'COS': -4, 'SEN': -4, 'LOG': -4, 'EXP': -4, 'PE': -4, 'ENTERO': -4, 'REAL': -4, 'CARACTER': -4, 'TRUE': -4, 'FALSE': -4, 'TYPE': -4, 'DEF': -4, 'IF': -4, 'WHILE': -4, 'FOR': -4, 'RETURN': -4, 'IMPORT': -4, 'INT': -4, 'FLOAT': -4, 'CHAR': -4, 'BOOL': -4},  # estado 168
+    {'LLA': -4, 'NEWLINE': -4, 'ID': -4, 'RES': -4, 'SUM': -4, 'NOT': -4, 'COS': -4, 'SEN': -4, 'LOG': -4, 'EXP': -4, 'PE': -4, 'ENTERO': -4, 'REAL': -4, 'CARACTER': -4, 'TRUE': -4, 'FALSE': -4, 'TYPE': -4, 'DEF': -4, 'IF': -4, 'WHILE': -4, 'FOR': -4, 'RETURN': -4, 'IMPORT': -4, 'INT': -4, 'FLOAT': -4, 'CHAR': -4, 'BOOL': -4},  # estado 169
+    {'LLA': -4, 'NEWLINE': -4, 'ID': -4, 'RES': -4, 'SUM': -4, 'NOT': -4, 'COS': -4, 'SEN': -4, 'LOG': -4, 'EXP': -4, 'PE': -4, 'ENTERO': -4, 'REAL': -4, 'CARACTER': -4, 'TRUE': -4, 'FALSE': -4, 'TYPE': -4, 'DEF': -4, 'IF': -4, 'WHILE': -4, 'FOR': -4, 'RETURN': -4, 'IMPORT': -4, 'INT': -4, 'FLOAT': -4, 'CHAR': -4, 'BOOL': -4},  # estado 170
+    {'DPNTO': -70, 'SUM': 47, 'RES': 48, 'MUL': 49, 'DIV': 50, 'AND': 51, 'OR': 52, 'I': 53, 'M': 54, 'm': 55, 'MI': 56, 'mI': 57},  # estado 171
+    {'LLA': 180},  # estado 172
+    {'NEWLINE': 181},  # estado 173
+    {'ID': 132},  # estado 174
+    {'NEWLINE': 183},  # estado 175
+    {'PNTOCOMA': -76, 'PA': -76},  # estado 176
+    {'LLA': 184, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'RETURN': 36, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 177
+    {'LLA': 186, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'RETURN': 36, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 178
+    {'LLA': 187, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'RETURN': 36, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 179
+    {'NEWLINE': -18},  # estado 180
+    {'LLA': -21, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43, 'ID': 84},  # estado 181
+    {'NEWLINE': -22},  # estado 182
+    {'LLE': 189},  # estado 183
+    {'NEWLINE': -67, 'ELSE': 190},  # estado 184
+    {'LLA': -5, 'NEWLINE': -5, 'ID': -5, 'RES': -5, 'SUM': -5, 'NOT': -5, 'COS': -5, 'SEN': -5, 'LOG': -5, 'EXP': -5, 'PE': -5, 'ENTERO': -5, 'REAL': -5, 'CARACTER': -5, 'TRUE': -5, 'FALSE': -5, 'TYPE': -5, 'DEF': -5, 'IF': -5, 'WHILE': -5, 'FOR': -5, 'RETURN': -5, 'IMPORT': -5, 'INT': -5, 'FLOAT': -5, 'CHAR': -5, 'BOOL': -5},  # estado 185
+    {'NEWLINE': -69},  # estado 186
+    {'NEWLINE': -71},  # estado 187
+    {'LLA': -20},  # estado 188
+    {'NEWLINE': 191},  # estado 189
+    {'DPNTO': 192},  # estado 190
+    {'RETURN': -88, 'NEWLINE': -88, 'ID': -88, 'RES': -88, 'SUM': -88, 'NOT': -88, 'COS': -88, 'SEN': -88, 'LOG': -88, 'EXP': -88, 'PE': -88, 'ENTERO': -88, 'REAL': -88, 'CARACTER': -88, 'TRUE': -88, 'FALSE': -88, 'TYPE': -88, 'DEF': -88, 'IF': -88, 'WHILE': -88, 'FOR': -88, 'IMPORT': -88, 'INT': -88, 'FLOAT': -88, 'CHAR': -88, 'BOOL': -88},  # estado 191
+    {'NEWLINE': 194},  # estado 192
+    {'RETURN': -4, 'NEWLINE': -4, 'ID': -4, 'RES': -4, 'SUM': -4, 'NOT': -4, 'COS': -4, 'SEN': -4, 'LOG': -4, 'EXP': -4, 'PE': -4, 'ENTERO': -4, 'REAL': -4, 'CARACTER': -4, 'TRUE': -4, 'FALSE': -4, 'TYPE': -4, 'DEF': -4, 'IF': -4, 'WHILE': -4, 'FOR': -4, 'IMPORT': -4, 'INT': -4, 'FLOAT': -4, 'CHAR': -4, 'BOOL': -4},  # estado 193
+    {'LLE': 196},  # estado 194
+    {'RETURN': 36, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 195
+    {'NEWLINE': 198},  # estado 196
+    {'NEWLINE': 63, 'LLA': -89},  # estado 197
+    {'LLA': -4, 'NEWLINE': -4, 'ID': -4, 'RES': -4, 'SUM': -4, 'NOT': -4, 'COS': -4, 'SEN': -4, 'LOG': -4, 'EXP': -4, 'PE': -4, 'ENTERO': -4, 'REAL': -4, 'CARACTER': -4, 'TRUE': -4, 'FALSE': -4, 'TYPE': -4, 'DEF': -4, 'IF': -4, 'WHILE': -4, 'FOR': -4, 'RETURN': -4, 'IMPORT': -4, 'INT': -4, 'FLOAT': -4, 'CHAR': -4, 'BOOL': -4},  # estado 198
+    {'LLA': 201},  # estado 199
+    {'LLA': 202, 'NEWLINE': 5, 'ID': 16, 'RES': 19, 'SUM': 18, 'NOT': 20, 'COS': 21, 'SEN': 22, 'LOG': 23, 'EXP': 24, 'PE': 25, 'ENTERO': 26, 'REAL': 27, 'CARACTER': 28, 'TRUE': 29, 'FALSE': 30, 'TYPE': 31, 'DEF': 32, 'IF': 33, 'WHILE': 34, 'FOR': 35, 'RETURN': 36, 'IMPORT': 37, 'INT': 40, 'FLOAT': 41, 'CHAR': 42, 'BOOL': 43},  # estado 200
+    {'NEWLINE': -72},  # estado 201
+    {'NEWLINE': -68},  # estado 202
+)
+
+DEFECTO = (None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -25, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -17, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -32, None, -61, None, None, -19, None, None, -34, None, None, None, None, None, None, None, None, None, None, None, None, -26, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -82, -83, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -30, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, None, -18, None, -22, None, None, None, -69, -71, -20, None, None, None, None, None, None, None, None, None, None, None, None, -72, -68)
+
+_IR_A = {'asignacion': {2: 6, 69: 110, 72: 118, 148: 162, 177: 6, 178: 6, 179: 6, 195: 6, 200: 6},
+ 'bloque_propiedades': {164: 172, 181: 188},
+ 'declaracion_variable': {2: 4, 177: 4, 178: 4, 179: 4, 195: 4, 200: 4},
+ 'elem_registro': {2: 17, 69: 17, 72: 17, 148: 17, 177: 17, 178: 17, 179: 17, 195: 17, 200: 17},
+ 'empty': {70: 112},
+ 'expresion': {2: 7,
+               18: 73,
+               19: 75,
+               20: 76,
+               21: 77,
+               22: 78,
+               23: 79,
+               24: 80,
+               25: 81,
+               33: 85,
+               34: 86,
+               36: 89,
+               47: 93,
+               48: 94,
+               49: 95,
+               50: 96,
+               51: 97,
+               52: 98,
+               53: 99,
+               54: 100,
+               55: 101,
+               56: 102,
+               57: 103,
+               68: 107,
+               69: 109,
+               70: 114,
+               72: 117,
+               106: 134,
+               119: 139,
+               127: 145,
+               136: 149,
+               138: 150,
+               148: 161,
+               160: 171,
+               177: 7,
+               178: 7,
+               179: 7,
+               195: 7,
+               200: 7},
+ 'expresion_list': {70: 113},
+ 'for_cabecera': {35: 87},
+ 'for_stmt': {2: 12, 177: 12, 178: 12, 179: 12, 195: 12, 200: 12},
+ 'function_decl': {2: 9, 177: 9, 178: 9, 179: 9, 195: 9, 200: 9},
+ 'if_stmt': {2: 10, 177: 10, 178: 10, 179: 10, 195: 10, 200: 10},
+ 'import_stmt': {2: 14, 177: 14, 178: 14, 179: 14, 195: 14, 200: 14},
+ 'lista_declaraciones': {15: 65},
+ 'lista_expresiones': {70: 111},
+ 'lista_identificadores': {15: 67, 105: 133, 174: 182},
+ 'lista_param': {141: 154},
+ 'lista_programa': {0: 2},
+ 'lista_sentencias': {168: 177, 169: 178, 170: 179, 193: 195, 198: 200},
+ 'param': {141: 156, 167: 176},
+ 'param_list': {141: 155},
+ 'pop_scope': {197: 199},
+ 'programa': {0: 1},
+ 'propiedad': {164: 173, 181: 173},
+ 'push_scope': {191: 193},
+ 'registro_tipo': {2: 39,
+                   32: 39,
+                   141: 39,
+                   164: 39,
+                   167: 39,
+                   177: 39,
+                   178: 39,
+                   179: 39,
+                   181: 39,
+                   195: 39,
+                   200: 39},
+ 'return_stmt': {2: 13, 177: 13, 178: 13, 179: 13, 195: 197, 200: 13},
+ 'sentencia': {2: 3, 177: 185, 178: 185, 179: 185, 195: 185, 200: 185},
+ 'tipo': {2: 15,
+          32: 83,
+          141: 153,
+          164: 174,
+          167: 153,
+          177: 15,
+          178: 15,
+          179: 15,
+          181: 174,
+          195: 15,
+          200: 15},
+ 'tipo_base': {2: 38,
+               32: 38,
+               141: 38,
+               164: 38,
+               167: 38,
+               177: 38,
+               178: 38,
+               179: 38,
+               181: 38,
+               195: 38,
+               200: 38},
+ 'tipo_registro_decl': {2: 8, 177: 8, 178: 8, 179: 8, 195: 8, 200: 8},
+ 'while_stmt': {2: 11, 177: 11, 178: 11, 179: 11, 195: 11, 200: 11}}
+
+# Producción n: símbolo que produce, longitud y acción que la reduce
+# 0: S' -> programa  (None)
+# 1: programa -> lista_programa  (p_programa)
+# 2: lista_programa -> <empty>  (p_lista_programa)
+# 3: lista_programa -> lista_programa sentencia  (p_lista_programa)
+# 4: lista_sentencias -> <empty>  (p_lista_sentencias)
+# 5: lista_sentencias -> lista_sentencias sentencia  (p_lista_sentencias)
+# 6: sentencia -> declaracion_variable NEWLINE  (p_sentencia)
+# 7: sentencia -> asignacion NEWLINE  (p_sentencia)
+# 8: sentencia -> expresion NEWLINE  (p_sentencia)
+# 9: sentencia -> tipo_registro_decl NEWLINE  (p_sentencia)
+# 10: sentencia -> function_decl NEWLINE  (p_sentencia)
+# 11: sentencia -> if_stmt NEWLINE  (p_sentencia)
+# 12: sentencia -> while_stmt NEWLINE  (p_sentencia)
+# 13: sentencia -> for_stmt NEWLINE  (p_sentencia)
+# 14: sentencia -> return_stmt NEWLINE  (p_sentencia)
+# 15: sentencia -> import_stmt NEWLINE  (p_sentencia)
+# 16: sentencia -> NEWLINE  (p_sentencia)
+# 17: import_stmt -> IMPORT ID  (p_import_stmt)
+# 18: tipo_registro_decl -> TYPE ID DPNTO NEWLINE LLE NEWLINE bloque_propiedades LLA  (p_tipo_registro_decl)
+# 19: elem_registro -> ID PNTO ID  (p_elem_registro)
+# 20: bloque_propiedades -> propiedad NEWLINE bloque_propiedades  (p_bloque_propiedades)
+# 21: bloque_propiedades -> propiedad NEWLINE  (p_bloque_propiedades)
+# 22: propiedad -> tipo lista_identificadores  (p_propiedad)
+# 23: lista_identificadores -> ID  (p_lista_identificadores)
+# 24: lista_identificadores -> ID COMA lista_identificadores  (p_lista_identificadores)
+# 25: declaracion_variable -> tipo lista_declaraciones  (p_declaracion_variable)
+# 26: declaracion_variable -> tipo ID LOAD CADENA  (p_declaracion_carga)
+# 27: lista_declaraciones -> lista_identificadores  (p_lista_declaraciones)
+# 28: lista_declaraciones -> lista_identificadores EQ expresion  (p_lista_declaraciones)
+# 29: asignacion -> ID CE expresion CA EQ expresion  (p_asignacion_indice)
+# 30: asignacion -> ID CE expresion CA EQ asignacion  (p_asignacion_indice)
+# 31: asignacion -> ID EQ expresion  (p_asignacion)
+# 32: asignacion -> ID EQ asignacion  (p_asignacion)
+# 33: asignacion -> elem_registro EQ expresion  (p_asignacion)
+# 34: asignacion -> elem_registro EQ asignacion  (p_asignacion)
+# 35: expresion -> expresion SUM expresion  (p_expresion_binaria)
+# 36: expresion -> expresion RES expresion  (p_expresion_binaria)
+# 37: expresion -> expresion MUL expresion  (p_expresion_binaria)
+# 38: expresion -> expresion DIV expresion  (p_expresion_binaria)
+# 39: expresion -> expresion AND expresion  (p_expresion_binaria)
+# 40: expresion -> expresion OR expresion  (p_expresion_binaria)
+# 41: expresion -> expresion I expresion  (p_expresion_binaria)
+# 42: expresion -> expresion M expresion  (p_expresion_binaria)
+# 43: expresion -> expresion m expresion  (p_expresion_binaria)
+# 44: expresion -> expresion MI expresion  (p_expresion_binaria)
+# 45: expresion -> expresion mI expresion  (p_expresion_binaria)
+# 46: expresion -> RES expresion  (p_expresion_uminus)
+# 47: expresion -> SUM expresion  (p_expresion_uplus)
+# 48: expresion -> NOT expresion  (p_expresion_not)
+# 49: expresion -> COS expresion  (p_expresion_func)
+# 50: expresion -> SEN expresion  (p_expresion_func)
+# 51: expresion -> LOG expresion  (p_expresion_func)
+# 52: expresion -> EXP expresion  (p_expresion_func)
+# 53: expresion -> PE expresion PA  (p_expresion_group)
+# 54: expresion -> ENTERO  (p_expresion_literal)
+# 55: expresion -> REAL  (p_expresion_literal)
+# 56: expresion -> CARACTER  (p_expresion_literal)
+# 57: expresion -> TRUE  (p_expresion_literal)
+# 58: expresion -> FALSE  (p_expresion_literal)
+# 59: expresion -> ID  (p_expresion_id)
+# 60: expresion -> ID PE lista_expresiones PA  (p_expresion_func_call)
+# 61: lista_expresiones -> empty  (p_lista_expresiones)
+# 62: lista_expresiones -> expresion_list  (p_lista_expresiones)
+# 63: expresion_list -> expresion  (p_expresion_list)
+# 64: expresion_list -> expresion_list NEWLINE expresion  (p_expresion_list)
+# 65: expresion -> ID CE expresion CA  (p_expresion_index)
+# 66: expresion -> ID PNTO LEN  (p_expresion_len)
+# 67: if_stmt -> IF expresion DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA  (p_if_stmt)
+# 68: if_stmt -> IF expresion DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA ELSE DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA  (p_if_stmt)
+# 69: while_stmt -> WHILE expresion DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA  (p_while_stmt)
+# 70: for_cabecera -> ID IN expresion RANGO expresion  (p_for_cabecera)
+# 71: for_stmt -> FOR for_cabecera DPNTO NEWLINE LLE NEWLINE lista_sentencias LLA  (p_for_stmt)
+# 72: function_decl -> DEF tipo ID PE lista_param PA DPNTO NEWLINE LLE NEWLINE push_scope lista_sentencias return_stmt pop_scope LLA  (p_function_decl)
+# 73: lista_param -> <empty>  (p_lista_param)
+# 74: lista_param -> param_list  (p_lista_param)
+# 75: param_list -> param  (p_param_list)
+# 76: param_list -> param_list PNTOCOMA param  (p_param_list)
+# 77: param -> tipo ID  (p_param)
+# 78: return_stmt -> RETURN expresion NEWLINE  (p_return)
+# 79: registro_tipo -> ID  (p_registro_tipo)
+# 80: tipo -> tipo_base  (p_tipo)
+# 81: tipo -> registro_tipo  (p_tipo)
+# 82: tipo -> tipo_base CE ENTERO CA  (p_tipo_vector)
+# 83: tipo -> registro_tipo CE ENTERO CA  (p_tipo_vector)
+# 84: tipo_base -> INT  (p_tipo_base)
+# 85: tipo_base -> FLOAT  (p_tipo_base)
+# 86: tipo_base -> CHAR  (p_tipo_base)
+# 87: tipo_base -> BOOL  (p_tipo_base)
+# 88: push_scope -> <empty>  (p_push_scope)
+# 89: pop_scope -> <empty>  (p_pop_scope)
+# 90: empty -> <empty>  (p_empty)
+NOMBRE = ("S'", 'programa', 'lista_programa', 'lista_programa', 'lista_sentencias', 'lista_sentencias', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'sentencia', 'import_stmt', 'tipo_registro_decl', 'elem_registro', 'bloque_propiedades', 'bloque_propiedades', 'propiedad', 'lista_identificadores', 'lista_identificadores', 'declaracion_variable', 'declaracion_variable', 'lista_declaraciones', 'lista_declaraciones', 'asignacion', 'asignacion', 'asignacion', 'asignacion', 'asignacion', 'asignacion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'expresion', 'lista_expresiones', 'lista_expresiones', 'expresion_list', 'expresion_list', 'expresion', 'expresion', 'if_stmt', 'if_stmt', 'while_stmt', 'for_cabecera', 'for_stmt', 'function_decl', 'lista_param', 'lista_param', 'param_list', 'param_list', 'param', 'return_stmt', 'registro_tipo', 'tipo', 'tipo', 'tipo', 'tipo', 'tipo_base', 'tipo_base', 'tipo_base', 'tipo_base', 'push_scope', 'pop_scope', 'empty')
+
+LONGITUD = (1, 1, 0, 2, 0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 1, 2, 8, 3, 3, 2, 2, 1, 3, 2, 4, 1, 3, 6, 6, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 2, 2, 2, 2, 2, 2, 2, 3, 1, 1, 1, 1, 1, 1, 4, 1, 1, 1, 3, 4, 3, 8, 15, 8, 5, 8, 15, 0, 1, 1, 3, 2, 3, 1, 1, 1, 4, 4, 1, 1, 1, 1, 0, 0, 0)
+
+IR_A = tuple(_IR_A.get(nombre) for nombre in NOMBRE)
+
+
+def analizar_con_posiciones(lr, lexer, texto=None):
+    acciones = _acciones(lr)
+    pslice = Produccion()
+    pslice.lexer = lexer
+    pslice.parser = lr
+    if texto is not None:
+        lexer.input(texto)
+    get_token = lr.token = lexer.token
+
+    lookahead = None
+    lookaheadstack = []
+    errorcount = 0
+    statestack = lr.statestack = [0]
+    sym = Simbolo()
+    sym.type = '$end'
+    symstack = lr.symstack = [sym]
+    pslice.stack = symstack
+    state = 0
+
+    while True:
+        t = DEFECTO[state]
+        if t is None:
+            if not lookahead:
+                if not lookaheadstack:
+                    lookahead = get_token()
+                else:
+                    lookahead = lookaheadstack.pop()
+                if not lookahead:
+                    lookahead = Simbolo()
+                    lookahead.type = '$end'
+            t = ACCION[state].get(lookahead.type)
+
+        if t is not None:
+            if t > 0:
+                # desplazamiento
+                statestack.append(t)
+                state = t
+                symstack.append(lookahead)
+                lookahead = None
+                if errorcount:
+                    errorcount -= 1
+                continue
+
+            if t < 0:
+                # reducción por la producción -t
+                n = -t
+                plen = LONGITUD[n]
+                sym = Simbolo()
+                sym.type = NOMBRE[n]
+                sym.value = None
+                if plen:
+                    targ = symstack[-plen-1:]
+                    targ[0] = sym
+                    t1 = targ[1]
+                    sym.lineno = t1.lineno
+                    sym.lexpos = t1.lexpos
+                    t1 = targ[-1]
+                    sym.endlineno = getattr(t1, 'endlineno', t1.lineno)
+                    sym.endlexpos = getattr(t1, 'endlexpos', t1.lexpos)
+                    pslice.slice = targ
+                    try:
+                        del symstack[-plen:]
+                        lr.state = state
+                        acciones[n](pslice)
+                        del statestack[-plen:]
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        symstack.extend(targ[1:-1])
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                else:
+                    sym.lineno = lexer.lineno
+                    sym.lexpos = lexer.lexpos
+                    pslice.slice = [sym]
+                    try:
+                        lr.state = state
+                        acciones[n](pslice)
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                continue
+
+            # t == 0: aceptar
+            return symstack[-1].value
+
+        # error sintáctico: misma recuperación que PLY
+        if errorcount == 0 or lr.errorok:
+            errorcount = error_count
+            lr.errorok = False
+            errtoken = lookahead
+            if errtoken.type == '$end':
+                errtoken = None
+            if lr.errorfunc:
+                if errtoken and not hasattr(errtoken, 'lexer'):
+                    errtoken.lexer = lexer
+                lr.state = state
+                # call_errorfunc usa globales de ply.yacc (errok/token/restart)
+                with _CERROJO_ERRORES:
+                    tok = call_errorfunc(lr.errorfunc, errtoken, lr)
+                if lr.errorok:
+                    lookahead = tok
+                    continue
+            else:
+                if errtoken:
+                    lineno = getattr(lookahead, 'lineno', 0)
+                    if lineno:
+                        sys.stderr.write('yacc: Syntax error at line %d, token=%s\n' % (lineno, errtoken.type))
+                    else:
+                        sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                else:
+                    sys.stderr.write('yacc: Parse error in input. EOF\n')
+                    return
+        else:
+            errorcount = error_count
+
+        if len(statestack) <= 1 and lookahead.type != '$end':
+            lookahead = None
+            state = 0
+            del lookaheadstack[:]
+            continue
+
+        if lookahead.type == '$end':
+            return
+
+        if lookahead.type != 'error':
+            sym = symstack[-1]
+            if sym.type == 'error':
+                sym.endlineno = getattr(lookahead, 'lineno', sym.lineno)
+                sym.endlexpos = getattr(lookahead, 'lexpos', sym.lexpos)
+                lookahead = None
+                continue
+            t = Simbolo()
+            t.type = 'error'
+            if hasattr(lookahead, 'lineno'):
+                t.lineno = t.endlineno = lookahead.lineno
+            if hasattr(lookahead, 'lexpos'):
+                t.lexpos = t.endlexpos = lookahead.lexpos
+            t.value = lookahead
+            lookaheadstack.append(lookahead)
+            lookahead = t
+        else:
+            sym = symstack.pop()
+            lookahead.lineno = sym.lineno
+            lookahead.lexpos = sym.lexpos
+            statestack.pop()
+            state = statestack[-1]
+
+def analizar_sin_posiciones(lr, lexer, texto=None):
+    acciones = _acciones(lr)
+    pslice = Produccion()
+    pslice.lexer = lexer
+    pslice.parser = lr
+    if texto is not None:
+        lexer.input(texto)
+    get_token = lr.token = lexer.token
+
+    lookahead = None
+    lookaheadstack = []
+    errorcount = 0
+    statestack = lr.statestack = [0]
+    sym = Simbolo()
+    sym.type = '$end'
+    symstack = lr.symstack = [sym]
+    pslice.stack = symstack
+    state = 0
+
+    while True:
+        t = DEFECTO[state]
+        if t is None:
+            if not lookahead:
+                if not lookaheadstack:
+                    lookahead = get_token()
+                else:
+                    lookahead = lookaheadstack.pop()
+                if not lookahead:
+                    lookahead = Simbolo()
+                    lookahead.type = '$end'
+            t = ACCION[state].get(lookahead.type)
+
+        if t is not None:
+            if t > 0:
+                # desplazamiento
+                statestack.append(t)
+                state = t
+                symstack.append(lookahead)
+                lookahead = None
+                if errorcount:
+                    errorcount -= 1
+                continue
+
+            if t < 0:
+                # reducción por la producción -t
+                n = -t
+                plen = LONGITUD[n]
+                sym = Simbolo()
+                sym.type = NOMBRE[n]
+                sym.value = None
+                if plen:
+                    targ = symstack[-plen-1:]
+                    targ[0] = sym
+                    pslice.slice = targ
+                    try:
+                        del symstack[-plen:]
+                        lr.state = state
+                        acciones[n](pslice)
+                        del statestack[-plen:]
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        symstack.extend(targ[1:-1])
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                else:
+                    pslice.slice = [sym]
+                    try:
+                        lr.state = state
+                        acciones[n](pslice)
+                        symstack.append(sym)
+                        state = IR_A[n][statestack[-1]]
+                        statestack.append(state)
+                    except SyntaxError:
+                        lookaheadstack.append(lookahead)
+                        statestack.pop()
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        lr.errorok = False
+                continue
+
+            # t == 0: aceptar
+            return symstack[-1].value
+
+        # error sintáctico: misma recuperación que PLY
+        if errorcount == 0 or lr.errorok:
+            errorcount = error_count
+            lr.errorok = False
+            errtoken = lookahead
+            if errtoken.type == '$end':
+                errtoken = None
+            if lr.errorfunc:
+                if errtoken and not hasattr(errtoken, 'lexer'):
+                    errtoken.lexer = lexer
+                lr.state = state
+                # call_errorfunc usa globales de ply.yacc (errok/token/restart)
+                with _CERROJO_ERRORES:
+                    tok = call_errorfunc(lr.errorfunc, errtoken, lr)
+                if lr.errorok:
+                    lookahead = tok
+                    continue
+            else:
+                if errtoken:
+                    lineno = getattr(lookahead, 'lineno', 0)
+                    if lineno:
+                        sys.stderr.write('yacc: Syntax error at line %d, token=%s\n' % (lineno, errtoken.type))
+                    else:
+                        sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                else:
+                    sys.stderr.write('yacc: Parse error in input. EOF\n')
+                    return
+        else:
+            errorcount = error_count
+
+        if len(statestack) <= 1 and lookahead.type != '$end':
+            lookahead = None
+            state = 0
+            del lookaheadstack[:]
+            continue
+
+        if lookahead.type == '$end':
+            return
+
+        if lookahead.type != 'error':
+            sym = symstack[-1]
+            if sym.type == 'error':
+                lookahead = None
+                continue
+            t = Simbolo()
+            t.type = 'error'
+            if hasattr(lookahead, 'lineno'):
+                t.lineno = t.endlineno = lookahead.lineno
+            if hasattr(lookahead, 'lexpos'):
+                t.lexpos = t.endlexpos = lookahead.lexpos
+            t.value = lookahead
+            lookaheadstack.append(lookahead)
+            lookahead = t
+        else:
+            sym = symstack.pop()
+            statestack.pop()
+            state = statestack[-1]
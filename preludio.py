@@ -0,0 +1,101 @@
+"""
+Preludio precompilado.
+
+Muchos programas empiezan con el mismo bloque de registros ('type') y de
+funciones comunes. preparar() analiza ese bloque una sola vez y guarda
+en .viper_cache una instantánea de tipos_registro, func_prototypes y las
+entradas globales del entorno, bajo el hash del texto del preludio: si
+el preludio cambia, cambia la clave y se vuelve a analizar. aplicar()
+deja un ParserClass recién creado (o reiniciado) como si acabara de
+analizar el preludio, y el programa se analiza encima.
+
+Los registros y las funciones del preludio cuentan como importados: no
+se escriben en el .record del programa ni forman parte de su interfaz.
+Sus variables globales sí son del programa y salen en el .symbol.
+Un preludio no puede declarar vectores con 'load': la instantánea solo
+depende del texto del preludio y guardaría los datos del fichero, que
+se servirían aunque el fichero cambiase.
+"""
+import hashlib
+import os
+import pickle
+
+from diagnosticos import Diagnosticos
+
+DIR_CACHE = '.viper_cache'
+
+# Cambia si cambia lo que guarda el análisis: invalida las instantáneas
+FORMATO = 2
+
+_memoria = {}       # clave -> instantánea serializada, ya leída en este proceso
+
+
+def _clave(texto):
+    return hashlib.sha256(f"{FORMATO}:".encode() + texto.encode()).hexdigest()
+
+
+def _ruta_cache(ruta, clave):
+    return os.path.join(os.path.dirname(os.path.abspath(ruta)), DIR_CACHE,
+                        'preludio-' + clave + '.pickle')
+
+
+def preparar(ruta):
+    """
+    Instantánea del preludio de 'ruta'. Devuelve {'instantanea', 'error',
+    'cache'}: 'error' es el texto de los diagnósticos (e 'instantanea'
+    None) si el preludio no pasa el análisis; 'cache' dice si no hizo
+    falta analizarlo.
+    """
+    with open(ruta, 'r') as f:
+        texto = f.read()
+    clave = _clave(texto)
+    if clave in _memoria:
+        return {'instantanea': _memoria[clave], 'error': None, 'cache': True}
+
+    ruta_cache = _ruta_cache(ruta, clave)
+    try:
+        with open(ruta_cache, 'rb') as f:
+            instantanea = f.read()
+        _memoria[clave] = instantanea
+        return {'instantanea': instantanea, 'error': None, 'cache': True}
+    except OSError:
+        pass
+
+    from parser import ParserClass
+    parser = ParserClass(ruta, debug=False)
+    parser.admite_carga = False
+    diagnosticos = parser.lexer.diagnosticos = Diagnosticos()
+    error = parser.comprobar(texto)
+    if error is not None:
+        diagnosticos.semantico(parser, error)
+    mensajes = diagnosticos.texto()
+    if mensajes:
+        return {'instantanea': None, 'error': f"Preludio '{ruta}':\n" + mensajes, 'cache': False}
+
+    instantanea = pickle.dumps({
+        'tipos_registro':  parser.tipos_registro,
+        'func_prototypes': parser.func_prototypes,
+        'entorno':         parser.entorno,
+    }, pickle.HIGHEST_PROTOCOL)
+
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    # escritura atómica: un análisis cortado no deja la caché a medias
+    with open(ruta_cache + '.tmp', 'wb') as f:
+        f.write(instantanea)
+    os.replace(ruta_cache + '.tmp', ruta_cache)
+    _memoria[clave] = instantanea
+    return {'instantanea': instantanea, 'error': None, 'cache': False}
+
+
+def aplicar(parser, instantanea):
+    """
+    Carga la instantánea en 'parser', que debe estar recién creado o
+    reiniciado. Cada llamada deserializa una copia nueva: el análisis
+    del programa puede modificar las entradas del entorno.
+    """
+    estado = pickle.loads(instantanea)
+    parser.tipos_registro = estado['tipos_registro']
+    parser.func_prototypes = estado['func_prototypes']
+    parser.entorno = estado['entorno']
+    parser.importados.update(parser.tipos_registro)
+    parser.importados.update(parser.func_prototypes)
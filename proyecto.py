@@ -0,0 +1,241 @@
+"""
+Modo proyecto: analiza un directorio de módulos Viper que se importan
+registros y prototipos de funciones entre sí ('import modulo').
+
+1. Se leen los módulos (*.viper) y sus 'import' para construir el grafo
+   de dependencias, que se recorre por capas topológicas.
+2. Los módulos de una misma capa no dependen entre sí y se analizan en
+   paralelo en un pool de procesos; cada proceso construye su
+   ParserClass una sola vez.
+3. .viper_cache guarda por módulo el hash del fuente, su interfaz y el
+   hash de la interfaz de cada dependencia. Un módulo solo se vuelve a
+   analizar si cambió su fuente o la interfaz de alguna dependencia (o
+   si falta su .symbol/.record): si se reanaliza y su interfaz no
+   cambia, sus dependientes no se tocan.
+"""
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer import LexerClass
+
+EXTENSION = '.viper'
+DIR_CACHE = '.viper_cache'
+
+_parser = None      # ParserClass del proceso trabajador
+
+
+#
+#region 1. MÓDULOS Y GRAFO
+#
+
+def _hash(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+
+def hash_interfaz(interfaz):
+    # los Tipo se serializan por nombre (__reduce__), así que el pickle es estable
+    return _hash(pickle.dumps(interfaz))
+
+
+def importaciones(texto):
+    """Módulos importados por 'texto', en orden y sin repetir."""
+    lexer = LexerClass().lexerObj
+    lexer.input(texto)
+    modulos = []
+    anterior = None
+    for tok in lexer:
+        if anterior == 'IMPORT' and tok.type == 'ID' and tok.value not in modulos:
+            modulos.append(tok.value)
+        anterior = tok.type
+    return modulos
+
+
+def descubrir(directorio):
+    """{módulo: ruta} de los ficheros del proyecto."""
+    modulos = {}
+    for fichero in sorted(os.listdir(directorio)):
+        nombre, ext = os.path.splitext(fichero)
+        if ext == EXTENSION:
+            modulos[nombre] = os.path.join(directorio, fichero)
+    return modulos
+
+
+def capas(dependencias):
+    """
+    Orden topológico por capas (Kahn): cada capa solo depende de las
+    anteriores. Devuelve (capas, módulos en ciclo).
+    """
+    pendientes = {m: {d for d in deps if d in dependencias}
+                  for m, deps in dependencias.items()}
+    resultado = []
+    while pendientes:
+        capa = sorted(m for m, deps in pendientes.items() if not deps)
+        if not capa:
+            # lo que queda está en un ciclo o depende de uno
+            return resultado, sorted(pendientes)
+        resultado.append(capa)
+        for m in capa:
+            del pendientes[m]
+        for deps in pendientes.values():
+            deps.difference_update(capa)
+    return resultado, []
+
+#endregion
+
+
+#
+#region 2. ANÁLISIS DE UN MÓDULO
+#
+
+def _iniciar_trabajador():
+    global _parser
+    from parser import ParserClass
+    _parser = ParserClass(None, debug=False)
+
+
+def salidas(ruta):
+    """Rutas del .symbol y el .record que escribe el análisis de 'ruta'."""
+    base = os.path.splitext(ruta)[0]
+    return base + '.symbol', base + '.record'
+
+
+def analizar_modulo(ruta, interfaces):
+    """
+    Analiza un módulo con las interfaces de sus dependencias.
+    Escribe su .symbol/.record y devuelve {'error': texto o None, 'interfaz': ...}.
+    """
+    if _parser is None:
+        _iniciar_trabajador()
+    parser = _parser
+    parser.reiniciar()
+    parser.ruta_archivo = ruta
+    parser.interfaces = interfaces
+
+    with open(ruta, 'r') as f:
+        contenido = f.read()
+    error = parser.comprobar(contenido)
+    if error is not None:
+        linea, col = parser.posicion(error)
+        return {'error': f"Error semántico: {error['error']} en línea {linea}, columna {col}",
+                'interfaz': None}
+
+    parser.escribir_tablas(ruta)
+    return {'error': None, 'interfaz': parser.interfaz()}
+
+#endregion
+
+
+#
+#region 3. CONSTRUCCIÓN INCREMENTAL
+#
+
+def _ruta_cache(directorio, modulo):
+    return os.path.join(directorio, DIR_CACHE, modulo + '.pickle')
+
+
+def _leer_cache(directorio, modulo):
+    try:
+        with open(_ruta_cache(directorio, modulo), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def _guardar_cache(directorio, modulo, entrada):
+    os.makedirs(os.path.join(directorio, DIR_CACHE), exist_ok=True)
+    ruta = _ruta_cache(directorio, modulo)
+    # escritura atómica: una construcción cortada no deja la caché a medias
+    with open(ruta + '.tmp', 'wb') as f:
+        pickle.dump(entrada, f)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def construir(directorio, trabajadores=None):
+    """
+    Analiza el proyecto de 'directorio'. Devuelve {módulo: estado}, donde
+    estado es 'analizado', 'cache', 'error: ...' u 'omitido: ...'.
+    """
+    rutas = descubrir(directorio)
+
+    # 1) Fuentes, hashes e imports (los imports se reutilizan de la caché)
+    fuentes, cache, dependencias = {}, {}, {}
+    for modulo, ruta in rutas.items():
+        with open(ruta, 'rb') as f:
+            fuentes[modulo] = _hash(f.read())
+        cache[modulo] = _leer_cache(directorio, modulo)
+        if cache[modulo] is not None and cache[modulo]['hash_fuente'] == fuentes[modulo]:
+            dependencias[modulo] = cache[modulo]['importa']
+        else:
+            with open(ruta, 'r') as f:
+                dependencias[modulo] = importaciones(f.read())
+
+    orden, en_ciclo = capas(dependencias)
+    estados = {m: 'omitido: importación circular' for m in en_ciclo}
+    interfaces, hashes = {}, {}
+
+    pool = None
+    try:
+        for capa in orden:
+            # 2) Qué módulos de la capa hay que reanalizar
+            tareas = []
+            for modulo in capa:
+                deps = [d for d in dependencias[modulo] if d in rutas]
+                fallidas = [d for d in deps if d not in interfaces]
+                if fallidas:
+                    estados[modulo] = f"omitido: dependencia '{fallidas[0]}' con errores"
+                    continue
+                hashes_deps = {d: hashes[d] for d in deps}
+                anterior = cache[modulo]
+                if (anterior is not None
+                        and anterior['hash_fuente'] == fuentes[modulo]
+                        and anterior['hashes_deps'] == hashes_deps
+                        # un módulo con errores no escribe nada que echar en falta
+                        and (anterior['error'] is not None
+                             or all(map(os.path.exists, salidas(rutas[modulo]))))):
+                    # corte temprano: nada de lo que ve el módulo ha cambiado
+                    _registrar(modulo, anterior, interfaces, hashes, estados, 'cache')
+                    continue
+                visibles = {d: interfaces[d] for d in deps}
+                tareas.append((modulo, hashes_deps, visibles))
+
+            # 3) Análisis en paralelo; una sola tarea no compensa el pool
+            if len(tareas) > 1 and trabajadores != 1:
+                if pool is None:
+                    pool = ProcessPoolExecutor(max_workers=trabajadores,
+                                               initializer=_iniciar_trabajador)
+                futuros = [pool.submit(analizar_modulo, rutas[m], vis) for m, _, vis in tareas]
+                resultados = [f.result() for f in futuros]
+            else:
+                resultados = [analizar_modulo(rutas[m], vis) for m, _, vis in tareas]
+
+            # 4) Guardar en caché y publicar interfaces para la capa siguiente
+            for (modulo, hashes_deps, _), res in zip(tareas, resultados):
+                entrada = {
+                    'hash_fuente':   fuentes[modulo],
+                    'importa':       dependencias[modulo],
+                    'hashes_deps':   hashes_deps,
+                    'error':         res['error'],
+                    'interfaz':      res['interfaz'],
+                    'hash_interfaz': (None if res['interfaz'] is None
+                                      else hash_interfaz(res['interfaz'])),
+                }
+                _guardar_cache(directorio, modulo, entrada)
+                _registrar(modulo, entrada, interfaces, hashes, estados, 'analizado')
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return estados
+
+
+def _registrar(modulo, entrada, interfaces, hashes, estados, estado):
+    if entrada['error'] is not None:
+        estados[modulo] = 'error: ' + entrada['error']
+        return
+    interfaces[modulo] = entrada['interfaz']
+    hashes[modulo] = entrada['hash_interfaz']
+    estados[modulo] = estado
+
+#endregion
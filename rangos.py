@@ -0,0 +1,128 @@
+"""
+Análisis de rangos de los índices de vector.
+
+Cada expresión entera tiene, si se puede saber sin ejecutar, un intervalo
+cerrado (mínimo, máximo) de sus valores:
+  - literales y v.len: su valor;
+  - la variable de un 'for i in a..b': [mínimo de a, máximo de b - 1]
+    (no se puede asignar dentro del bucle, así que el intervalo vale en
+    todo el cuerpo);
+  - +, -, * y / (con divisor positivo): aritmética de intervalos.
+Las demás variables no tienen intervalo: su valor puede cambiar en las
+vueltas de un bucle aunque el analizador lleve uno conocido.
+
+Un acceso v[i] cuyo intervalo cae dentro de [0, v.len) se marca con
+'sin_comprobacion'; uno cuyo intervalo cae entero fuera es un error al
+analizar; el resto se comprueba al ejecutar. El 'valor' que el analizador
+lleva de una variable no sirve para esto: no depende del camino (una
+asignación dentro de un if cuenta siempre).
+"""
+from optimizador import hijos, expresiones_de, bloques_de
+from tipos import INT
+
+
+def _div(a, b):
+    # división entera truncando hacia cero, como en C
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def _extremos(valores):
+    return min(valores), max(valores)
+
+
+def intervalo(e):
+    """(mínimo, máximo) de los valores de la expresión entera e, o None."""
+    if not isinstance(e, dict) or e.get('tipo') is not INT:
+        return None
+    kind = e.get('node')
+    if kind in ('lit', 'len'):
+        return e['valor'], e['valor']
+    if kind == 'var':
+        return e.get('rango')
+    if kind == 'un' and e['op'] in ('RES', 'SUM'):
+        r = intervalo(e['expr'])
+        if r is None or e['op'] == 'SUM':
+            return r
+        return -r[1], -r[0]
+    if kind == 'bin' and e['op'] in ('SUM', 'RES', 'MUL', 'DIV'):
+        a, b = intervalo(e['izq']), intervalo(e['der'])
+        if a is None or b is None:
+            return None
+        op = e['op']
+        if op == 'SUM':
+            return a[0] + b[0], a[1] + b[1]
+        if op == 'RES':
+            return a[0] - b[1], a[1] - b[0]
+        if op == 'MUL':
+            return _extremos([x * y for x in a for y in b])
+        if b[0] > 0:
+            # con divisor positivo el cociente es monótono en cada operando
+            return _extremos([_div(x, y) for x in a for y in b])
+    return None
+
+
+def rango_for(desde, hasta):
+    """Intervalo de la variable de 'for i in desde..hasta', o None."""
+    a, b = intervalo(desde), intervalo(hasta)
+    if a is None or b is None or a[0] > b[1] - 1:
+        return None     # sin cotas, o bucle que nunca entra
+    return a[0], b[1] - 1
+
+
+def en_rango(indice, size):
+    """¿Está demostrado que el índice cae siempre dentro de un vector de 'size'?"""
+    r = intervalo(indice)
+    return r is not None and 0 <= r[0] and r[1] < size
+
+
+def fuera_de_rango(indice, size):
+    """
+    Texto del índice si está demostrado que cae siempre fuera de un
+    vector de 'size' ('5', o 'entre 3 y 7'); None si no.
+    """
+    r = intervalo(indice)
+    if r is None or 0 <= r[1] and r[0] < size:
+        return None
+    return str(r[0]) if r[0] == r[1] else f"entre {r[0]} y {r[1]}"
+
+
+#
+#region INFORME
+#
+
+def _contar_expr(e, stats):
+    if e.get('node') == 'index' or (e.get('node') == 'asig' and e['destino'][0] == 'index'):
+        stats['accesos'] += 1
+        stats['sin_comprobacion'] += bool(e.get('sin_comprobacion'))
+    if e.get('node') == 'asig' and e['destino'][0] == 'index':
+        _contar_expr(e['destino'][2], stats)
+    for h in hijos(e):
+        _contar_expr(h, stats)
+
+
+def _contar(sentencias, stats):
+    for s in sentencias if isinstance(sentencias, list) else []:
+        if not isinstance(s, dict) or 'error' in s:
+            continue
+        for e in expresiones_de(s):
+            _contar_expr(e, stats)
+        if s.get('node') == 'funcion' and isinstance(s.get('ret'), dict):
+            _contar_expr(s['ret'], stats)
+        for b in bloques_de(s):
+            _contar(s[b], stats)
+
+
+def estadisticas(programa):
+    """Accesos a vector del programa y cuántos no necesitan comprobación."""
+    stats = {'accesos': 0, 'sin_comprobacion': 0}
+    _contar(programa, stats)
+    stats['proporcion'] = stats['sin_comprobacion'] / stats['accesos'] if stats['accesos'] else 0.0
+    return stats
+
+
+def informe(stats):
+    return (f"rangos: accesos={stats['accesos']}, sin_comprobacion={stats['sin_comprobacion']}, "
+            f"eliminadas={stats['proporcion']:.1%}")
+
+#endregion
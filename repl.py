@@ -0,0 +1,216 @@
+"""
+REPL de Viper: comprueba cada sentencia o bloque según se escribe.
+
+Se construye un solo ParserClass y su estado (entorno, tipos_registro,
+func_prototypes) se conserva entre entradas: cada entrada pasa por la
+gramática sola, encima de lo ya definido, y se responde en el momento
+con su tipo o sus diagnósticos. Una entrada con errores no deja nada a
+medias: el estado vuelve al de antes de ella.
+
+Una entrada sigue en la línea siguiente mientras queden llaves abiertas
+o la última línea acabe en ':' (if, while, for, def, type, '} else:').
+
+Órdenes:
+  :symbols   variables y vectores definidos (como el .symbol)
+  :records   registros definidos (como el .record)
+  :time      muestra u oculta el tiempo de análisis de cada entrada
+  :reset     olvida todo lo definido
+  :help      esta ayuda
+  :quit      sale (también Ctrl-D)
+
+Uso: python repl.py [--preludio <archivo>]
+"""
+import io
+import sys
+import time
+
+from lexer import LexerClass
+from parser import ParserClass
+from diagnosticos import Diagnosticos
+from optimizador import bloques_de
+from transpilador import formatear
+import preludio
+
+PROMPT = 'viper> '
+PROMPT_SEGUIR = '  ...> '
+
+
+def _tipo(t):
+    if t is None:
+        return '?'
+    if t.es_vector:
+        return f"{_tipo(t.base)}[{t.size}]"
+    return str(t)
+
+
+def _primer_error(sentencias):
+    """Primer nodo de error, también dentro de bloques (el parser no los sube)."""
+    if isinstance(sentencias, dict):
+        return sentencias if 'error' in sentencias else None
+    for s in sentencias if isinstance(sentencias, list) else []:
+        if not isinstance(s, dict):
+            continue
+        if 'error' in s:
+            return s
+        for bloque in bloques_de(s):
+            error = _primer_error(s[bloque])
+            if error is not None:
+                return error
+    return None
+
+
+class Repl:
+
+    def __init__(self, ruta_preludio=None):
+        self.parser = ParserClass(None, debug=False)
+        self.ruta_preludio = ruta_preludio
+        self.tiempos = False
+        # lexer aparte para saber si una entrada está completa
+        self._lexer = LexerClass().lexerObj
+        self._lexer.salida = io.StringIO()
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.parser.reiniciar()
+        if self.ruta_preludio is not None:
+            resultado = preludio.preparar(self.ruta_preludio)
+            if resultado['error']:
+                raise ValueError(resultado['error'])
+            preludio.aplicar(self.parser, resultado['instantanea'])
+
+    def completa(self, texto):
+        """¿Se puede analizar ya 'texto', o falta el resto del bloque?"""
+        self._lexer.input(texto)
+        profundidad, ultimo = 0, None
+        for tok in self._lexer:
+            if tok.type == 'LLE':
+                profundidad += 1
+            elif tok.type == 'LLA':
+                profundidad -= 1
+            if tok.type != 'NEWLINE':
+                ultimo = tok.type
+        return profundidad <= 0 and ultimo != 'DPNTO'
+
+    def entrada(self, texto):
+        """Analiza una entrada completa; devuelve las líneas de la respuesta."""
+        parser = self.parser
+        if not texto.endswith('\n'):
+            texto += '\n'
+        antes = parser._estado()
+        registros = set(parser.tipos_registro)
+        diagnosticos = parser.lexer.diagnosticos = Diagnosticos()
+        parser.lexer.lineno = 1
+        sentencias = []
+
+        inicio = time.perf_counter()
+        error = parser.parse_stream(texto, sentencias.append)
+        if error is None:
+            error = _primer_error(sentencias)
+        segundos = time.perf_counter() - inicio
+
+        if error is not None:
+            diagnosticos.semantico(parser, error)
+        if diagnosticos:
+            # nada de una entrada con errores se queda en el estado
+            parser._restaurar(antes)
+            lineas = diagnosticos.lineas()
+        else:
+            parser._confirmar()
+            lineas = [f"registro {nombre}" for nombre in parser.tipos_registro
+                      if nombre not in registros]
+            for s in sentencias:
+                lineas.extend(self.describir(s))
+        if self.tiempos:
+            lineas.append(f"({segundos * 1000:.2f} ms)")
+        return lineas
+
+    def describir(self, s):
+        """Tipo (y valor, si se conoce) de lo que define o calcula una sentencia."""
+        if not isinstance(s, dict):
+            return []
+        kind = s.get('node')
+        if kind == 'decl':
+            return [f"{nombre} : {_tipo(self.parser.entorno[nombre]['type'])}"
+                    for nombre, _ in s['decls']]
+        if kind == 'asig':
+            destino = s['destino']
+            if destino[0] == 'var':
+                return [f"{destino[1]} : {_tipo(self.parser.entorno[destino[1]]['type'])}"]
+            if destino[0] == 'field':
+                registro = self.parser.entorno[destino[1]]['type'].nombre
+                campo = self.parser.tipos_registro[registro][destino[2]]
+                return [f"{destino[1]}.{destino[2]} : {_tipo(campo)}"]
+            return [f"{destino[1]}[] : {_tipo(self.parser.entorno[destino[1]]['base'])}"]
+        if kind == 'funcion':
+            params = ', '.join(f"{_tipo(t)} {n}" for t, n in s['params'])
+            return [f"def {s['nombre']}({params}) : {_tipo(s['ret_type'])}"]
+        if 'tipo' in s:
+            linea = f"- : {_tipo(s['tipo'])}"
+            if s.get('valor') is not None:
+                linea += f" = {formatear(s['valor'])}"
+            return [linea]
+        return []
+
+    def orden(self, texto):
+        """Ejecuta una orden ':...'; devuelve sus líneas, o None para salir."""
+        nombre = texto.split()[0]
+        if nombre == ':quit':
+            return None
+        if nombre == ':symbols':
+            return self.parser.tablas()[0].splitlines()
+        if nombre == ':records':
+            return self.parser.tablas()[1].splitlines()
+        if nombre == ':time':
+            self.tiempos = not self.tiempos
+            return [f"tiempos {'activados' if self.tiempos else 'desactivados'}"]
+        if nombre == ':reset':
+            self.reiniciar()
+            return ['estado reiniciado']
+        if nombre == ':help':
+            return __doc__.split('Órdenes:\n')[1].split('\n\nUso:')[0].splitlines()
+        return [f"Orden desconocida '{nombre}' (:help para ver las órdenes)"]
+
+    def bucle(self, entrada=input, salida=sys.stdout):
+        pendiente = ''
+        while True:
+            try:
+                linea = entrada(PROMPT_SEGUIR if pendiente else PROMPT)
+            except EOFError:
+                salida.write('\n')
+                return
+            except KeyboardInterrupt:
+                salida.write('\n')
+                pendiente = ''
+                continue
+            if not pendiente and linea.strip().startswith(':'):
+                respuesta = self.orden(linea.strip())
+                if respuesta is None:
+                    return
+            else:
+                pendiente += linea + '\n'
+                if not pendiente.strip():
+                    pendiente = ''
+                    continue
+                if not self.completa(pendiente):
+                    continue
+                respuesta = self.entrada(pendiente)
+                pendiente = ''
+            salida.write(''.join(f"{r}\n" for r in respuesta))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    ruta = None
+    if '--preludio' in args:
+        i = args.index('--preludio')
+        if i + 1 >= len(args):
+            print(__doc__.split('Uso: ')[1].strip())
+            sys.exit(1)
+        ruta = args[i + 1]
+    try:
+        repl = Repl(ruta)
+    except ValueError as e:
+        print(e, end='')
+        sys.exit(1)
+    print("Viper: escribe sentencias o :help")
+    repl.bucle()
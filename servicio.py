@@ -0,0 +1,399 @@
+"""
+Servicio de análisis: un demonio en un socket Unix que mantiene procesos
+trabajadores ya arrancados (con su ParserClass construido), para no pagar
+el arranque de Python ni la construcción de las tablas en cada petición.
+
+Protocolo: una petición JSON por línea; las respuestas también son una
+línea JSON cada una.
+
+  {"op": "analizar", "id": 1, "modo": "lexico" | "sintactico",
+   "fuentes": [{"nombre": "a", "texto": "..."}],
+   "salidas": ["tokens", "simbolos", "registros"], "timeout": 5}
+      -> una línea {"id", "nombre", "diagnosticos", ...salidas} por fuente
+         y al final {"id", "fin": true, "estado": "ok" | "timeout" |
+         "cancelado" | "ocupado" | "error"}
+  {"op": "cancelar", "id": 1}     -> {"id": 1, "cancelado": true | false}
+  {"op": "estadisticas"}          -> profundidad de la cola, latencias p50/p99...
+
+Los id son de cada conexión: 'cancelar' solo alcanza peticiones de la
+misma conexión, y un id que ya está en cola o en curso en ella se
+rechaza con estado "error". Una petición mal formada, o un trabajador
+que muere a mitad, también acaba en "error" (con el motivo en "error");
+el trabajador muerto se arranca de nuevo.
+
+Si la cola está llena la petición espera a lo sumo ESPERA_ADMISION
+segundos (sin leer más de esa conexión) y si no entra se responde
+"ocupado".
+
+Uso: python servicio.py [ruta_socket] [num_trabajadores]
+"""
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+RUTA_SOCKET = '/tmp/viper.sock'
+TAM_COLA = 256
+ESPERA_ADMISION = 1.0
+TIMEOUT_POR_DEFECTO = 30.0
+INTERVALO_SONDEO = 0.05
+LIMITE_LINEA = 64 * 1024 * 1024
+
+_parser = None      # ParserClass del proceso trabajador
+_lexer = None       # lexer del proceso trabajador: cada petición usa un clon
+
+
+#
+#region 1. TRABAJADORES
+#
+
+def analizar_fuente(texto, modo, salidas):
+    """Análisis de una fuente dentro de un trabajador; devuelve un dict serializable."""
+    from lexer import LexerClass
+    from diagnosticos import Diagnosticos
+    global _parser, _lexer
+
+    resultado = {}
+    # los errores léxicos, sintácticos y semánticos se recogen como diagnósticos
+    diagnosticos = Diagnosticos()
+    if 'tokens' in salidas or modo == 'lexico':
+        if _lexer is None:
+            _lexer = LexerClass().lexerObj
+        # clonar no vuelve a compilar las expresiones regulares del lexer
+        lexer = _lexer.clone()
+        lexer.diagnosticos = diagnosticos
+        lexer.input(texto)
+        tokens = []
+        for tok in lexer:
+            if tok.type == 'NEWLINE':
+                # uno por línea aunque el lexer junte las líneas vacías
+                tokens.extend([tok.type, '\n'] for _ in LexerClass.saltos(tok))
+            else:
+                tokens.append([tok.type, str(tok.value)])
+        if 'tokens' in salidas:
+            resultado['tokens'] = tokens
+
+    if modo == 'sintactico':
+        if _parser is None:
+            from parser import ParserClass
+            _parser = ParserClass(None, debug=False)
+        _parser.reiniciar()
+        _parser.lexer.diagnosticos = diagnosticos
+        error = _parser.comprobar(texto)
+        if error is not None:
+            diagnosticos.semantico(_parser, error)
+        else:
+            if 'simbolos' in salidas:
+                resultado['simbolos'] = {n: str(info['type'])
+                                         for n, info in _parser.entorno.items()}
+            if 'registros' in salidas:
+                resultado['registros'] = {
+                    n: {campo: str(t) for campo, t in props.items()}
+                    for n, props in _parser.interfaz()['registros'].items()}
+
+    resultado['diagnosticos'] = diagnosticos.lineas()
+    return resultado
+
+
+def _bucle_trabajador(conexion):
+    # precalentamos el lexer y el analizador antes de aceptar trabajo
+    analizar_fuente('', 'sintactico', ('tokens',))
+    while True:
+        try:
+            tarea = conexion.recv()
+        except EOFError:        # el servicio ha terminado
+            return
+        if tarea is None:
+            return
+        try:
+            conexion.send(analizar_fuente(*tarea))
+        except Exception as e:
+            conexion.send({'diagnosticos': [f"Error interno: {e}"]})
+
+
+class Trabajador:
+    """Un proceso analizador caliente; se reemplaza si hay que abortarlo."""
+
+    _contexto = multiprocessing.get_context('spawn')
+
+    def __init__(self):
+        self._arrancar()
+
+    def _arrancar(self):
+        self.conexion, remota = self._contexto.Pipe()
+        self.proceso = self._contexto.Process(target=_bucle_trabajador,
+                                              args=(remota,), daemon=True)
+        self.proceso.start()
+        remota.close()
+
+    def reiniciar(self):
+        self.proceso.kill()
+        self.proceso.join()
+        self.conexion.close()
+        self._arrancar()
+
+    def ejecutar(self, tarea, limite, cancelada):
+        """
+        Envía 'tarea' y espera el resultado hasta el instante 'limite'.
+        Devuelve (estado, resultado); si vence el plazo o se cancela la
+        petición, el proceso se mata y se arranca otro. Si el proceso ha
+        muerto (la tubería está rota) se arranca otro y el estado es 'error'.
+        """
+        try:
+            self.conexion.send(tarea)
+            while not self.conexion.poll(INTERVALO_SONDEO):
+                if cancelada() or time.monotonic() >= limite:
+                    self.reiniciar()
+                    return ('cancelado' if cancelada() else 'timeout'), None
+            return 'ok', self.conexion.recv()
+        except (EOFError, OSError):
+            self.reiniciar()
+            return 'error', {'error': 'El trabajador ha terminado de forma inesperada'}
+
+    def cerrar(self):
+        with contextlib.suppress(OSError):
+            self.conexion.send(None)
+        self.proceso.join(1)
+        if self.proceso.is_alive():
+            self.proceso.kill()
+
+#endregion
+
+
+#
+#region 2. SERVIDOR
+#
+
+MODOS = ('lexico', 'sintactico')
+SALIDAS = ('tokens', 'simbolos', 'registros')
+
+
+def validar(datos):
+    """Motivo por el que la petición 'analizar' está mal formada, o None."""
+    if datos.get('modo', 'sintactico') not in MODOS:
+        return f"'modo' debe ser uno de {', '.join(MODOS)}"
+    salidas = datos.get('salidas', [])
+    if not isinstance(salidas, list) or any(s not in SALIDAS for s in salidas):
+        return f"'salidas' debe ser una lista con {', '.join(SALIDAS)}"
+    timeout = datos.get('timeout', TIMEOUT_POR_DEFECTO)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not timeout > 0:
+        return "'timeout' debe ser un número de segundos mayor que 0"
+    fuentes = datos.get('fuentes', [])
+    if not isinstance(fuentes, list):
+        return "'fuentes' debe ser una lista"
+    for fuente in fuentes:
+        if not isinstance(fuente, dict) or not isinstance(fuente.get('texto', ''), str):
+            return "Cada fuente debe ser un objeto con 'texto' de tipo cadena"
+    return None
+
+
+def _clave_id(id_):
+    # los id de JSON pueden ser listas u objetos, que no sirven de clave
+    return json.dumps(id_, sort_keys=True)
+
+
+class Peticion:
+    __slots__ = ('id', 'datos', 'escritor', 'llegada', 'cancelada')
+
+    def __init__(self, id_, datos, escritor):
+        self.id = id_
+        self.datos = datos
+        self.escritor = escritor
+        self.llegada = time.monotonic()
+        self.cancelada = False
+
+
+class Servicio:
+
+    def __init__(self, num_trabajadores=None, tam_cola=TAM_COLA):
+        self.num_trabajadores = num_trabajadores or os.cpu_count() or 1
+        self.tam_cola = tam_cola
+        self.cola = None
+        self.activas = {}                     # (escritor, id) -> Peticion (en cola o en curso)
+        self.latencias = deque(maxlen=1000)   # segundos de las últimas peticiones
+        self.contadores = {'completadas': 0, 'timeouts': 0,
+                           'canceladas': 0, 'rechazadas': 0, 'errores': 0}
+        self.en_curso = 0
+
+    async def servir(self, ruta=RUTA_SOCKET):
+        self.cola = asyncio.Queue(self.tam_cola)
+        bucle = asyncio.get_running_loop()
+        trabajadores = await asyncio.gather(*[
+            bucle.run_in_executor(None, Trabajador) for _ in range(self.num_trabajadores)])
+        despachadores = [asyncio.create_task(self._despachar(t)) for t in trabajadores]
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(ruta)
+        servidor = await asyncio.start_unix_server(self._atender, ruta, limit=LIMITE_LINEA)
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            for d in despachadores:
+                d.cancel()
+            for t in trabajadores:
+                t.cerrar()
+
+    async def _atender(self, lector, escritor):
+        try:
+            while linea := await lector.readline():
+                try:
+                    datos = json.loads(linea)
+                except ValueError:
+                    datos = None
+                if not isinstance(datos, dict):
+                    await self._responder(escritor, {'error': 'JSON no válido'})
+                    continue
+                await self._recibir(datos, escritor)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            # las peticiones de una conexión cerrada ya no interesan
+            for (dueno, _), pet in self.activas.items():
+                if dueno is escritor:
+                    pet.cancelada = True
+            escritor.close()
+
+    async def _recibir(self, datos, escritor):
+        op = datos.get('op')
+        if op == 'estadisticas':
+            await self._responder(escritor, self.estadisticas())
+        elif op == 'cancelar':
+            pet = self.activas.get((escritor, _clave_id(datos.get('id'))))
+            if pet is not None:
+                pet.cancelada = True
+            await self._responder(escritor, {'id': datos.get('id'), 'cancelado': pet is not None})
+        elif op == 'analizar':
+            pet = Peticion(datos.get('id'), datos, escritor)
+            clave = (escritor, _clave_id(pet.id))
+            error = validar(datos)
+            if error is None and clave in self.activas:
+                error = f"Ya hay una petición con id {pet.id!r} en esta conexión"
+            if error is not None:
+                self.contadores['errores'] += 1
+                await self._responder(escritor, {'id': pet.id, 'fin': True,
+                                                 'estado': 'error', 'error': error})
+                return
+            self.activas[clave] = pet
+            try:
+                # contrapresión: mientras esperamos no leemos más de esta conexión
+                await asyncio.wait_for(self.cola.put(pet), ESPERA_ADMISION)
+            except asyncio.TimeoutError:
+                del self.activas[clave]
+                self.contadores['rechazadas'] += 1
+                await self._responder(escritor, {'id': pet.id, 'fin': True, 'estado': 'ocupado'})
+        else:
+            await self._responder(escritor, {'error': f"Operación desconocida: {op}"})
+
+    async def _despachar(self, trabajador):
+        bucle = asyncio.get_running_loop()
+        while True:
+            pet = await self.cola.get()
+            self.en_curso += 1
+            fin = {'id': pet.id, 'fin': True}
+            try:
+                estado = await self._procesar(pet, trabajador, bucle, fin)
+            except Exception as e:
+                # una petición rota no se lleva por delante al despachador
+                estado, fin['error'] = 'error', f"Error interno: {e}"
+            finally:
+                self.en_curso -= 1
+                self.activas.pop((pet.escritor, _clave_id(pet.id)), None)
+            if estado == 'ok':
+                self.contadores['completadas'] += 1
+                self.latencias.append(time.monotonic() - pet.llegada)
+            elif estado == 'timeout':
+                self.contadores['timeouts'] += 1
+            elif estado == 'error':
+                self.contadores['errores'] += 1
+            else:
+                self.contadores['canceladas'] += 1
+            fin['estado'] = estado
+            with contextlib.suppress(ConnectionError):
+                await self._responder(pet.escritor, fin)
+
+    async def _procesar(self, pet, trabajador, bucle, fin):
+        datos = pet.datos
+        modo = datos.get('modo', 'sintactico')
+        salidas = tuple(datos.get('salidas', ('simbolos', 'registros')))
+        # el plazo cuenta desde la llegada: incluye el tiempo en cola
+        limite = pet.llegada + float(datos.get('timeout', TIMEOUT_POR_DEFECTO))
+        for fuente in datos.get('fuentes', []):
+            if pet.cancelada:
+                return 'cancelado'
+            if time.monotonic() >= limite:
+                return 'timeout'
+            tarea = (fuente.get('texto', ''), modo, salidas)
+            estado, resultado = await bucle.run_in_executor(
+                None, trabajador.ejecutar, tarea, limite, lambda: pet.cancelada)
+            if estado == 'error':
+                fin['error'] = resultado['error']
+            if estado != 'ok':
+                return estado
+            resultado['id'] = pet.id
+            resultado['nombre'] = fuente.get('nombre')
+            # cada fuente se devuelve en cuanto está lista
+            with contextlib.suppress(ConnectionError):
+                await self._responder(pet.escritor, resultado)
+        return 'ok'
+
+    async def _responder(self, escritor, mensaje):
+        escritor.write(json.dumps(mensaje, ensure_ascii=False).encode() + b'\n')
+        await escritor.drain()
+
+    def estadisticas(self):
+        latencias = sorted(self.latencias)
+
+        def percentil(q):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(q * len(latencias)))] * 1000, 3)
+
+        return {
+            'cola': self.cola.qsize(),
+            'capacidad': self.tam_cola,
+            'en_curso': self.en_curso,
+            'trabajadores': self.num_trabajadores,
+            'p50_ms': percentil(0.50),
+            'p99_ms': percentil(0.99),
+            **self.contadores,
+        }
+
+#endregion
+
+
+#
+#region 3. CLIENTE
+#
+
+def solicitar(peticion, ruta=RUTA_SOCKET):
+    """
+    Envía una petición y devuelve la lista de respuestas. Para 'analizar'
+    lee hasta la línea con "fin"; para el resto, una sola línea.
+    """
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(ruta)
+        s.sendall(json.dumps(peticion, ensure_ascii=False).encode() + b'\n')
+        respuestas = []
+        with s.makefile('rb') as f:
+            for linea in f:
+                respuesta = json.loads(linea)
+                respuestas.append(respuesta)
+                if peticion.get('op') != 'analizar' or respuesta.get('fin'):
+                    break
+        return respuestas
+
+#endregion
+
+
+if __name__ == '__main__':
+    ruta = sys.argv[1] if len(sys.argv) > 1 else RUTA_SOCKET
+    num = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    try:
+        asyncio.run(Servicio(num).servir(ruta))
+    except KeyboardInterrupt:
+        pass
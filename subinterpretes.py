@@ -0,0 +1,128 @@
+"""
+Análisis de muchos ficheros en subintérpretes (PEP 734).
+
+Cada subintérprete tiene su propio GIL: los ficheros se analizan en
+paralelo dentro de un mismo proceso, sin copiar el heap entero de
+Python en cada trabajador como un pool de procesos.
+
+1. Cada tarea es la tubería de main.py para un fichero (los tokens de
+   guardar_tokens y la comprobación y las tablas de analizar_parser),
+   tal como la hace coordinador.analizar(). Cada trabajador construye
+   su ParserClass una sola vez.
+2. El resultado vuelve como bytes de marshal (textos del .token, .symbol
+   y .record y las líneas de diagnóstico): el ejecutor solo tiene que
+   pasar un bytes de un intérprete a otro.
+3. El intérprete principal escribe las salidas junto a cada fuente.
+
+Sin concurrent.futures.InterpreterPoolExecutor (Python < 3.14) se usa
+un ProcessPoolExecutor con la misma tarea y el mismo formato.
+
+Uso: python subinterpretes.py <directorio | ficheros...> [--trabajadores N] [--procesos]
+"""
+import marshal
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor
+except ImportError:      # Python < 3.14
+    InterpreterPoolExecutor = None
+
+from coordinador import analizar, corpus, escribir_salidas
+
+INTERPRETES = 'interpretes'
+PROCESOS = 'procesos'
+
+# Un subintérprete arranca con el sys.path de la configuración, sin el
+# directorio del script; exec es picklable y no hace falta importar nada
+# de aquí para preparar el trabajador
+_PREPARAR = "import sys; sys.path.insert(0, {!r})"
+
+
+def disponible():
+    """¿Hay ejecutor de subintérpretes en este Python?"""
+    return InterpreterPoolExecutor is not None
+
+
+def _tarea(ruta):
+    """Analiza el fichero 'ruta' dentro del trabajador; devuelve bytes de marshal."""
+    try:
+        with open(ruta, 'r') as f:
+            resultado = analizar(f.read())
+    except Exception as e:
+        resultado = {'token': None, 'symbol': None, 'record': None,
+                     'diagnosticos': [f"Error interno: {e}"]}
+    return marshal.dumps(resultado)
+
+
+def _ejecutor(modo, trabajadores):
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    opciones = {'max_workers': trabajadores, 'initializer': exec,
+                'initargs': (_PREPARAR.format(directorio),)}
+    if modo == INTERPRETES:
+        return InterpreterPoolExecutor(**opciones)
+    return ProcessPoolExecutor(**opciones)
+
+
+def analizar_ficheros(rutas, trabajadores=None, modo=None):
+    """
+    Analiza los ficheros de 'rutas' (o los *.viper de sus directorios) y
+    escribe sus salidas. 'modo' es INTERPRETES o PROCESOS; por defecto,
+    subintérpretes si este Python los tiene.
+    Devuelve {'modo', 'ficheros', 'bytes', 'segundos', 'diagnosticos'},
+    con diagnosticos = {ruta: líneas} de los ficheros que los tienen.
+    """
+    if modo is None:
+        modo = INTERPRETES if disponible() else PROCESOS
+    elif modo == INTERPRETES and not disponible():
+        modo = PROCESOS
+    trabajadores = trabajadores or os.cpu_count() or 1
+    # los más grandes primero, para que no quede uno grande para el final
+    tamanos = {ruta: os.path.getsize(ruta) for ruta in corpus(rutas)}
+    orden = sorted(tamanos, key=tamanos.get, reverse=True)
+
+    diagnosticos = {}
+    inicio = time.perf_counter()
+    with _ejecutor(modo, trabajadores) as pool:
+        futuros = {pool.submit(_tarea, ruta): ruta for ruta in orden}
+        for futuro in as_completed(futuros):
+            ruta = futuros[futuro]
+            resultado = marshal.loads(futuro.result())
+            escribir_salidas(ruta, resultado)
+            if resultado['diagnosticos']:
+                diagnosticos[ruta] = resultado['diagnosticos']
+    return {'modo': modo, 'ficheros': len(orden), 'bytes': sum(tamanos.values()),
+            'segundos': time.perf_counter() - inicio, 'diagnosticos': diagnosticos}
+
+
+def informe(stats):
+    segundos = stats['segundos'] or float('inf')
+    return (f"{stats['modo']}: {stats['ficheros']} ficheros ({stats['bytes'] / 1e6:.2f} MB) "
+            f"en {stats['segundos']:.2f} s: {stats['ficheros'] / segundos:.1f} ficheros/s, "
+            f"con_diagnosticos={len(stats['diagnosticos'])}")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    modo = None
+    if '--procesos' in args:
+        args.remove('--procesos')
+        modo = PROCESOS
+    trabajadores = None
+    if '--trabajadores' in args:
+        i = args.index('--trabajadores')
+        trabajadores = int(args[i + 1])
+        del args[i:i + 2]
+    if not args:
+        print(__doc__.split('Uso: ')[1].strip())
+        sys.exit(1)
+    # por el módulo importado y no por __main__: los trabajadores buscan
+    # _tarea en 'subinterpretes', no en su propio __main__
+    import subinterpretes
+    stats = subinterpretes.analizar_ficheros(args, trabajadores, modo)
+    for ruta, lineas in sorted(stats['diagnosticos'].items()):
+        for linea in lineas:
+            print(f"{ruta}: {linea}")
+    print(informe(stats))
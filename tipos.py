@@ -0,0 +1,106 @@
+"""
+Tipos de Viper como objetos únicos (internados).
+
+Cada tipo primitivo, registro y vector existe una sola vez, así que dos
+tipos son iguales si y solo si son el mismo objeto ('is').
+str(tipo) da el nombre que se escribe en .symbol/.record: 'int',
+el nombre del registro o 'vector'.
+
+La compatibilidad se resuelve con dos matrices calculadas una vez al
+importar. CONVERSIONES (declaraciones con valor inicial y argumentos)
+solo admite, además de la identidad, las conversiones directas
+char -> int e int -> float. ENSANCHAMIENTOS (asignaciones) admite
+además char -> float: la asignación siempre ha ensanchado por rango
+char < int < float. Registros y vectores solo son compatibles consigo
+mismos.
+"""
+
+
+class Tipo:
+    __slots__ = ('nombre', 'clase', 'base', 'size')
+
+    def __init__(self, nombre, clase, base=None, size=None):
+        self.nombre = nombre    # 'int', nombre del registro o 'vector'
+        self.clase = clase      # 'primitivo', 'registro' o 'vector'
+        self.base = base        # solo vectores: tipo de los elementos
+        self.size = size        # solo vectores: número de elementos
+
+    @property
+    def es_registro(self):
+        return self.clase == 'registro'
+
+    @property
+    def es_vector(self):
+        return self.clase == 'vector'
+
+    def __str__(self):
+        return self.nombre
+
+    def __repr__(self):
+        if self.es_vector:
+            return f"Tipo({self.base!r}[{self.size}])"
+        return f"Tipo({self.nombre})"
+
+    def __reduce__(self):
+        # al deserializar se vuelve a internar: la identidad se conserva
+        if self.es_vector:
+            return vector, (self.base, self.size)
+        if self.es_registro:
+            return registro, (self.nombre,)
+        return primitivo, (self.nombre,)
+
+
+_INTERNADOS = {}
+
+INT = _INTERNADOS[('primitivo', 'int')] = Tipo('int', 'primitivo')
+FLOAT = _INTERNADOS[('primitivo', 'float')] = Tipo('float', 'primitivo')
+CHAR = _INTERNADOS[('primitivo', 'char')] = Tipo('char', 'primitivo')
+BOOL = _INTERNADOS[('primitivo', 'bool')] = Tipo('bool', 'primitivo')
+
+NUMERICOS = (INT, FLOAT)
+
+
+def primitivo(nombre):
+    """Tipo primitivo por nombre ('int', 'float', 'char', 'bool')."""
+    return _INTERNADOS[('primitivo', nombre)]
+
+
+def registro(nombre):
+    """Tipo registro 'nombre'; los campos los guarda el analizador."""
+    clave = ('registro', nombre)
+    tipo = _INTERNADOS.get(clave)
+    if tipo is None:
+        tipo = _INTERNADOS.setdefault(clave, Tipo(nombre, 'registro'))
+    return tipo
+
+
+def vector(base, size):
+    """Tipo vector de 'size' elementos de tipo 'base'."""
+    clave = ('vector', base, size)
+    tipo = _INTERNADOS.get(clave)
+    if tipo is None:
+        tipo = _INTERNADOS.setdefault(clave, Tipo('vector', 'vector', base, size))
+    return tipo
+
+
+# Matrices (destino, origen) de conversiones implícitas permitidas
+_RANGO = (CHAR, INT, FLOAT)
+
+# solo un paso: char -> int e int -> float, pero no char -> float
+CONVERSIONES = frozenset(zip(_RANGO[1:], _RANGO))
+
+ENSANCHAMIENTOS = frozenset(
+    (destino, origen)
+    for i, destino in enumerate(_RANGO)
+    for origen in _RANGO[:i]
+)
+
+
+def asignable(destino, origen):
+    """¿Se puede inicializar (o pasar como argumento) 'destino' con un 'origen'?"""
+    return destino is origen or (destino, origen) in CONVERSIONES
+
+
+def ensanchable(destino, origen):
+    """¿Se puede asignar un valor de tipo 'origen' a uno de tipo 'destino'?"""
+    return destino is origen or (destino, origen) in ENSANCHAMIENTOS
@@ -0,0 +1,370 @@
+"""
+Traducción de programas Viper ya comprobados a código Python.
+
+1. ParserClass.parse() comprueba el programa y da su AST completo, y
+   optimizador.optimizar() le aplica sus pases.
+2. traducir() lo convierte en código fuente Python: variables locales,
+   if/while/for, funciones, registros (una clase con __slots__ por registro),
+   vectores (listas, o el vector de 'load') y sin/cos/log/exp.
+3. compile() lo convierte en un code object, que se guarda con marshal
+   en .viper_cache bajo el hash del fuente y de los pases. Volver a ejecutar un fichero
+   sin cambios carga el code object y se salta el análisis y la
+   compilación (ni siquiera se construye el ParserClass).
+
+Semántica: la división entre enteros trunca hacia cero, como en C; un
+char se convierte con ord() donde el analizador admite char -> int, y un
+int con float() donde admite int -> float. Los enteros de Python no
+desbordan. Los accesos a vector que el análisis de rangos no ha
+demostrado se comprueban al ejecutar (_viper_pos lanza IndexError en vez
+de dejar que un índice negativo cuente desde el final). Las rutas
+relativas de 'load' se resuelven al ejecutar contra el directorio del
+fuente, también con código de la caché. Los 'import' de módulos no se
+traducen.
+"""
+import hashlib
+import keyword
+import marshal
+import os
+import sys
+
+from tipos import INT, FLOAT, CHAR, BOOL
+from diagnosticos import Diagnosticos
+from optimizador import optimizar, conservando, globales, PASES
+
+DIR_CACHE = '.viper_cache'
+
+# Cambia si cambia el código generado: invalida los code objects guardados
+FORMATO = 3
+
+_BINARIOS = {
+    'SUM': '+', 'RES': '-', 'MUL': '*', 'DIV': '/',
+    'AND': 'and', 'OR': 'or',
+    'I': '==', 'M': '>', 'm': '<', 'MI': '>=', 'mI': '<=',
+}
+_UNARIOS = {'RES': '-', 'SUM': '+', 'NOT': 'not '}
+_FUNCIONES = {'sin': '_viper_sin', 'cos': '_viper_cos', 'log': '_viper_log', 'exp': '_viper_exp'}
+_POR_DEFECTO = {INT: '0', FLOAT: '0.0', CHAR: "'\\x00'", BOOL: 'False'}
+
+_PREAMBULO = '''\
+import os as _viper_os
+from math import sin as _viper_sin, cos as _viper_cos, log as _viper_log, exp as _viper_exp
+from vectores import cargar as _viper_cargar
+
+
+def _viper_div(a, b):
+    # división entera truncando hacia cero, como en C
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+def _viper_ruta(fichero):
+    # las rutas de 'load' son relativas al fichero fuente, esté donde esté
+    # el directorio actual al ejecutar (o al traducir, si viene de la caché)
+    return _viper_os.path.join(_viper_os.path.dirname(_viper_fuente), fichero)
+
+
+def _viper_pos(v, i):
+    # comprobación de rango de los accesos que no se han podido demostrar
+    if not 0 <= i < len(v):
+        raise IndexError(f"índice {i} fuera de rango (tamaño {len(v)})")
+    return i
+
+'''
+
+
+#
+#region 1. TRADUCCIÓN
+#
+
+def _nombre(n):
+    # los identificadores de Viper que Python no admite, o que chocan con
+    # los del preámbulo, llevan un '_' detrás
+    if keyword.iskeyword(n) or n.startswith('_viper'):
+        return n + '_'
+    return n
+
+
+def _convertir(codigo, destino, origen):
+    """Conversión implícita que admite el analizador (tipos.ENSANCHAMIENTOS)."""
+    if origen is CHAR and destino in (INT, FLOAT):
+        codigo = f"ord({codigo})"
+        origen = INT
+    if origen is INT and destino is FLOAT:
+        codigo = f"float({codigo})"
+    return codigo
+
+
+class _Traductor:
+
+    def __init__(self, prototipos, tipos_registro):
+        self.prototipos = prototipos
+        self.tipos_registro = tipos_registro
+        self.lineas = []
+        self.globales = []
+        self.tipos = [{}]       # nombre -> Tipo, por ámbito
+
+    def emitir(self, nivel, linea):
+        self.lineas.append('    ' * nivel + linea)
+
+    # — expresiones —
+
+    def expr(self, e):
+        kind = e['node']
+        if kind == 'lit':
+            return repr(e['valor'])
+        if kind == 'var':
+            return _nombre(e['nombre'])
+        if kind == 'bin':
+            izq, der = self.expr(e['izq']), self.expr(e['der'])
+            if e['op'] == 'DIV' and e['tipo'] is INT:
+                return f"_viper_div({izq}, {der})"
+            return f"({izq} {_BINARIOS[e['op']]} {der})"
+        if kind == 'un':
+            return f"({_UNARIOS[e['op']]}{self.expr(e['expr'])})"
+        if kind == 'func':
+            return f"{_FUNCIONES[e['op']]}({self.expr(e['expr'])})"
+        if kind == 'call':
+            params = self.prototipos[e['nombre']]['params']
+            args = ', '.join(_convertir(self.expr(a), t, a['tipo'])
+                             for a, (t, _) in zip(e['args'], params))
+            return f"{_nombre(e['nombre'])}({args})"
+        if kind == 'index':
+            return f"{_nombre(e['nombre'])}[{self.indice(e['nombre'], e['indice'], e)}]"
+        if kind == 'len':
+            return f"len({_nombre(e['nombre'])})"
+        raise ValueError(f"Expresión no traducible: {kind}")
+
+    def indice(self, nombre, indice, nodo):
+        codigo = self.expr(indice)
+        if nodo.get('sin_comprobacion'):
+            return codigo
+        return f"_viper_pos({_nombre(nombre)}, {codigo})"
+
+    def destino(self, s):
+        destino = s['destino']
+        kind, nombre = destino[0], _nombre(destino[1])
+        if kind == 'var':
+            return nombre
+        if kind == 'field':
+            return f"{nombre}.{destino[2]}"
+        return f"{nombre}[{self.indice(destino[1], destino[2], s)}]"
+
+    def tipo_destino(self, destino):
+        tipo = self.tipos[-1].get(destino[1])
+        if tipo is None:
+            return None
+        if destino[0] == 'field':
+            return self.tipos_registro.get(tipo.nombre, {}).get(destino[2])
+        if destino[0] == 'index':
+            return tipo.base
+        return tipo
+
+    def valor_inicial(self, tipo):
+        if tipo.es_vector:
+            if tipo.base.es_registro:
+                return f"[{_nombre(tipo.base.nombre)}() for _ in range({tipo.size})]"
+            return f"[{_POR_DEFECTO[tipo.base]}] * {tipo.size}"
+        if tipo.es_registro:
+            return f"{_nombre(tipo.nombre)}()"
+        return _POR_DEFECTO[tipo]
+
+    # — sentencias —
+
+    def bloque(self, sentencias, nivel):
+        antes = len(self.lineas)
+        for s in sentencias if isinstance(sentencias, list) else []:
+            self.sentencia(s, nivel)
+        if len(self.lineas) == antes:
+            self.emitir(nivel, 'pass')
+
+    def asignacion(self, s, nivel):
+        """Emite s (y antes sus asignaciones encadenadas); devuelve cómo leer su destino."""
+        rhs = s['expr']
+        if rhs['node'] == 'asig':
+            codigo = self.asignacion(rhs, nivel)
+        else:
+            codigo = self.expr(rhs)
+        destino = self.destino(s)
+        tipo = self.tipo_destino(s['destino'])
+        self.emitir(nivel, f"{destino} = {_convertir(codigo, tipo, rhs['tipo'])}")
+        return destino
+
+    def sentencia(self, s, nivel):
+        if not isinstance(s, dict):
+            return      # ('blank', línea)
+        kind = s.get('node')
+        if kind == 'decl':
+            tipo = s['tipo_var']
+            for nombre, init in s['decls']:
+                self.tipos[-1][nombre] = tipo
+                if nivel == 0:
+                    self.globales.append(nombre)
+                if 'carga' in s:
+                    valor = f"_viper_cargar(_viper_ruta({s['carga']!r}), {tipo.base.nombre!r}, {tipo.size})"
+                elif init is not None:
+                    valor = _convertir(self.expr(init), tipo, init['tipo'])
+                else:
+                    valor = self.valor_inicial(tipo)
+                self.emitir(nivel, f"{_nombre(nombre)} = {valor}")
+        elif kind == 'asig':
+            self.asignacion(s, nivel)
+        elif kind == 'if':
+            self.emitir(nivel, f"if {self.expr(s['cond'])}:")
+            self.bloque(s['then'], nivel + 1)
+            if isinstance(s['else'], list) and s['else']:
+                self.emitir(nivel, "else:")
+                self.bloque(s['else'], nivel + 1)
+        elif kind == 'while':
+            self.emitir(nivel, f"while {self.expr(s['cond'])}:")
+            self.bloque(s['body'], nivel + 1)
+        elif kind == 'for':
+            self.emitir(nivel, f"for {_nombre(s['var'])} in range({self.expr(s['desde'])}, {self.expr(s['hasta'])}):")
+            self.tipos[-1][s['var']] = INT
+            self.bloque(s['body'], nivel + 1)
+        elif kind == 'funcion':
+            params = ', '.join(_nombre(n) for _, n in s['params'])
+            self.emitir(nivel, f"def {_nombre(s['nombre'])}({params}):")
+            self.tipos.append({n: t for t, n in s['params']})
+            self.bloque(s['cuerpo'], nivel + 1)
+            ret = s['ret']
+            self.emitir(nivel + 1, f"return {_convertir(self.expr(ret), s['ret_type'], ret['tipo'])}")
+            self.tipos.pop()
+            self.emitir(nivel, '')
+        elif kind == 'import':
+            self.emitir(nivel, f"# import {s['modulo']} (no se traduce)")
+        elif kind in ('lit', 'var', 'bin', 'un', 'func', 'call', 'index', 'len'):
+            self.emitir(nivel, self.expr(s))
+
+    def registro(self, nombre, campos):
+        self.emitir(0, f"class {_nombre(nombre)}:")
+        self.emitir(1, f"__slots__ = {tuple(campos)!r}")
+        self.emitir(0, '')
+        self.emitir(1, "def __init__(self):")
+        for campo, tipo in campos.items():
+            self.emitir(2, f"self.{campo} = {self.valor_inicial(tipo)}")
+        if not campos:
+            self.emitir(2, 'pass')
+        self.emitir(0, '')
+        self.emitir(1, "def __repr__(self):")
+        self.emitir(2, "return '{' + ', '.join(f'{c}: {getattr(self, c)!r}' for c in self.__slots__) + '}'")
+        self.emitir(0, '')
+
+
+def traducir(programa, prototipos, tipos_registro, importados=(), globales=None):
+    """
+    Código fuente Python de un programa (lista de sentencias de
+    ParserClass.parse()). _GLOBALES lista 'globales' o, si es None, las
+    variables que declara el nivel superior.
+    """
+    t = _Traductor(prototipos, tipos_registro)
+    for nombre, campos in tipos_registro.items():
+        if nombre not in importados:
+            t.registro(nombre, campos)
+    for s in programa:
+        t.sentencia(s, 0)
+    t.emitir(0, '')
+    if globales is None:
+        globales = t.globales
+    t.emitir(0, f"_GLOBALES = {tuple(dict.fromkeys(globales))!r}")
+    return _PREAMBULO + '\n'.join(t.lineas) + '\n'
+
+
+def _primer_error(sentencias):
+    """Primer nodo de error del programa, también dentro de bloques."""
+    if isinstance(sentencias, dict):
+        return sentencias if 'error' in sentencias else None
+    for s in sentencias if isinstance(sentencias, list) else []:
+        if not isinstance(s, dict):
+            continue
+        if 'error' in s:
+            return s
+        for bloque in ('then', 'else', 'body', 'cuerpo'):
+            error = _primer_error(s.get(bloque))
+            if error is not None:
+                return error
+    return None
+
+#endregion
+
+
+#
+#region 2. COMPILACIÓN Y CACHÉ
+#
+
+def _ruta_cache(ruta, texto, pases):
+    # otros pases dan otro código: sus nombres entran en la clave
+    nombres = ','.join(nombre for nombre, _ in pases)
+    clave = hashlib.sha256(f"{FORMATO}:{sys.implementation.cache_tag}:{nombres}:".encode()
+                           + texto.encode()).hexdigest()
+    return os.path.join(os.path.dirname(os.path.abspath(ruta)), DIR_CACHE, clave + '.marshal')
+
+
+def compilar(ruta, texto=None, pases=PASES):
+    """
+    Code object del programa de 'ruta', optimizado con 'pases' (los de
+    optimizador.PASES, o () para traducirlo tal cual). Devuelve {'codigo',
+    'error', 'cache'}: 'error' es el texto de los diagnósticos (y 'codigo'
+    None) si el programa no pasa el análisis; 'cache' dice si vino de disco.
+    """
+    if texto is None:
+        with open(ruta, 'r') as f:
+            texto = f.read()
+    ruta_cache = _ruta_cache(ruta, texto, pases)
+    # el nombre del code object es la ruta absoluta del fuente: de ella
+    # sale el directorio contra el que se resuelven las rutas de 'load'
+    fuente_abs = os.path.abspath(ruta)
+    try:
+        with open(ruta_cache, 'rb') as f:
+            codigo = marshal.load(f)
+        if codigo.co_filename != fuente_abs:
+            codigo = codigo.replace(co_filename=fuente_abs)    # el directorio se ha movido
+        return {'codigo': codigo, 'error': None, 'cache': True}
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass
+
+    from parser import ParserClass
+    parser = ParserClass(ruta, debug=False)
+    diagnosticos = parser.lexer.diagnosticos = Diagnosticos()
+    programa = parser.parse(texto)
+    error = _primer_error(programa)
+    if error is not None:
+        diagnosticos.semantico(parser, error)
+    mensajes = diagnosticos.texto()
+    if mensajes or not isinstance(programa, list):
+        return {'codigo': None, 'error': mensajes or "Programa vacío o no válido", 'cache': False}
+
+    # los valores finales de las globales son el resultado: se conservan,
+    # y los temporales que añadan los pases no se cuentan entre ellas
+    observadas = globales(programa)
+    programa, _ = optimizar(programa, parser.func_prototypes, conservando(pases, observadas))
+    fuente = traducir(programa, parser.func_prototypes, parser.tipos_registro, parser.importados,
+                      observadas)
+    codigo = compile(fuente, fuente_abs, 'exec')
+
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    # escritura atómica: una ejecución cortada no deja la caché a medias
+    with open(ruta_cache + '.tmp', 'wb') as f:
+        marshal.dump(codigo, f)
+    os.replace(ruta_cache + '.tmp', ruta_cache)
+    return {'codigo': codigo, 'error': None, 'cache': False}
+
+
+def ejecutar(codigo):
+    """Ejecuta un code object de compilar(); devuelve {variable global: valor final}."""
+    espacio = {'__name__': '__viper__', '_viper_fuente': codigo.co_filename}
+    exec(codigo, espacio)
+    return {n: espacio[_nombre(n)] for n in espacio['_GLOBALES']}
+
+
+def formatear(valor):
+    """Valor de Viper como se escribe en Viper (true/false, listas de vectores)."""
+    if isinstance(valor, bool):
+        return 'true' if valor else 'false'
+    if isinstance(valor, (list, tuple)) or hasattr(valor, '__len__') and not isinstance(valor, str):
+        try:
+            return '[' + ', '.join(formatear(v) for v in valor) + ']'
+        except TypeError:
+            pass
+    return repr(valor)
+
+#endregion
@@ -0,0 +1,357 @@
+import ast
+import math
+import mmap
+import os
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:      # NumPy es opcional: sin él los vectores son listas
+    np = None
+
+# VIPER_SIN_NUMPY=1 fuerza el almacenamiento en listas aunque NumPy exista
+USAR_NUMPY = np is not None and not os.environ.get('VIPER_SIN_NUMPY')
+
+_DTYPES = {'int': 'int64', 'float': 'float64'}
+
+# Formato en disco de los ficheros de 'load': little-endian de 8 bytes
+_DESCR_NPY = {'int': ('<i8', '|i8'), 'float': ('<f8', '|f8')}
+_FORMATO = {'int': 'q', 'float': 'd'}
+
+
+class VectorNumerico:
+    """
+    Valores de un vector int/float guardados en un ndarray.
+    'asignado' marca qué posiciones tienen valor conocido: el analizador
+    usa None para "sin valor", que un ndarray tipado no puede representar.
+    Se comporta como la lista que sustituye: v[i] devuelve int/float o None.
+    """
+    __slots__ = ('base', 'datos', 'asignado')
+
+    def __init__(self, base, datos, asignado):
+        self.base = base
+        self.datos = datos
+        self.asignado = asignado
+
+    @classmethod
+    def vacio(cls, base, size):
+        return cls(base, np.zeros(size, dtype=_DTYPES[base]), np.zeros(size, dtype=bool))
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            # vista sin copia sobre el mismo almacenamiento
+            return VectorNumerico(self.base, self.datos[i], self.asignado[i])
+        if not self.asignado[i]:
+            return None
+        return self.datos[i].item()
+
+    def __setitem__(self, i, valor):
+        if valor is None:
+            self.asignado[i] = False
+            return
+        if isinstance(valor, str):
+            # char -> int: conversión implícita permitida por el analizador
+            valor = ord(valor)
+        self.datos[i] = valor
+        self.asignado[i] = True
+
+    def __iter__(self):
+        for i in range(len(self.datos)):
+            yield self[i]
+
+    def __repr__(self):
+        return f"VectorNumerico({self.base}, {list(self)})"
+
+
+def crear_valores(base, size):
+    """Almacenamiento inicial (todo sin valor) de un vector de 'size' elementos."""
+    if USAR_NUMPY and base in _DTYPES:
+        return VectorNumerico.vacio(base, size)
+    return [None] * size
+
+
+#
+#region OPERACIONES SOBRE VECTORES ENTEROS
+#
+# Misma semántica que el código traducido (transpilador), elemento a
+# elemento: la división entera trunca hacia cero en aritmética entera
+# exacta, dividir por cero lanza ZeroDivisionError y sin/cos/log/exp
+# lanzan lo mismo que math (ValueError fuera del dominio, OverflowError
+# si exp desborda). Los elementos sin valor siguen sin valor y no
+# cuentan para los errores. Un resultado int que no cabe en int64 lanza
+# OverflowError con NumPy, como al asignarlo a un VectorNumerico. Con
+# NumPy, log y exp pueden diferir de math en el último bit.
+
+_FUNCIONES = {'sin': math.sin, 'cos': math.cos, 'log': math.log, 'exp': math.exp}
+
+_MAX_INT64 = 2 ** 63 - 1
+
+
+def _div_entera(a, b):
+    # división entera truncando hacia cero, como en C (y _viper_div)
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+_OPERADORES = {
+    'SUM': lambda a, b: a + b,
+    'RES': lambda a, b: a - b,
+    'MUL': lambda a, b: a * b,
+}
+
+
+def tramo(valores, inicio, fin):
+    """Vista (NumPy) o copia (listas) de valores[inicio:fin]."""
+    return valores[inicio:fin]
+
+
+def aplicar(funcion, valores):
+    """
+    Evalúa 'sin', 'cos', 'log' o 'exp' sobre todo un vector de una vez.
+    El resultado siempre es float, igual que en p_expresion_func.
+    """
+    escalar = _FUNCIONES[funcion]
+    if not isinstance(valores, VectorNumerico):
+        return [None if v is None else escalar(v) for v in valores]
+
+    x = valores.datos.astype('float64')
+    asignado = valores.asignado
+    with np.errstate(all='ignore'):
+        datos = getattr(np, funcion)(x)
+    # NumPy da nan o inf donde math lanza
+    if funcion in ('sin', 'cos'):
+        fuera = np.isinf(x)
+    elif funcion == 'log':
+        fuera = x <= 0
+    else:
+        fuera = np.zeros(len(x), dtype=bool)
+    if np.any(fuera & asignado):
+        raise ValueError("math domain error")
+    if funcion == 'exp' and np.any(np.isinf(datos) & np.isfinite(x) & asignado):
+        raise OverflowError("math range error")
+    return VectorNumerico('float', datos, asignado.copy())
+
+
+def _partes(x):
+    """(datos, asignado, base) de un operando: VectorNumerico o escalar."""
+    if isinstance(x, VectorNumerico):
+        return x.datos, x.asignado, x.base
+    return x, True, 'float' if isinstance(x, float) else 'int'
+
+
+def _maximo(datos):
+    """Mayor valor absoluto (entero de Python) de un operando int."""
+    if isinstance(datos, np.ndarray):
+        return max(abs(int(datos.max())), abs(int(datos.min())))
+    return abs(datos)
+
+
+def _cabe_en_int64(op, a, b):
+    """Si op(a, b) no puede desbordar int64 (cota por los extremos de los operandos)."""
+    ma, mb = _maximo(a), _maximo(b)
+    if op in ('SUM', 'RES'):
+        return ma + mb <= _MAX_INT64
+    if op == 'MUL':
+        return ma * mb <= _MAX_INT64
+    return ma <= _MAX_INT64 and mb <= _MAX_INT64      # DIV: solo desborda -2**63 // -1
+
+
+def operar(op, izq, der):
+    """
+    Aritmética elemento a elemento ('SUM', 'RES', 'MUL', 'DIV') entre
+    vectores del mismo tamaño, o entre un vector y un escalar.
+    Tipo del resultado: float si algún operando es float, si no int.
+    """
+    if isinstance(izq, VectorNumerico) or isinstance(der, VectorNumerico):
+        return _operar_numpy(op, izq, der)
+
+    # Sin NumPy: listas (o lista y escalar) elemento a elemento
+    n = len(izq) if isinstance(izq, list) else len(der)
+    xs = izq if isinstance(izq, list) else [izq] * n
+    ys = der if isinstance(der, list) else [der] * n
+    resultado = []
+    for a, b in zip(xs, ys):
+        if a is None or b is None:
+            resultado.append(None)
+        elif op != 'DIV':
+            resultado.append(_OPERADORES[op](a, b))
+        elif isinstance(a, float) or isinstance(b, float):
+            resultado.append(a / b)
+        else:
+            resultado.append(_div_entera(a, b))
+    return resultado
+
+
+def _operar_numpy(op, izq, der):
+    a, ma, ta = _partes(izq)
+    b, mb, tb = _partes(der)
+    base = 'float' if 'float' in (ta, tb) else 'int'
+    asignado = np.logical_and(ma, mb)
+    forma = np.broadcast(a, b, asignado).shape
+    asignado = np.broadcast_to(asignado, forma).copy()
+    if not asignado.size:
+        return VectorNumerico(base, np.zeros(forma, dtype=_DTYPES[base]), asignado)
+
+    seguro = b
+    if op == 'DIV':
+        cero = np.broadcast_to(np.equal(b, 0), forma)
+        if np.any(cero & asignado):
+            # el mismo mensaje que da Python con / (float) o // (int)
+            raise ZeroDivisionError("float division by zero" if base == 'float'
+                                    else "integer division or modulo by zero")
+        seguro = np.where(cero, 1, b)       # los ceros de elementos sin valor
+
+    if base == 'int' and not _cabe_en_int64(op, a, b):
+        # puede desbordar: en enteros de Python, como el código traducido
+        xs = np.broadcast_to(a, forma).tolist()
+        ys = np.broadcast_to(seguro, forma).tolist()
+        exactos = [_div_entera(x, y) if op == 'DIV' else _OPERADORES[op](x, y)
+                   for x, y in zip(xs, ys)]
+        datos = np.array([v if m else 0 for v, m in zip(exactos, asignado.tolist())],
+                         dtype=_DTYPES[base])
+        return VectorNumerico(base, datos, asignado)
+
+    with np.errstate(all='ignore'):
+        if op != 'DIV':
+            datos = _OPERADORES[op](a, b)
+        elif base == 'float':
+            datos = np.true_divide(a, seguro)
+        else:
+            # cociente por defecto corregido hacia cero, sin pasar por float64
+            datos = np.floor_divide(a, seguro)
+            datos = datos + ((np.remainder(a, seguro) != 0) & (np.less(a, 0) != np.less(seguro, 0)))
+    datos = np.broadcast_to(np.asarray(datos, dtype=_DTYPES[base]), forma).copy()
+    return VectorNumerico(base, datos, asignado)
+
+#endregion
+
+
+#
+#region CARGA DESDE FICHERO
+#
+
+class _VistaMapeada:
+    """
+    Sin NumPy: vector sobre un memoryview del fichero mapeado.
+    Las posiciones a las que se asigna "sin valor" se apuntan aparte,
+    porque el memoryview solo guarda números. Un memoryview no se puede
+    serializar: pickle guarda de dónde vino (ruta, base, size) y lo
+    asignado desde entonces, y al cargar se vuelve a mapear el fichero.
+    """
+    __slots__ = ('datos', 'sin_valor', 'escritos', 'origen')
+
+    def __init__(self, datos, origen):
+        self.datos = datos
+        self.sin_valor = set()
+        self.escritos = set()
+        self.origen = origen
+
+    def __len__(self):
+        return len(self.datos)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self.datos)))]
+        return None if i in self.sin_valor else self.datos[i]
+
+    def __setitem__(self, i, valor):
+        if valor is None:
+            self.sin_valor.add(i)
+            return
+        if isinstance(valor, str):
+            valor = ord(valor)
+        self.datos[i] = valor
+        self.sin_valor.discard(i)
+        self.escritos.add(i)
+
+    def __iter__(self):
+        for i in range(len(self.datos)):
+            yield self[i]
+
+    def __reduce__(self):
+        cambios = {i: self[i] for i in self.sin_valor | self.escritos}
+        return _remapear, (*self.origen, cambios)
+
+
+def _remapear(ruta, base, size, cambios):
+    """Vuelve a mapear un vector de 'load' serializado y le repite lo asignado."""
+    valores = cargar(ruta, base, size)
+    for i, valor in cambios.items():
+        valores[i] = valor
+    return valores
+
+
+def _cabecera_npy(mapa, base):
+    """(offset de los datos, nº de elementos) de un .npy; ValueError si no encaja."""
+    if mapa[:6] != b'\x93NUMPY':
+        raise ValueError("no es un fichero .npy")
+    # un .npy roto puede fallar de muchas formas; todas son "no encaja"
+    try:
+        version = mapa[6]
+        if version == 1:
+            (largo,), inicio = struct.unpack_from('<H', mapa, 8), 10
+        else:
+            (largo,), inicio = struct.unpack_from('<I', mapa, 8), 12
+        cabecera = ast.literal_eval(bytes(mapa[inicio:inicio + largo]).decode('latin1'))
+    except (IndexError, struct.error, SyntaxError, ValueError, TypeError, MemoryError,
+            RecursionError) as e:
+        raise ValueError("cabecera .npy truncada o no válida") from None
+    if not isinstance(cabecera, dict):
+        raise ValueError("cabecera .npy no válida (no es un diccionario)")
+    descr = cabecera.get('descr')
+    if not isinstance(descr, str) or descr not in _DESCR_NPY[base]:
+        raise ValueError(f"el .npy es de tipo {descr}, no {base}")
+    if cabecera.get('fortran_order'):
+        raise ValueError("el .npy está en orden Fortran")
+    forma = cabecera.get('shape')
+    if not isinstance(forma, tuple) or not all(isinstance(n, int) and n >= 0 for n in forma):
+        raise ValueError(f"cabecera .npy no válida (forma {forma!r})")
+    if len(forma) != 1:
+        raise ValueError(f"el .npy tiene forma {forma}, no es un vector")
+    return inicio + largo, forma[0]
+
+
+def cargar(ruta, base, size):
+    """
+    Valores de un vector 'base'[size] mapeados desde 'ruta' sin copiarlos:
+    un .npy de int64/float64 o un binario crudo little-endian de 8 bytes
+    por elemento. El mapa es copy-on-write: asignar en el programa no
+    toca el fichero. Lanza ValueError si el tamaño o el tipo no coinciden.
+    """
+    if base not in _DTYPES:
+        raise ValueError(f"solo se pueden cargar vectores int o float, no {base}")
+    with open(ruta, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            mapa = b''
+        else:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    if ruta.endswith('.npy'):
+        inicio, n = _cabecera_npy(mapa, base)
+    else:
+        inicio, n = 0, len(mapa) // 8
+        if len(mapa) % 8:
+            raise ValueError(f"{len(mapa)} bytes no es un número entero de elementos de 8 bytes")
+    if n != size:
+        raise ValueError(f"el fichero tiene {n} elementos y el vector {size}")
+    if len(mapa) - inicio < size * 8:
+        raise ValueError("el fichero está truncado")
+
+    if USAR_NUMPY:
+        datos = np.frombuffer(mapa, dtype=_DESCR_NPY[base][0], count=size, offset=inicio)
+        return VectorNumerico(base, datos, np.ones(size, dtype=bool))
+
+    vista = memoryview(mapa)[inicio:inicio + size * 8]
+    if sys.byteorder != 'little':
+        # en big-endian no hay vista posible: se copia dándole la vuelta
+        from array import array
+        valores = array(_FORMATO[base], vista)
+        valores.byteswap()
+        vista = memoryview(valores)
+    return _VistaMapeada(vista.cast(_FORMATO[base]), (os.path.abspath(ruta), base, size))
+
+#endregion